@@ -0,0 +1,62 @@
+# backend/app/alert_queries.py
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlmodel import Session
+
+from backend.app.models import Alert, Post
+
+# the only Post columns the alert read paths render
+POST_COLUMNS = (Post.id, Post.source, Post.url, Post.title)
+
+
+def with_post_columns(stmt):
+    """
+    Extend a select(Alert)... statement with the brief Post columns through
+    one LEFT JOIN (scan alerts have no post), instead of a session.get per row.
+    """
+    return stmt.add_columns(*POST_COLUMNS).outerjoin(Post, Post.id == Alert.post_id)
+
+
+def post_brief(post_id, source, url, title) -> Optional[dict]:
+    if post_id is None:
+        return None
+    return {"id": post_id, "source": source, "url": url, "title": title}
+
+
+def iter_alerts_with_posts(session: Session, stmt) -> Iterator[Tuple[Alert, Optional[dict]]]:
+    """(alert, post brief or None) for each row of a select(Alert) statement, in one query."""
+    # execute(), not exec(): sqlmodel would return scalars for a select(Alert)
+    for a, pid, source, url, title in session.execute(with_post_columns(stmt)):
+        yield a, post_brief(pid, source, url, title)
+
+
+def encode_cursor(created_at: datetime, alert_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{alert_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        ts, alert_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(alert_id)
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+
+def after_cursor(stmt, cursor: Optional[str]):
+    """
+    Keyset page on (created_at DESC, id DESC): rows strictly after the cursor
+    row. Uses the created_at index, so every page costs the same however deep.
+    """
+    stmt = stmt.order_by(Alert.created_at.desc(), Alert.id.desc())
+    if not cursor:
+        return stmt
+    ts, alert_id = decode_cursor(cursor)
+    return stmt.where(or_(Alert.created_at < ts, and_(Alert.created_at == ts, Alert.id < alert_id)))
@@ -0,0 +1,300 @@
+# backend/app/async_collector.py
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from collections import deque
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from backend.app.collector import DEFAULT_HEADERS, CsvRecordSplitter, parse_exploitdb_rows, parse_source
+from backend.app.source_cursor import advance, conditional_headers, skip_seen
+
+COLLECT_MAX_CONNECTIONS = int(os.getenv("NORTHSTAR_COLLECT_MAX_CONNECTIONS", "20"))
+COLLECT_MAX_KEEPALIVE = int(os.getenv("NORTHSTAR_COLLECT_MAX_KEEPALIVE", "10"))
+COLLECT_PER_HOST = int(os.getenv("NORTHSTAR_COLLECT_PER_HOST", "2"))
+
+
+@dataclass
+class SourceResult:
+    name: str
+    posts: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    seconds: float = 0.0
+    not_modified: bool = False
+    bytes: int = 0
+    bytes_saved: int = 0
+    skipped: int = 0  # items at or before the cursor
+    cursor: Optional[Dict[str, Any]] = None  # new cursor, to persist once the posts are stored
+
+
+class AsyncCollector:
+    """
+    Fetches sources concurrently on the event loop. All sources share one
+    httpx.AsyncClient (keep-alive pools per host); a per-host semaphore caps
+    in-flight requests to any single host at COLLECT_PER_HOST, and retry
+    backoff is an asyncio.sleep, so a slow or failing source only delays
+    itself. Parsing (feedparser, csv) runs in a worker thread.
+    """
+
+    def __init__(self, per_host: int = COLLECT_PER_HOST, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.per_host = per_host
+        self.transport = transport  # None: real network (tests pass an httpx.MockTransport)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self.cycles = 0
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self.last_cycle_seconds = 0.0
+
+    def _client_for_loop(self) -> httpx.AsyncClient:
+        # the client and semaphores belong to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                transport=self.transport,
+                limits=httpx.Limits(max_connections=COLLECT_MAX_CONNECTIONS, max_keepalive_connections=COLLECT_MAX_KEEPALIVE),
+            )
+            self._loop = loop
+            self._hosts = {}
+        return self._client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def _retrying(self, cfg: Dict[str, Any], call: Callable[[httpx.AsyncClient], Awaitable[Any]]) -> Any:
+        """
+        Run call(client) inside the source host's slot with retries +
+        exponential backoff; call raises on a bad status. Raises RuntimeError
+        on final failure.
+        """
+        client = self._client_for_loop()
+        url = cfg["url"]
+        retries = int(cfg.get("retries", 2))
+        backoff_base = float(cfg.get("backoff_base", 0.8))
+
+        last_err = None
+        for attempt in range(retries + 1):
+            try:
+                async with self._host_slot(url):
+                    self.requests += 1
+                    return await call(client)
+            except Exception as e:
+                last_err = str(e) or type(e).__name__
+                if attempt < retries:
+                    # sleep outside the host slot so other sources on the host proceed
+                    await asyncio.sleep(backoff_base * (2 ** attempt))
+        self.failures += 1
+        raise RuntimeError(last_err or "fetch_failed")
+
+    async def fetch(self, cfg: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """GET cfg["url"] (see _retrying). A 304 is returned like a 200 (caller checks status)."""
+        hdrs = {**(cfg.get("headers") or {}), **(headers or {})}
+        timeout = float(cfg.get("timeout_seconds", 20))
+
+        async def get(client: httpx.AsyncClient) -> httpx.Response:
+            r = await client.get(cfg["url"], headers=hdrs, timeout=timeout)
+            if r.status_code >= 400:
+                raise RuntimeError(f"HTTP {r.status_code}")
+            return r
+
+        return await self._retrying(cfg, get)
+
+    async def collect_source(self, cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Async counterpart of collector.collect_source (unconditional, no cursor)."""
+        if not cfg.get("url"):
+            return []
+        r = await self.fetch(cfg)
+        return await asyncio.to_thread(parse_source, cfg, r.content)
+
+    @staticmethod
+    def deadline(cfg: Dict[str, Any]) -> float:
+        """Wall-clock cap for one source: cfg deadline_seconds, else every attempt plus its backoff."""
+        if cfg.get("deadline_seconds"):
+            return float(cfg["deadline_seconds"])
+        retries = int(cfg.get("retries", 2))
+        backoff = float(cfg.get("backoff_base", 0.8)) * (2 ** retries - 1)
+        return float(cfg.get("timeout_seconds", 20)) * (retries + 1) + backoff + 5
+
+    async def _fetch_and_parse(self, cfg: Dict[str, Any], cursor: Dict[str, Any], res: SourceResult) -> None:
+        if (cfg.get("method") or "").lower() == "exploitdb_csv":
+            return await self._tail_csv(cfg, cursor, res)
+        r = await self.fetch(cfg, conditional_headers(cursor))
+        if r.status_code == 304:
+            self._not_modified(cursor, res)
+            return
+        raw = await asyncio.to_thread(parse_source, cfg, r.content)
+        res.bytes = len(r.content)
+        res.posts, res.skipped = skip_seen(raw, cursor)
+        res.cursor = advance(cursor, raw, r.headers, res.bytes)
+
+    def _not_modified(self, cursor: Dict[str, Any], res: SourceResult) -> None:
+        res.not_modified = True
+        res.bytes_saved = int(cursor.get("bytes") or 0)
+        self.not_modified += 1
+        self.bytes_saved += res.bytes_saved
+        res.cursor = cursor  # unchanged; persisting it records the run
+
+    async def _tail_csv(self, cfg: Dict[str, Any], cursor: Dict[str, Any], res: SourceResult) -> None:
+        """
+        New rows of an append-only CSV (ExploitDB files_exploits.csv). With a
+        saved offset (always a record boundary) this is a Range request from
+        the byte before it, which must be the previous record's newline, so
+        only rows appended since the last run cross the wire. Otherwise (first
+        run, no Range support, file rewritten) the body is streamed once.
+        Either way the stream is cut into whole records (CsvRecordSplitter)
+        and only the last max_items are held, in a ring. Rows at or below the
+        last ingested id are dropped by skip_seen.
+        """
+        max_items = int(cfg.get("max_items", 50))
+        timeout = float(cfg.get("timeout_seconds", 20))
+        offset = cursor.get("offset")
+        header = cursor.get("csv_header")
+        start = offset - 1 if offset and header else None
+
+        hdrs = {**(cfg.get("headers") or {}), **conditional_headers(cursor)}
+        if start is not None:
+            hdrs["Range"] = f"bytes={start}-"
+
+        async def stream(client: httpx.AsyncClient) -> Optional[dict]:
+            async with client.stream("GET", cfg["url"], headers=hdrs, timeout=timeout) as r:
+                if r.status_code == 304:
+                    return {"status": 304}
+                if r.status_code == 416:
+                    return None  # file shrank below our offset
+                if r.status_code >= 400:
+                    raise RuntimeError(f"HTTP {r.status_code}")
+
+                partial = r.status_code == 206
+                base, total = 0, None
+                if partial:
+                    m = re.match(r"bytes (\d+)-\d+/(\d+|\*)", r.headers.get("content-range", ""))
+                    if not m or int(m.group(1)) != start:
+                        return None
+                    base = start
+                    total = int(m.group(2)) if m.group(2) != "*" else None
+                    if total is not None and total < offset:
+                        return None  # rewritten, not appended
+
+                splitter = CsvRecordSplitter()
+                ring: deque = deque(maxlen=max_items)
+                head = None
+                lead = partial  # the previous record's newline, checked then skipped
+                consumed = 0
+                received = 0
+                async for chunk in r.aiter_bytes():
+                    received += len(chunk)
+                    if lead and chunk:
+                        if chunk[:1] != b"\n":
+                            return None  # offset is no longer a record boundary
+                        chunk, lead, consumed = chunk[1:], False, 1
+                    for rec in splitter.feed(chunk):
+                        consumed += len(rec)
+                        text = rec.decode("utf-8", errors="ignore")
+                        if not partial and head is None:
+                            head = text.rstrip("\r\n")
+                            continue
+                        ring.append(text)
+                if splitter.rest.strip() and (partial or head is not None):
+                    # unterminated last record: parse it, but re-read it next time
+                    ring.append(splitter.rest.decode("utf-8", errors="ignore"))
+                return {
+                    "status": r.status_code,
+                    "headers": r.headers,
+                    "header": head,
+                    "records": list(ring),
+                    "offset": base + consumed,
+                    "received": received,
+                    "total": total if total is not None else base + received,
+                }
+
+        out = await self._retrying(cfg, stream)
+        if out is None:
+            if start is None:
+                raise RuntimeError("unexpected partial response")
+            # cannot resume from the offset: one full streamed read
+            cursor = {k: v for k, v in cursor.items() if k not in ("offset", "csv_header")}
+            return await self._tail_csv(cfg, cursor, res)
+        if out["status"] == 304:
+            self._not_modified(cursor, res)
+            return
+
+        header = out["header"] or header
+        if not header:
+            return
+        raw = parse_exploitdb_rows(cfg, header, out["records"])
+        res.bytes = out["received"]
+        res.bytes_saved = max(0, out["total"] - out["received"])
+        self.bytes_saved += res.bytes_saved
+        res.posts, res.skipped = skip_seen(raw, cursor)
+        res.cursor = {**advance(cursor, raw, out["headers"], out["total"]), "offset": out["offset"], "csv_header": header}
+
+    async def _collect_one(self, cfg: Dict[str, Any], cursor: Dict[str, Any]) -> SourceResult:
+        t0 = time.perf_counter()
+        res = SourceResult(name=cfg.get("name", "unknown"))
+        if cfg.get("url"):
+            limit = self.deadline(cfg)
+            try:
+                await asyncio.wait_for(self._fetch_and_parse(cfg, cursor, res), timeout=limit)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                res.error = f"timed out after {limit:g}s"
+            except Exception as e:
+                res.error = str(e)
+        res.seconds = time.perf_counter() - t0
+        return res
+
+    async def collect_all(
+        self,
+        cfgs: List[Dict[str, Any]],
+        cursors: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> List[SourceResult]:
+        """
+        Collect every enabled source at once; one result per source, in cfgs
+        order. With cursors (source name -> Source.cursor state) requests are
+        conditional and items at or before the cursor are dropped.
+        """
+        t0 = time.perf_counter()
+        cursors = cursors or {}
+        enabled = [c for c in cfgs if c.get("enabled", True)]
+        results = await asyncio.gather(*(self._collect_one(c, cursors.get(c.get("name")) or {}) for c in enabled))
+        self.cycles += 1
+        self.last_cycle_seconds = time.perf_counter() - t0
+        return list(results)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "per_host": self.per_host,
+            "max_connections": COLLECT_MAX_CONNECTIONS,
+            "hosts": sorted(self._hosts),
+            "cycles": self.cycles,
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "not_modified": self.not_modified,
+            "bytes_saved": self.bytes_saved,
+            "last_cycle_seconds": round(self.last_cycle_seconds, 3),
+        }
+
+
+async_collector = AsyncCollector()
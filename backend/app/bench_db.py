@@ -0,0 +1,111 @@
+# backend/app/bench_db.py
+# Run from repo root: python -m backend.app.bench_db
+# Ingest rate (posts+alerts per second, batched like the ingest writer) while
+# reader threads poll the /alerts and SSE queries, default SQLite vs the
+# WAL profile with a separate read engine. Uses a temp DB, not northstar.db.
+from __future__ import annotations
+
+import hashlib
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, select
+
+from backend.app.db import make_engine
+from backend.app.models import Alert, Post
+
+BATCHES = 200
+BATCH_SIZE = 50
+READERS = 4
+
+
+def _batch(b: int):
+    posts = []
+    for i in range(BATCH_SIZE):
+        n = b * BATCH_SIZE + i
+        text = f"bench post {n} selling telecom creds"
+        posts.append(dict(source="bench", url=f"local://bench/{n}", text=text, hash=hashlib.sha256(text.encode()).hexdigest()))
+    return posts
+
+
+def _writer(engine, out: dict):
+    t0 = time.perf_counter()
+    locked = 0
+    for b in range(BATCHES):
+        posts = _batch(b)
+        while True:
+            try:
+                with Session(engine) as s:
+                    ids = [r[0] for r in s.execute(insert(Post).returning(Post.id), posts)]
+                    s.execute(insert(Alert), [
+                        dict(post_id=pid, category="attack_chatter", sector="telecom", intent="claim",
+                             intent_confidence=0.7, score=40.0, score_reasons={"reasons": []}, status="open")
+                        for pid in ids
+                    ])
+                    s.commit()
+                break
+            except Exception as e:
+                if "locked" not in str(e):
+                    raise
+                locked += 1
+    out["seconds"] = time.perf_counter() - t0
+    out["locked_retries"] = locked
+
+
+def _reader(engine, stop: threading.Event, out: list):
+    queries = 0
+    last_id = 0
+    while not stop.is_set():
+        try:
+            with Session(engine) as s:
+                s.exec(select(Alert).where(Alert.score >= 0).order_by(Alert.created_at.desc()).limit(200)).all()
+                rows = s.exec(select(Alert).where(Alert.id > last_id).order_by(Alert.id.asc())).all()
+                if rows:
+                    last_id = rows[-1].id
+            queries += 2
+        except Exception:
+            pass
+    out.append(queries)
+
+
+def run(profile: bool, tmp: Path) -> dict:
+    path = tmp / f"bench_{'wal' if profile else 'default'}.db"
+    url = f"sqlite:///{path}"
+    engine = make_engine(url, profile=profile)
+    read_engine = make_engine(url, profile=profile, read_only=True) if profile else engine
+    SQLModel.metadata.create_all(engine)
+
+    stop = threading.Event()
+    reads: list = []
+    readers = [threading.Thread(target=_reader, args=(read_engine, stop, reads)) for _ in range(READERS)]
+    for t in readers:
+        t.start()
+    w: dict = {}
+    _writer(engine, w)
+    stop.set()
+    for t in readers:
+        t.join()
+
+    rows = BATCHES * BATCH_SIZE
+    return {
+        "rows_per_s": rows / w["seconds"],
+        "locked_retries": w["locked_retries"],
+        "reader_queries_per_s": sum(reads) / w["seconds"],
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        print(f"{BATCHES} batches x {BATCH_SIZE} posts (+alerts), {READERS} concurrent readers")
+        for label, profile in (("default (rollback journal)", False), ("WAL profile + read engine", True)):
+            r = run(profile, tmp)
+            print(f"  {label:28s}: {r['rows_per_s']:8.0f} posts/s, "
+                  f"{r['reader_queries_per_s']:7.0f} reader queries/s, {r['locked_retries']} 'locked' retries")
+
+
+if __name__ == "__main__":
+    main()
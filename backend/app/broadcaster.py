@@ -0,0 +1,149 @@
+# backend/app/broadcaster.py
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+SSE_REPLAY_SIZE = int(os.getenv("NORTHSTAR_SSE_REPLAY", "500"))
+SSE_CLIENT_QUEUE = int(os.getenv("NORTHSTAR_SSE_CLIENT_QUEUE", "256"))
+
+
+def alert_event(alert: Dict[str, Any], post: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """SSE payload for one alert (same shape the stream has always sent)."""
+    created_at = alert.get("created_at")
+    return {
+        "id": alert["id"],
+        "score": alert["score"],
+        "sector": alert["sector"],
+        "category": alert["category"],
+        "intent": alert["intent"],
+        "created_at": created_at.isoformat(timespec="seconds") if created_at else None,
+        "title": (post.get("title") if post else None) or (f"Scan alert: asset {alert.get('asset_id')}" if alert.get("asset_id") else None),
+        "url": post.get("url") if post else None,
+        "source": post.get("source") if post else None,
+        "asset_id": alert.get("asset_id"),
+    }
+
+
+@dataclass
+class _Event:
+    id: int
+    data: str
+
+
+@dataclass(eq=False)
+class Subscriber:
+    queue: "asyncio.Queue[Optional[_Event]]" = field(default_factory=lambda: asyncio.Queue(maxsize=SSE_CLIENT_QUEUE))
+    dropped: bool = False
+    replayed: Set[int] = field(default_factory=set)  # backlog ids, until they show up on the queue
+
+    def unseen(self, ev: _Event) -> bool:
+        """False for an event already sent with the backlog (published while subscribing)."""
+        if ev.id in self.replayed:
+            self.replayed.discard(ev.id)
+            return False
+        return True
+
+
+class AlertBroadcaster:
+    """
+    In-process fan-out of new alerts to SSE clients. The alert insert path
+    calls publish() after its commit (from any thread); events are kept in
+    a bounded replay ring and pushed to every subscriber's queue on the
+    event loop, so viewers never query the DB.
+
+    A subscriber whose queue fills up (slow consumer) is dropped: its queue
+    is cleared and closed, and the client reconnects with Last-Event-ID to
+    resume from the ring.
+    """
+
+    def __init__(self, replay_size: int = SSE_REPLAY_SIZE):
+        self._lock = threading.Lock()
+        self._ring: deque = deque(maxlen=replay_size)
+        self._subs: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.dropped = 0
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def seed(self, payloads: Iterable[Dict[str, Any]]) -> None:
+        """Fill the replay ring (oldest first) without notifying anyone."""
+        with self._lock:
+            for p in payloads:
+                self._ring.append(_Event(p["id"], json.dumps(p)))
+
+    def publish(self, payloads: List[Dict[str, Any]]) -> None:
+        if not payloads:
+            return
+        events = [_Event(p["id"], json.dumps(p)) for p in payloads]
+        with self._lock:
+            self._ring.extend(events)
+            self.published += len(events)
+            loop = self._loop
+            has_subs = bool(self._subs)
+        if loop is not None and has_subs and not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, events)
+
+    def _deliver(self, events: List[_Event]) -> None:
+        with self._lock:
+            subs = list(self._subs)
+        for sub in subs:
+            for ev in events:
+                try:
+                    sub.queue.put_nowait(ev)
+                except asyncio.QueueFull:
+                    self._drop(sub)
+                    break
+
+    def _drop(self, sub: Subscriber) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+            self.dropped += 1
+        sub.dropped = True
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> tuple[Subscriber, List[_Event]]:
+        """
+        Register a subscriber; returns it with the ring backlog: everything
+        published after last_event_id (whole ring if None). Concurrent writers
+        can publish ids out of order, so this goes by ring position; an id no
+        longer in the ring falls back to ids above it.
+        """
+        sub = Subscriber()
+        with self._lock:
+            ring = list(self._ring)
+            if last_event_id is None:
+                backlog = ring
+            else:
+                pos = next((i for i in range(len(ring) - 1, -1, -1) if ring[i].id == last_event_id), None)
+                backlog = ring[pos + 1:] if pos is not None else [e for e in ring if e.id > last_event_id]
+            sub.replayed = {e.id for e in backlog}
+            self._subs.add(sub)
+        return sub, backlog
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subs),
+                "replay_size": len(self._ring),
+                "replay_max": self._ring.maxlen,
+                "published": self.published,
+                "dropped_consumers": self.dropped,
+                "last_event_id": self._ring[-1].id if self._ring else None,
+            }
+
+
+broadcaster = AlertBroadcaster()
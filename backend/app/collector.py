@@ -1,9 +1,11 @@
 # backend/app/collector.py
 from __future__ import annotations
 
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import csv
 import time
 import json
 
@@ -14,6 +16,11 @@ import feedparser
 
 SOURCES_YAML_PATH = Path("backend/app/sources.yaml")
 
+DEFAULT_HEADERS = {
+    "User-Agent": "NorthStarCollector/1.0 (+defensive-osint)",
+    "Accept": "*/*",
+}
+
 
 # -----------------------------
 # Helpers
@@ -73,10 +80,7 @@ def _requests_fetch(
     Returns (ok, content_bytes, error_string)
     """
     sess = requests.Session()
-    hdrs = {
-        "User-Agent": "NorthStarCollector/1.0 (+defensive-osint)",
-        "Accept": "*/*",
-    }
+    hdrs = dict(DEFAULT_HEADERS)
     if headers:
         hdrs.update(headers)
 
@@ -122,19 +126,16 @@ def load_sources_yaml() -> List[Dict[str, Any]]:
 
 def collect_source(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    Collect raw items from a source config.
+    Collect raw items from a source config (blocking; the background loops
+    use async_collector instead).
     Returns list of raw post dicts with keys:
-      title, author, created_at, url, text, source
+      title, author, created_at, url, text, source, item_id
     """
-    name = cfg.get("name", "unknown")
-    url = cfg.get("url")
-    method = (cfg.get("method") or "rss").lower()
-
-    if not url:
+    if not cfg.get("url"):
         return []
 
     ok, content, err = _requests_fetch(
-        url,
+        cfg["url"],
         timeout=int(cfg.get("timeout_seconds", 20)),
         retries=int(cfg.get("retries", 2)),
         backoff_base=float(cfg.get("backoff_base", 0.8)),
@@ -145,6 +146,15 @@ def collect_source(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
         # raise so caller can record error per-source
         raise RuntimeError(err or "fetch_failed")
 
+    return parse_source(cfg, content)
+
+
+def parse_source(cfg: Dict[str, Any], content: bytes) -> List[Dict[str, Any]]:
+    """Turn a fetched body into raw post dicts according to cfg["method"]."""
+    name = cfg.get("name", "unknown")
+    url = cfg.get("url")
+    method = (cfg.get("method") or "rss").lower()
+
     max_items = int(cfg.get("max_items", 50))
 
     if method == "json":
@@ -159,6 +169,7 @@ def collect_source(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
         author_k = cfg.get("json_author_key", "author")
         time_k = cfg.get("json_time_key", "created_at")
         text_k = cfg.get("json_text_key", "text")
+        id_k = cfg.get("json_id_key", "id")
 
         out = []
         for it in items[:max_items]:
@@ -171,6 +182,7 @@ def collect_source(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
                 "author": it.get(author_k),
                 "created_at": it.get(time_k),
                 "text": it.get(text_k) or "",
+                "item_id": it.get(id_k) or it.get(url_k),
             })
         return out
 
@@ -201,50 +213,96 @@ def collect_source(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
                 "author": author,
                 "created_at": published,
                 "text": summary or "",
+                "item_id": getattr(e, "id", None) or link,
             })
         return out
 
     if method == "exploitdb_csv":
         # ExploitDB Git repo mirror: CSV contains exploit metadata.
-        # We convert each row into "post-like" text for your pipeline.
-        text = content.decode("utf-8", errors="ignore")
-        lines = [ln for ln in text.splitlines() if ln.strip()]
-        if not lines:
+        # Only the newest max_items records are kept; the ring bounds memory.
+        splitter = CsvRecordSplitter()
+        records = splitter.feed(content)
+        if splitter.rest.strip():
+            records.append(splitter.rest)
+        records = iter(r.decode("utf-8", errors="ignore") for r in records)
+        header = next((r for r in records if r.strip()), None)
+        if header is None:
             return []
+        return parse_exploitdb_rows(cfg, header, deque(records, maxlen=max_items))
 
-        header = lines[0].split(",")
-        # We only take the newest max_items rows from the end to keep it lightweight.
-        data_lines = lines[-max_items:]
+    raise ValueError(f"Unknown method: {method}")
 
-        out = []
-        for ln in data_lines:
-            parts = ln.split(",")
-            if len(parts) < 6:
-                continue
-            row = dict(zip(header, parts))
-            # Common fields in exploitdb csv mirrors: id, file, description, date, author, type, platform, port...
-            title = (row.get("description") or row.get("Description") or "ExploitDB entry").strip()
-            eid = (row.get("id") or row.get("ID") or "").strip()
-            date = (row.get("date") or row.get("Date") or "").strip()
-            platform = (row.get("platform") or row.get("Platform") or "").strip()
-            etype = (row.get("type") or row.get("Type") or "").strip()
-            link = None
-            if eid:
-                link = f"https://www.exploit-db.com/exploits/{eid}"
-
-            body = f"{title}\nType: {etype}\nPlatform: {platform}\nDate: {date}\nSource: ExploitDB CSV"
 
-            out.append({
-                "source": name,
-                "title": title,
-                "url": link or url,
-                "author": row.get("author") or row.get("Author"),
-                "created_at": date,
-                "text": body,
-            })
+class CsvRecordSplitter:
+    """
+    Cuts a CSV byte stream into whole records: a newline ends a record only
+    outside a quoted field. feed() returns the records completed so far
+    (each with its newline); rest holds the unfinished tail.
+    """
+
+    def __init__(self):
+        self.rest = b""
+        self._scanned = 0  # bytes of rest already scanned for quotes
+        self._quoted = False
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        buf = self.rest + chunk
+        out = []
+        start = 0
+        i = self._scanned
+        quoted = self._quoted
+        while True:
+            nl = buf.find(b"\n", i)
+            if nl < 0:
+                break
+            # "" escapes toggle twice, so parity of quote bytes is the state
+            quoted ^= buf.count(b'"', i, nl) % 2 == 1
+            if not quoted:
+                out.append(buf[start:nl + 1])
+                start = nl + 1
+            i = nl + 1
+        self.rest = buf[start:]
+        self._scanned = i - start
+        self._quoted = quoted
         return out
 
-    raise ValueError(f"Unknown method: {method}")
+
+def parse_exploitdb_rows(cfg: Dict[str, Any], header: str, records: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    ExploitDB CSV records -> "post-like" items for the pipeline. Uses the csv
+    module (descriptions contain quoted commas and newlines); header is the
+    file's first record, records are whole records (see CsvRecordSplitter).
+    """
+    name = cfg.get("name", "unknown")
+    url = cfg.get("url")
+    columns = next(csv.reader([header]))
+    out = []
+    for parts in csv.reader(r for r in records if r.strip()):
+        if len(parts) < 6 or parts == columns:
+            continue
+        row = dict(zip(columns, parts))
+        # Common fields in exploitdb csv mirrors: id, file, description, date_published, author, type, platform, port...
+        title = (row.get("description") or row.get("Description") or "ExploitDB entry").strip()
+        eid = (row.get("id") or row.get("ID") or "").strip()
+        date = (row.get("date_published") or row.get("date") or row.get("Date") or "").strip()
+        platform = (row.get("platform") or row.get("Platform") or "").strip()
+        etype = (row.get("type") or row.get("Type") or "").strip()
+        link = None
+        if eid:
+            link = f"https://www.exploit-db.com/exploits/{eid}"
+
+        body = f"{title}\nType: {etype}\nPlatform: {platform}\nDate: {date}\nSource: ExploitDB CSV"
+
+        out.append({
+            "source": name,
+            "title": title,
+            "url": link or url,
+            "author": row.get("author") or row.get("Author"),
+            "created_at": date,
+            "text": body,
+            "item_id": eid or None,
+        })
+    return out
 
 
 def normalize_posts(raw_posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -4,6 +4,8 @@ from dataclasses import dataclass, asdict
 from typing import Dict, Any, List, Optional
 import re
 
+from ml.keywords import keyword_counts, register_keywords
+
 # Basic technique: add enrichment tags + risk hints from text
 # This is "context augmentation" for scoring and reporting.
 
@@ -27,12 +29,13 @@ KEYWORD_DENSITY = [
     "0day", "zero day", "vulnerability", "attack"
 ]
 
+register_keywords("density", KEYWORD_DENSITY)
+
 def _lower(text: str) -> str:
     return (text or "").lower()
 
 def keyword_hits(text: str) -> int:
-    t = _lower(text)
-    return sum(1 for k in KEYWORD_DENSITY if k in t)
+    return keyword_counts(text)["density"]
 
 def extract_tags(text: str) -> List[str]:
     t = _lower(text)
@@ -0,0 +1,242 @@
+# backend/app/ingest_queue.py
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import inspect as sa_inspect
+from sqlmodel import Session, SQLModel
+
+from backend.app.broadcaster import alert_event, broadcaster
+from backend.app.db import engine
+from backend.app.models import Alert
+from backend.app.pipeline_store import bulk_upsert_posts_and_alerts
+from backend.app.rollups import bump_rollups
+
+INGEST_QUEUE_ENABLED = os.getenv("NORTHSTAR_INGEST_QUEUE", "1") == "1"
+INGEST_QUEUE_MAX = int(os.getenv("NORTHSTAR_INGEST_QUEUE_MAX", "1000"))
+INGEST_BATCH_SIZE = int(os.getenv("NORTHSTAR_INGEST_BATCH_SIZE", "200"))
+INGEST_BATCH_WAIT = float(os.getenv("NORTHSTAR_INGEST_BATCH_WAIT", "0.25"))  # seconds
+INGEST_PUT_TIMEOUT = float(os.getenv("NORTHSTAR_INGEST_PUT_TIMEOUT", "5"))
+
+
+def _has_identity(row: SQLModel) -> bool:
+    return all(getattr(row, c.key) is not None for c in sa_inspect(type(row)).primary_key)
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+@dataclass
+class _Job:
+    kind: str  # posts|rows
+    payload: List[Any]
+    redelivered: Optional[Dict[str, int]] = None
+    future: Future = field(default_factory=Future)
+
+    @property
+    def size(self) -> int:
+        return max(1, len(self.payload))
+
+
+class IngestQueue:
+    """
+    Single writer for ingestion. Producers (API handlers, collector / scan
+    loops, the demo scheduler) submit normalized posts or ready-made rows
+    and get a Future; one daemon thread drains the queue in batches bounded
+    by INGEST_BATCH_SIZE items or INGEST_BATCH_WAIT seconds and writes each
+    batch in one transaction, so SQLite sees a single writer.
+
+    The queue is bounded (INGEST_QUEUE_MAX jobs): a full queue blocks
+    producers for up to INGEST_PUT_TIMEOUT seconds, then raises
+    IngestQueueFull. With NORTHSTAR_INGEST_QUEUE=0 jobs run inline.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = INGEST_QUEUE_ENABLED,
+        max_depth: int = INGEST_QUEUE_MAX,
+        batch_size: int = INGEST_BATCH_SIZE,
+        batch_wait: float = INGEST_BATCH_WAIT,
+    ):
+        self.enabled = enabled
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._q: "queue.Queue[_Job]" = queue.Queue(maxsize=max_depth)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.submitted = 0
+        self.rejected = 0
+        self.batches = 0
+        self.items_written = 0
+        self.failed_batches = 0
+        self.last_batch_size = 0
+        self.last_batch_seconds = 0.0
+
+    # ---------- producers ----------
+    def submit_posts(
+        self,
+        items: List[dict],
+        *,
+        vuln_features: dict | None = None,
+        redelivered: Dict[str, int] | None = None,
+        timeout: float | None = INGEST_PUT_TIMEOUT,
+    ) -> Future:
+        """Future resolves to [(post_id, alert_id)] in item order (see bulk_upsert_posts_and_alerts)."""
+        if vuln_features is not None:
+            items = [it if "vuln_features" in it else {**it, "vuln_features": vuln_features} for it in items]
+        return self._submit(_Job("posts", list(items), redelivered), timeout)
+
+    def submit_rows(self, rows: List[SQLModel], *, timeout: float | None = INGEST_PUT_TIMEOUT) -> Future:
+        """Insert model instances (scan findings, scan alerts, runs, source cursors); Future resolves to their ids."""
+        return self._submit(_Job("rows", list(rows)), timeout)
+
+    def _submit(self, job: _Job, timeout: float | None) -> Future:
+        if not self.enabled:
+            self._write([job])
+            return job.future
+        self._ensure_writer()
+        try:
+            self._q.put(job, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise IngestQueueFull(f"ingest queue full ({self.max_depth} jobs)")
+        with self._lock:
+            self.submitted += 1
+        return job.future
+
+    # ---------- writer ----------
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> List[_Job]:
+        jobs = [self._q.get()]
+        n = jobs[0].size
+        deadline = time.monotonic() + self.batch_wait
+        while n < self.batch_size:
+            try:
+                job = self._q.get_nowait()
+            except queue.Empty:
+                # an idle queue flushes at once; only linger while jobs keep arriving
+                left = deadline - time.monotonic()
+                if len(jobs) == 1 or left <= 0:
+                    break
+                try:
+                    job = self._q.get(timeout=left)
+                except queue.Empty:
+                    break
+            jobs.append(job)
+            n += job.size
+        return jobs
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._next_batch()
+            try:
+                self._write(jobs)
+            finally:
+                for _ in jobs:
+                    self._q.task_done()
+
+    def _write(self, jobs: List[_Job]) -> None:
+        t0 = time.perf_counter()
+        post_jobs = [j for j in jobs if j.kind == "posts"]
+        row_jobs = [j for j in jobs if j.kind == "rows"]
+        if post_jobs:
+            self._isolated(post_jobs, self._write_posts)
+        if row_jobs:
+            self._isolated(row_jobs, self._write_rows)
+
+        with self._lock:
+            self.batches += 1
+            self.last_batch_size = sum(len(j.payload) for j in jobs)
+            self.items_written += sum(len(j.payload) for j in jobs if j.future.exception() is None)
+            self.last_batch_seconds = time.perf_counter() - t0
+
+    def _isolated(self, jobs: List[_Job], write) -> None:
+        """
+        write(jobs) in one transaction; if that fails, each job is retried
+        alone, so a bad item only fails its own producer's future.
+        """
+        try:
+            write(jobs)
+            return
+        except Exception as e:
+            if len(jobs) > 1:
+                print("⚠️ [INGEST] batch failed, retrying jobs one by one:", e)
+                for j in jobs:
+                    self._isolated([j], write)
+                return
+            with self._lock:
+                self.failed_batches += 1
+            jobs[0].future.set_exception(e)
+            if not self.enabled:
+                raise
+            print("❌ [INGEST] job failed:", e)
+
+    def _write_posts(self, jobs: List[_Job]) -> None:
+        items = [it for j in jobs for it in j.payload]
+        mask: List[bool] = []
+        with Session(engine) as session:
+            pairs = bulk_upsert_posts_and_alerts(session, items, redelivered_mask=mask)
+        pos = 0
+        for j in jobs:
+            n = len(j.payload)
+            if j.redelivered is not None:
+                # credit each job with its own re-delivered items only
+                for it, seen in zip(j.payload, mask[pos:pos + n]):
+                    if seen:
+                        j.redelivered[it["source"]] = j.redelivered.get(it["source"], 0) + 1
+            j.future.set_result(pairs[pos:pos + n])
+            pos += n
+
+    def _write_rows(self, jobs: List[_Job]) -> None:
+        with Session(engine) as session:
+            # rows that already carry their primary key (Source cursors, SourceHealth) are upserts
+            rows = [session.merge(r) if _has_identity(r) else r for j in jobs for r in j.payload]
+            session.add_all(rows)
+            bump_rollups(session, [r for r in rows if isinstance(r, Alert)])
+            session.flush()
+            ids = [getattr(r, "id", None) for r in rows]
+            events = [alert_event(r.model_dump(), None) for r in rows if isinstance(r, Alert)]
+            session.commit()
+        broadcaster.publish(events)
+        pos = 0
+        for j in jobs:
+            j.future.set_result(ids[pos:pos + len(j.payload)])
+            pos += len(j.payload)
+
+    def depth(self) -> int:
+        return self._q.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "depth": self._q.qsize(),
+                "max_depth": self.max_depth,
+                "batch_size": self.batch_size,
+                "batch_wait": self.batch_wait,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "items_written": self.items_written,
+                "last_batch_size": self.last_batch_size,
+                "last_batch_seconds": round(self.last_batch_seconds, 4),
+                "writer_alive": bool(self._thread and self._thread.is_alive()),
+            }
+
+
+ingest_queue = IngestQueue()
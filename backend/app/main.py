@@ -2,25 +2,35 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import os
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.responses import HTMLResponse, StreamingResponse
 from sqlmodel import Session, select
 
+from backend.app.alert_queries import after_cursor, encode_cursor, iter_alerts_with_posts
 from backend.app.auth import require_api_key
-from backend.app.collector import collect_source, load_sources_yaml, normalize_posts
-from backend.app.db import engine, get_session, init_db
-from backend.app.models import Alert, Asset, Post, Run, ScanFinding
-from backend.app.pipeline_store import upsert_post_and_alert
+from backend.app.broadcaster import SSE_REPLAY_SIZE, alert_event, broadcaster
+from backend.app.async_collector import async_collector
+from backend.app.collector import load_sources_yaml, normalize_posts
+from backend.app.db import engine, get_read_session, get_session, init_db, read_engine
+from backend.app.models import Alert, AlertRollup, Asset, Run, ScanFinding, Source
+from backend.app.ingest_queue import IngestQueueFull, ingest_queue
 from backend.app.reporter import build_report_context
+from backend.app.rollups import backfill, trend_counts
 from backend.app.scanner import passive_scan_url
+from backend.app.seen_hashes import seen_hashes
+from backend.app.source_cursor import load_cursors, source_rows
+from backend.app.source_health import source_breakers
+from backend.app.source_scheduler import SourceScheduler
 from backend.app.scraper import scrape_url  # returns ScrapeResult
 from jinja2 import Template
+from ml.alert_cache import alert_cache
+from ml.cascade import cascade
+from ml.registry import get_models, model_stats, reload_models
 
 app = FastAPI(title="North Star API", version="1.0")
 
@@ -31,9 +41,10 @@ app = FastAPI(title="North Star API", version="1.0")
 AUTO_COLLECT = os.getenv("NORTHSTAR_AUTO_COLLECT", "1") == "1"
 AUTO_SCAN = os.getenv("NORTHSTAR_AUTO_SCAN", "1") == "1"
 AUTO_RETRAIN = os.getenv("NORTHSTAR_AUTO_RETRAIN", "0") == "1"  # default OFF
-COLLECT_INTERVAL_SECONDS = int(os.getenv("NORTHSTAR_COLLECT_INTERVAL", "60"))
+COLLECT_INTERVAL_SECONDS = int(os.getenv("NORTHSTAR_COLLECT_INTERVAL", "60"))  # for sources without interval_seconds
 SCAN_INTERVAL_SECONDS = int(os.getenv("NORTHSTAR_SCAN_INTERVAL", "120"))
 RETRAIN_INTERVAL_SECONDS = int(os.getenv("NORTHSTAR_RETRAIN_INTERVAL", "1800"))  # 30 min
+SSE_HEARTBEAT_SECONDS = float(os.getenv("NORTHSTAR_SSE_HEARTBEAT", "5"))
 
 
 # -----------------------------
@@ -43,6 +54,39 @@ RETRAIN_INTERVAL_SECONDS = int(os.getenv("NORTHSTAR_RETRAIN_INTERVAL", "1800"))
 async def startup():
     init_db()
 
+    # Load ML bundles once up front; every build_alert shares them afterwards
+    try:
+        await asyncio.to_thread(get_models)
+    except Exception as e:
+        print("⚠️ [MODELS] preload failed:", e)
+
+    # SSE fan-out runs on this loop; the replay ring starts with the latest alerts
+    broadcaster.bind_loop(asyncio.get_running_loop())
+    try:
+        await asyncio.to_thread(_seed_stream_replay)
+    except Exception as e:
+        print("⚠️ [STREAM] replay seed failed:", e)
+
+    # Trend rollups for a DB that predates them
+    try:
+        await asyncio.to_thread(_backfill_rollups_if_empty)
+    except Exception as e:
+        print("⚠️ [ROLLUP] backfill failed:", e)
+
+    # Known post hashes, so re-delivered feed items skip the DB lookup
+    try:
+        n = await asyncio.to_thread(_warm_seen_hashes)
+        print(f"🧠 [SEEN] warmed {n} post hashes")
+    except Exception as e:
+        print("⚠️ [SEEN] warm-up failed:", e)
+
+    # Breaker state survives restarts, so dead feeds stay skipped
+    try:
+        n = await asyncio.to_thread(_warm_source_health)
+        print(f"🩺 [HEALTH] loaded {n} source breakers")
+    except Exception as e:
+        print("⚠️ [HEALTH] warm-up failed:", e)
+
     # Background loops (automation)
     if AUTO_COLLECT:
         asyncio.create_task(auto_collector_loop())
@@ -52,11 +96,58 @@ async def startup():
         asyncio.create_task(auto_retrain_loop())
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await async_collector.aclose()
+
+
+def _backfill_rollups_if_empty() -> None:
+    with Session(engine) as session:
+        if session.exec(select(AlertRollup).limit(1)).first() is None and session.exec(select(Alert.id).limit(1)).first() is not None:
+            print(f"📊 [ROLLUP] backfilled {backfill(session)} buckets")
+
+
+def _stream_seed_rows(session: Session) -> list:
+    q = select(Alert).order_by(Alert.id.desc()).limit(SSE_REPLAY_SIZE)
+    return list(iter_alerts_with_posts(session, q))
+
+
+def _seed_stream_replay() -> None:
+    with Session(read_engine) as session:
+        rows = _stream_seed_rows(session)
+    broadcaster.seed(alert_event(a.model_dump(), p) for a, p in reversed(rows))
+
+
+def _warm_seen_hashes() -> int:
+    with Session(read_engine) as session:
+        return seen_hashes.warm(session)
+
+
+def _warm_source_health() -> int:
+    with Session(read_engine) as session:
+        return source_breakers.warm(session)
+
+
 @app.get("/health")
 def health():
     return {"ok": True, "auto": {"collect": AUTO_COLLECT, "scan": AUTO_SCAN, "retrain": AUTO_RETRAIN}}
 
 
+@app.get("/ml/models")
+def ml_models(ok=Depends(require_api_key)):
+    return model_stats()
+
+
+@app.get("/ml/cache")
+def ml_cache(ok=Depends(require_api_key)):
+    return alert_cache.stats()
+
+
+@app.get("/ml/cascade")
+def ml_cascade(ok=Depends(require_api_key)):
+    return cascade.stats()
+
+
 # -----------------------------
 # Live dashboard (HTML)
 # -----------------------------
@@ -111,7 +202,7 @@ def demo_feed():
 # URL -> scrape -> ML -> store -> return
 # -----------------------------
 @app.post("/scan/url")
-def scan_url(payload: dict, ok=Depends(require_api_key), session: Session = Depends(get_session)):
+def scan_url(payload: dict, ok=Depends(require_api_key)):
     url = payload.get("url")
     if not url:
         return {"ok": False, "error": "Missing url"}
@@ -135,16 +226,11 @@ def scan_url(payload: dict, ok=Depends(require_api_key), session: Session = Depe
         return {"ok": False, "url": url, "fetch": {"error": res.error, "used_insecure_ssl": res.used_insecure_ssl}, "alert": alert}
 
     # Store so it appears in /alerts + SSE
-    post_id, alert_id = upsert_post_and_alert(
-        session,
-        source="url_scan",
-        url=url,
-        title=None,
-        author=None,
-        created_at=None,
-        text=res.text,
-        vuln_features=None,
-    )
+    item = {"source": "url_scan", "url": url, "title": None, "author": None, "created_at": None, "text": res.text}
+    try:
+        post_id, alert_id = ingest_queue.submit_posts([item]).result()[0]
+    except IngestQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
     return {
         "ok": True,
@@ -159,25 +245,39 @@ def scan_url(payload: dict, ok=Depends(require_api_key), session: Session = Depe
 # Ingest single post (manual)
 # -----------------------------
 @app.post("/ingest/demo")
-def ingest_demo(payload: dict, ok=Depends(require_api_key), session: Session = Depends(get_session)):
+def ingest_demo(payload: dict, enqueue: bool = False, ok=Depends(require_api_key)):
     created_at = payload.get("created_at")
     dt = None
     if created_at:
         dt = datetime.fromisoformat(created_at.replace("Z", "+00:00")).replace(tzinfo=None)
 
-    post_id, alert_id = upsert_post_and_alert(
-        session,
-        source=payload.get("source", "demo_forum"),
-        url=payload.get("url", "local://demo"),
-        title=payload.get("title"),
-        author=payload.get("author"),
-        created_at=dt,
-        text=payload.get("text", ""),
-        vuln_features=payload.get("vuln_features"),
-    )
+    item = {
+        "source": payload.get("source", "demo_forum"),
+        "url": payload.get("url", "local://demo"),
+        "title": payload.get("title"),
+        "author": payload.get("author"),
+        "created_at": dt,
+        "text": payload.get("text", ""),
+        "vuln_features": payload.get("vuln_features"),
+    }
+    try:
+        fut = ingest_queue.submit_posts([item])
+    except IngestQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # ?enqueue=true: return as soon as the post is queued for the writer
+    if enqueue:
+        return {"queued": True, "queue_depth": ingest_queue.depth()}
+
+    post_id, alert_id = fut.result()[0]
     return {"post_id": post_id, "alert_id": alert_id}
 
 
+@app.get("/ingest/queue")
+def ingest_queue_stats(ok=Depends(require_api_key)):
+    return ingest_queue.stats()
+
+
 # -----------------------------
 # Sources + Collector (manual trigger)
 # -----------------------------
@@ -186,89 +286,227 @@ def list_sources(ok=Depends(require_api_key)):
     return {"sources": load_sources_yaml()}
 
 
-@app.post("/collect/run")
-def collect_run(ok=Depends(require_api_key), session: Session = Depends(get_session)):
-    run = Run(kind="collect", started_at=datetime.utcnow(), stats_json={})
-    session.add(run)
-    session.commit()
-    session.refresh(run)
+@app.get("/collect/seen")
+def collect_seen(ok=Depends(require_api_key)):
+    return seen_hashes.stats()
 
-    inserted_posts = 0
-    created_alerts = 0
-    errors = []
 
-    for cfg in load_sources_yaml():
-        if not cfg.get("enabled", True):
-            continue
-        try:
-            posts = collect_source(cfg)
-            normalized = normalize_posts(posts)
-            for p in normalized:
-                _post_id, alert_id = upsert_post_and_alert(
-                    session,
-                    source=p["source"],
-                    url=p["url"],
-                    title=p["title"],
-                    author=p["author"],
-                    created_at=p["created_at"],
-                    text=p["text"],
-                    vuln_features=cfg.get("vuln_features"),
-                )
-                if alert_id != -1:
-                    inserted_posts += 1
-                    created_alerts += 1
-        except Exception as e:
-            errors.append({"source": cfg.get("name"), "error": str(e)})
+@app.get("/collect/stats")
+def collect_stats(ok=Depends(require_api_key)):
+    return async_collector.stats()
+
+
+@app.get("/collect/health")
+def collect_health(ok=Depends(require_api_key)):
+    """Circuit breaker state, success rate and fetch latency per source."""
+    return source_breakers.stats()
+
+
+@app.get("/collect/schedule")
+def collect_schedule(ok=Depends(require_api_key)):
+    """Next run and last duration per source (background collector)."""
+    return collect_scheduler.stats()
+
+
+_collect_lock = asyncio.Lock()
+collect_scheduler = SourceScheduler(COLLECT_INTERVAL_SECONDS)
+
+
+def _load_cursors() -> dict:
+    with Session(read_engine) as session:
+        return load_cursors(session)
+
+
+def _load_last_runs() -> dict:
+    with Session(read_engine) as session:
+        return {name: at for name, at in session.execute(select(Source.name, Source.last_run_at)) if at}
 
-    run.ended_at = datetime.utcnow()
-    run.stats_json = {"inserted_posts": inserted_posts, "created_alerts": created_alerts, "errors": errors}
-    session.add(run)
-    session.commit()
 
-    return {"ok": True, "inserted_posts": inserted_posts, "created_alerts": created_alerts, "errors": errors}
+def _source_rows(sources: list, cursors: dict) -> list:
+    with Session(read_engine) as session:
+        return source_rows(session, sources, cursors)
+
+
+async def _collect_cycle(kind: str, names: list | None = None) -> dict:
+    """
+    Fetch all enabled sources (or just names) concurrently, with conditional
+    GETs from each source's cursor, queue their new posts, then persist the
+    advanced cursors and breaker state together with the Run row.
+    """
+    async with _collect_lock:
+        started_at = datetime.utcnow()
+        inserted_posts = 0
+        created_alerts = 0
+        errors = []
+        redelivered = {}
+        new_cursors = {}
+
+        sources = load_sources_yaml()
+        if names is not None:
+            sources = [c for c in sources if c.get("name") in names]
+        cfgs = {c.get("name"): c for c in sources}
+
+        # open breakers are skipped; a half-open probe gets one attempt, no retries
+        circuit_open = [c.get("name") for c in sources if c.get("enabled", True) and not source_breakers.allow(c.get("name"))]
+        fetch = [
+            {**c, "retries": 0} if source_breakers.is_probe(c.get("name")) else c
+            for c in sources
+            if c.get("name") not in circuit_open
+        ]
+        results = await async_collector.collect_all(fetch, await asyncio.to_thread(_load_cursors))
+        for res in results:
+            source_breakers.record(res.name, res.error is None, res.seconds, res.error)
+        for res in results:
+            if res.error:
+                errors.append({"source": res.name, "error": res.error})
+                continue
+            try:
+                if res.posts:
+                    normalized = normalize_posts(res.posts)
+                    vuln_features = (cfgs.get(res.name) or {}).get("vuln_features")
+                    # submit blocks while the queue is full; keep that off the event loop
+                    fut = await asyncio.to_thread(ingest_queue.submit_posts, normalized, vuln_features=vuln_features, redelivered=redelivered)
+                    for _post_id, alert_id in await asyncio.wrap_future(fut):
+                        if alert_id != -1:
+                            inserted_posts += 1
+                            created_alerts += 1
+                # only advance past items that are stored
+                if res.cursor is not None:
+                    new_cursors[res.name] = res.cursor
+            except Exception as e:
+                errors.append({"source": res.name, "error": str(e)})
+
+        stats = {
+            "inserted_posts": inserted_posts,
+            "created_alerts": created_alerts,
+            "redelivered": redelivered,
+            "errors": errors,
+            "seconds": {r.name: round(r.seconds, 3) for r in results},
+            "not_modified": [r.name for r in results if r.not_modified],
+            "bytes_fetched": {r.name: r.bytes for r in results if not r.error},
+            "bytes_saved": {r.name: r.bytes_saved for r in results if r.not_modified},
+            "skipped_by_cursor": {r.name: r.skipped for r in results if r.skipped},
+            "circuit_open": circuit_open,
+        }
+        rows = await asyncio.to_thread(_source_rows, sources, new_cursors) if new_cursors else []
+        rows += source_breakers.rows(r.name for r in results)
+        rows.append(Run(kind=kind, started_at=started_at, ended_at=datetime.utcnow(), stats_json=stats))
+        await asyncio.wrap_future(await asyncio.to_thread(ingest_queue.submit_rows, rows))
+        return stats
+
+
+@app.post("/collect/run")
+async def collect_run(ok=Depends(require_api_key)):
+    stats = await _collect_cycle("collect")
+    return {"ok": True, **stats}
 
 
 # -----------------------------
 # Alerts API
 # -----------------------------
+ALERTS_DEFAULT_LIMIT = 200
+ALERTS_MAX_LIMIT = 1000
+ALERT_FIELDS = {
+    "id", "score", "sector", "category", "intent", "intent_confidence", "status",
+    "created_at", "post", "asset_id", "vuln_risk", "classified_by",
+}
+
+
+def _parse_iso(value: str | None, name: str) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"invalid {name}: {value!r}")
+
+
+def _classified_by(a: Alert) -> str:
+    # "cascade": the noise cascade labelled it without running the models
+    return (a.score_reasons or {}).get("method") or "model"
+
+
 @app.get("/alerts")
-def list_alerts(min_score: float = 0.0, session: Session = Depends(get_session)):
-    q = select(Alert).where(Alert.score >= min_score).order_by(Alert.created_at.desc())
-    alerts = session.exec(q).all()
+def list_alerts(
+    min_score: float = 0.0,
+    limit: int = ALERTS_DEFAULT_LIMIT,
+    cursor: str | None = None,
+    sector: str | None = None,
+    category: str | None = None,
+    intent: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    fields: str | None = None,
+    session: Session = Depends(get_read_session),
+):
+    """
+    Newest first, one page at a time: pass back next_cursor to continue.
+    Filters map onto indexed Alert columns; fields is a comma list of keys
+    to return (id is always included).
+    """
+    limit = max(1, min(limit, ALERTS_MAX_LIMIT))
+    wanted = None
+    if fields:
+        wanted = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = wanted - ALERT_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"unknown fields: {sorted(unknown)}")
+        wanted.add("id")
+
+    q = select(Alert).where(Alert.score >= min_score)
+    if sector:
+        q = q.where(Alert.sector == sector)
+    if category:
+        q = q.where(Alert.category == category)
+    if intent:
+        q = q.where(Alert.intent == intent)
+    if status:
+        q = q.where(Alert.status == status)
+    since_dt, until_dt = _parse_iso(since, "since"), _parse_iso(until, "until")
+    if since_dt:
+        q = q.where(Alert.created_at >= since_dt)
+    if until_dt:
+        q = q.where(Alert.created_at < until_dt)
+    try:
+        q = after_cursor(q, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # one extra row tells whether another page exists
+    q = q.limit(limit + 1)
+
+    rows = list(iter_alerts_with_posts(session, q))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
     out = []
-    for a in alerts:
-        p = session.get(Post, a.post_id) if a.post_id else None
-        out.append(
-            {
-                "id": a.id,
-                "score": a.score,
-                "sector": a.sector,
-                "category": a.category,
-                "intent": a.intent,
-                "intent_confidence": a.intent_confidence,
-                "status": a.status,
-                "created_at": a.created_at.isoformat(timespec="seconds"),
-                "post": {
-                    "id": p.id if p else None,
-                    "source": p.source if p else None,
-                    "url": p.url if p else None,
-                    "title": p.title if p else None,
-                }
-                if p
-                else None,
-                "asset_id": a.asset_id,
-                "vuln_risk": {"score": a.vuln_risk_score, "method": a.vuln_risk_method} if a.vuln_risk_score is not None else None,
-            }
-        )
-    return {"alerts": out}
+    for a, p in rows:
+        item = {
+            "id": a.id,
+            "score": a.score,
+            "sector": a.sector,
+            "category": a.category,
+            "intent": a.intent,
+            "intent_confidence": a.intent_confidence,
+            "status": a.status,
+            "created_at": a.created_at.isoformat(timespec="seconds"),
+            "post": p,
+            "asset_id": a.asset_id,
+            "vuln_risk": {"score": a.vuln_risk_score, "method": a.vuln_risk_method} if a.vuln_risk_score is not None else None,
+            "classified_by": _classified_by(a),
+        }
+        if wanted is not None:
+            item = {k: v for k, v in item.items() if k in wanted}
+        out.append(item)
+
+    next_cursor = encode_cursor(rows[-1][0].created_at, rows[-1][0].id) if has_more else None
+    return {"alerts": out, "next_cursor": next_cursor}
 
 
 @app.get("/top")
-def top_threats(limit: int = 5, session: Session = Depends(get_session)):
-    alerts = session.exec(select(Alert).order_by(Alert.score.desc()).limit(limit)).all()
+def top_threats(limit: int = 5, session: Session = Depends(get_read_session)):
     out = []
-    for a in alerts:
-        p = session.get(Post, a.post_id) if a.post_id else None
+    for a, p in iter_alerts_with_posts(session, select(Alert).order_by(Alert.score.desc()).limit(limit)):
         out.append(
             {
                 "id": a.id,
@@ -277,25 +515,22 @@ def top_threats(limit: int = 5, session: Session = Depends(get_session)):
                 "category": a.category,
                 "intent": a.intent,
                 "created_at": a.created_at.isoformat(timespec="seconds"),
-                "title": (p.title if p else None),
-                "url": (p.url if p else None),
-                "source": (p.source if p else None),
+                "title": (p["title"] if p else None),
+                "url": (p["url"] if p else None),
+                "source": (p["source"] if p else None),
                 "asset_id": a.asset_id,
+                "classified_by": _classified_by(a),
             }
         )
     return {"top": out}
 
 
 @app.get("/trends")
-def trends(days: int = 7, session: Session = Depends(get_session)):
+def trends(days: int = 7, session: Session = Depends(get_read_session)):
+    # precomputed day x sector x category buckets (AlertRollup), whole UTC days;
+    # alert counts only, so near-dup score boosts do not show here
     since = datetime.utcnow() - timedelta(days=days)
-    alerts = session.exec(select(Alert).where(Alert.created_at >= since)).all()
-    by_day, by_sector, by_category = {}, {}, {}
-    for a in alerts:
-        d = a.created_at.date().isoformat()
-        by_day[d] = by_day.get(d, 0) + 1
-        by_sector[a.sector] = by_sector.get(a.sector, 0) + 1
-        by_category[a.category] = by_category.get(a.category, 0) + 1
+    by_day, by_sector, by_category = trend_counts(session, since.date())
     return {"range_days": days, "alerts_per_day": by_day, "sector_counts": by_sector, "category_counts": by_category}
 
 
@@ -317,21 +552,19 @@ def add_asset(payload: dict, ok=Depends(require_api_key), session: Session = Dep
 
 
 @app.get("/assets")
-def list_assets(ok=Depends(require_api_key), session: Session = Depends(get_session)):
+def list_assets(ok=Depends(require_api_key), session: Session = Depends(get_read_session)):
     assets = session.exec(select(Asset).order_by(Asset.created_at.desc())).all()
     return {"assets": [a.model_dump() for a in assets]}
 
 
 @app.post("/scan/run")
 def scan_run(ok=Depends(require_api_key), session: Session = Depends(get_session)):
-    run = Run(kind="scan", started_at=datetime.utcnow(), stats_json={})
-    session.add(run)
-    session.commit()
-    session.refresh(run)
+    started_at = datetime.utcnow()
 
     assets = session.exec(select(Asset).where(Asset.active == True)).all()
     created_alerts = 0
     findings_written = 0
+    rows = []  # written by the ingest writer in one batch
 
     for a in assets:
         if a.kind != "url":
@@ -346,21 +579,19 @@ def scan_run(ok=Depends(require_api_key), session: Session = Depends(get_session
                 severity=min(10, 3 + len(res.missing_headers)),
                 evidence_json={"missing": res.missing_headers, "status": res.http_status, "url": res.url},
             )
-            session.add(sf)
+            rows.append(sf)
             findings_written += 1
 
         if res.tls_days_left is not None and res.tls_days_left <= 14:
             sf = ScanFinding(asset_id=a.id, type="tls_expiring_soon", severity=8, evidence_json={"tls_days_left": res.tls_days_left, "url": res.url})
-            session.add(sf)
+            rows.append(sf)
             findings_written += 1
 
         if res.server_header:
             sf = ScanFinding(asset_id=a.id, type="server_disclosure", severity=4, evidence_json={"server": res.server_header, "url": res.url})
-            session.add(sf)
+            rows.append(sf)
             findings_written += 1
 
-        session.commit()
-
         if res.missing_headers or (res.tls_days_left is not None and res.tls_days_left <= 14):
             vuln_features = {
                 "cvss": 6.8 if res.missing_headers else 7.5,
@@ -390,14 +621,15 @@ def scan_run(ok=Depends(require_api_key), session: Session = Depends(get_session
                 vuln_risk_score=float(alert_obj["vuln_risk"]["score"]) if alert_obj.get("vuln_risk") else None,
                 vuln_risk_method=alert_obj.get("vuln_risk", {}).get("method") if alert_obj.get("vuln_risk") else None,
             )
-            session.add(al)
-            session.commit()
+            rows.append(al)
             created_alerts += 1
 
-    run.ended_at = datetime.utcnow()
-    run.stats_json = {"assets": len(assets), "created_alerts": created_alerts, "findings_written": findings_written}
-    session.add(run)
-    session.commit()
+    stats = {"assets": len(assets), "created_alerts": created_alerts, "findings_written": findings_written}
+    rows.append(Run(kind="scan", started_at=started_at, ended_at=datetime.utcnow(), stats_json=stats))
+    try:
+        ingest_queue.submit_rows(rows).result()
+    except IngestQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
     return {"ok": True, "assets": len(assets), "created_alerts": created_alerts, "findings_written": findings_written}
 
@@ -406,7 +638,7 @@ def scan_run(ok=Depends(require_api_key), session: Session = Depends(get_session
 # Reports
 # -----------------------------
 @app.get("/report/html")
-def report_html(days: int = 7, ok=Depends(require_api_key), session: Session = Depends(get_session)):
+def report_html(days: int = 7, ok=Depends(require_api_key), session: Session = Depends(get_read_session)):
     ctx = build_report_context(session, days=days, limit=80)
     tpl = Template(Path("backend/app/templates/report.html").read_text(encoding="utf-8"))
     return HTMLResponse(tpl.render(**ctx))
@@ -416,101 +648,98 @@ def report_html(days: int = 7, ok=Depends(require_api_key), session: Session = D
 # SSE stream (live dashboard)
 # -----------------------------
 @app.get("/alerts/stream")
-def alerts_stream():
-    def gen():
-        last_id = 0
-        last_hb = 0.0
-        yield "event: hello\ndata: {}\n\n"
-
-        while True:
-            with Session(engine) as session:
-                new_alerts = session.exec(select(Alert).where(Alert.id > last_id).order_by(Alert.id.asc())).all()
-                for a in new_alerts:
-                    p = session.get(Post, a.post_id) if a.post_id else None
-                    payload = {
-                        "id": a.id,
-                        "score": a.score,
-                        "sector": a.sector,
-                        "category": a.category,
-                        "intent": a.intent,
-                        "created_at": a.created_at.isoformat(timespec="seconds"),
-                        "title": (p.title if p else None) or (f"Scan alert: asset {a.asset_id}" if a.asset_id else None),
-                        "url": (p.url if p else None),
-                        "source": (p.source if p else None),
-                        "asset_id": a.asset_id,
-                    }
-                    last_id = a.id
-                    yield f"event: alert\ndata: {json.dumps(payload)}\n\n"
+async def alerts_stream(request: Request):
+    # resume after the last alert the browser saw (EventSource sends it on reconnect)
+    last_event_id = request.headers.get("last-event-id")
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
 
-            now = time.time()
-            if now - last_hb >= 5:
-                last_hb = now
-                yield f": heartbeat {int(now)}\n\n"
+    sub, backlog = broadcaster.subscribe(last_id)
 
-            time.sleep(1)
+    async def gen():
+        try:
+            yield "retry: 2000\nevent: hello\ndata: {}\n\n"
+            for ev in backlog:
+                yield f"id: {ev.id}\nevent: alert\ndata: {ev.data}\n\n"
+
+            while True:
+                try:
+                    ev = await asyncio.wait_for(sub.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield f": heartbeat {int(time.time())}\n\n"
+                    continue
+                if ev is None:
+                    # dropped as a slow consumer; the browser reconnects with Last-Event-ID
+                    return
+                # ids can arrive out of order (concurrent writers); only skip what the backlog already sent
+                if not sub.unseen(ev):
+                    continue
+                yield f"id: {ev.id}\nevent: alert\ndata: {ev.data}\n\n"
+        finally:
+            broadcaster.unsubscribe(sub)
 
     return StreamingResponse(gen(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "Connection": "keep-alive"})
 
 
+@app.get("/alerts/stream/stats")
+def alerts_stream_stats(ok=Depends(require_api_key)):
+    return broadcaster.stats()
+
+
 # =============================
 # AUTOMATION LOOPS (Background)
 # =============================
 async def auto_collector_loop():
     # Wait for app boot
     await asyncio.sleep(3)
+    try:
+        last_runs = await asyncio.to_thread(_load_last_runs)
+    except Exception as e:
+        print("⚠️ [AUTO_COLLECT] could not load last runs:", e)
+        last_runs = {}
     while True:
         try:
-            with Session(engine) as session:
-                inserted = 0
-                created = 0
-                errors = []
-
-                for cfg in load_sources_yaml():
-                    if not cfg.get("enabled", True):
-                        continue
-                    try:
-                        posts = collect_source(cfg)
-                        normalized = normalize_posts(posts)
-                        for p in normalized:
-                            _post_id, alert_id = upsert_post_and_alert(
-                                session,
-                                source=p["source"],
-                                url=p["url"],
-                                title=p["title"],
-                                author=p["author"],
-                                created_at=p["created_at"],
-                                text=p["text"],
-                                vuln_features=cfg.get("vuln_features"),
-                            )
-                            if alert_id != -1:
-                                inserted += 1
-                                created += 1
-                    except Exception as e:
-                        errors.append({"source": cfg.get("name"), "error": str(e)})
-
-                # log a Run row so you can show “continuous monitoring”
-                run = Run(kind="auto_collect", started_at=datetime.utcnow(), ended_at=datetime.utcnow(), stats_json={"inserted_posts": inserted, "created_alerts": created, "errors": errors})
-                session.add(run)
-                session.commit()
+            collect_scheduler.sync(load_sources_yaml(), last_runs)
+            due = collect_scheduler.pop_due()
+            if due:
+                try:
+                    stats = await _collect_cycle("auto_collect", due)
+                except Exception:
+                    for name in due:
+                        collect_scheduler.done(name, 0.0, "cycle failed")
+                    raise
+                failed = {e["source"]: e["error"] for e in stats["errors"]}
+                for name in due:
+                    collect_scheduler.done(name, stats["seconds"].get(name, 0.0), failed.get(name))
+                inserted, created, errors = stats["inserted_posts"], stats["created_alerts"], stats["errors"]
 
                 if inserted or created:
-                    print(f"🚀 [AUTO_COLLECT] inserted={inserted} alerts={created}")
+                    print(f"🚀 [AUTO_COLLECT] {','.join(due)} inserted={inserted} alerts={created}")
                 if errors:
                     print(f"⚠️ [AUTO_COLLECT] errors={len(errors)}")
+                if stats["circuit_open"]:
+                    print(f"⛔ [AUTO_COLLECT] circuit open, skipped: {', '.join(stats['circuit_open'])}")
+                if stats["not_modified"]:
+                    print(f"💤 [AUTO_COLLECT] not modified: {', '.join(stats['not_modified'])} ({sum(stats['bytes_saved'].values())} bytes saved)")
 
         except Exception as e:
             print("❌ [AUTO_COLLECT] fatal:", e)
 
-        await asyncio.sleep(COLLECT_INTERVAL_SECONDS)
+        await asyncio.sleep(collect_scheduler.seconds_until_next())
 
 
 async def auto_scan_loop():
     await asyncio.sleep(5)
     while True:
         try:
-            with Session(engine) as session:
+            with Session(read_engine) as session:
                 assets = session.exec(select(Asset).where(Asset.active == True)).all()
                 created_alerts = 0
+                rows = []
 
                 for a in assets:
                     if a.kind != "url":
@@ -549,17 +778,14 @@ async def auto_scan_loop():
                         vuln_risk_score=float(alert_obj["vuln_risk"]["score"]) if alert_obj.get("vuln_risk") else None,
                         vuln_risk_method=alert_obj.get("vuln_risk", {}).get("method") if alert_obj.get("vuln_risk") else None,
                     )
-                    session.add(al)
+                    rows.append(al)
                     created_alerts += 1
 
+                rows.append(Run(kind="auto_scan", started_at=datetime.utcnow(), ended_at=datetime.utcnow(), stats_json={"assets": len(assets), "created_alerts": created_alerts}))
+                await asyncio.wrap_future(await asyncio.to_thread(ingest_queue.submit_rows, rows))
                 if created_alerts:
-                    session.commit()
                     print(f"🛰️ [AUTO_SCAN] created_alerts={created_alerts}")
 
-                run = Run(kind="auto_scan", started_at=datetime.utcnow(), ended_at=datetime.utcnow(), stats_json={"assets": len(assets), "created_alerts": created_alerts})
-                session.add(run)
-                session.commit()
-
         except Exception as e:
             print("❌ [AUTO_SCAN] fatal:", e)
 
@@ -579,6 +805,8 @@ async def auto_retrain_loop():
 
             subprocess.run(["python", "ml/train_intent.py"], check=False)
             subprocess.run(["python", "ml/train_sector.py"], check=False)
+            subprocess.run(["python", "-m", "ml.export_linear"], check=False)
+            await asyncio.to_thread(reload_models)
             print("🧠 [AUTO_RETRAIN] done")
         except Exception as e:
             print("❌ [AUTO_RETRAIN] fatal:", e)
@@ -2,7 +2,11 @@ from __future__ import annotations
 from typing import Optional
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Column
-from sqlalchemy import JSON
+from sqlalchemy import JSON, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSONB on Postgres (indexable, binary), generic JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
 
 class Source(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -63,19 +67,51 @@ class Alert(SQLModel, table=True):
     intent_confidence: float
 
     score: float = Field(index=True)
-    score_reasons: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    score_reasons: dict = Field(default_factory=dict, sa_column=Column(JSONType))
     status: str = Field(default="open", index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     vuln_risk_score: Optional[float] = None
     vuln_risk_method: Optional[str] = None
 
+class AlertRollup(SQLModel, table=True):
+    # alert counts per day x sector x category, maintained on insert (see rollups.py)
+    day: str = Field(primary_key=True)  # YYYY-MM-DD (UTC)
+    sector: str = Field(primary_key=True)
+    category: str = Field(primary_key=True)
+    count: int = 0
+
+class PostSimhash(SQLModel, table=True):
+    # near-duplicate index: 64-bit SimHash of normalized text split in 4 x 16-bit bands
+    post_id: int = Field(primary_key=True)
+    simhash: int = Field(sa_column=Column(BigInteger, nullable=False))  # signed 64-bit (INTEGER is 32-bit on Postgres)
+    band0: int = Field(index=True)
+    band1: int = Field(index=True)
+    band2: int = Field(index=True)
+    band3: int = Field(index=True)
+    cluster_id: int = Field(index=True)  # post_id of the cluster's first post
+
+class SourceHealth(SQLModel, table=True):
+    # per-source circuit breaker + fetch health (see source_health.py)
+    name: str = Field(primary_key=True)
+    state: str = "closed"  # closed|open|half_open
+    consecutive_failures: int = 0
+    open_count: int = 0  # opens since the last success; sets the probe backoff
+    next_probe_at: Optional[datetime] = None
+    successes: int = 0
+    failures: int = 0
+    latency_ms_avg: Optional[float] = None  # EWMA over successful fetches
+    latency_ms_last: Optional[float] = None
+    last_error: Optional[str] = None
+    last_success_at: Optional[datetime] = None
+    last_failure_at: Optional[datetime] = None
+
 class Run(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     kind: str = Field(index=True)  # collect|scan
     started_at: datetime = Field(default_factory=datetime.utcnow)
     ended_at: Optional[datetime] = None
-    stats_json: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    stats_json: dict = Field(default_factory=dict, sa_column=Column(JSONType))
 
 # ---------------------------
 # Passive scanning (allowlist)
@@ -86,7 +122,7 @@ class Asset(SQLModel, table=True):
     kind: str = Field(default="url", index=True)  # url|ip
     value: str = Field(index=True, unique=True)
     owner: Optional[str] = None
-    tags: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    tags: dict = Field(default_factory=dict, sa_column=Column(JSONType))
     active: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -96,4 +132,4 @@ class ScanFinding(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     type: str = Field(index=True)  # missing_header|tls_expiring|server_disclosure|http_redirect etc.
     severity: int = Field(index=True)  # 1..10
-    evidence_json: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    evidence_json: dict = Field(default_factory=dict, sa_column=Column(JSONType))
@@ -0,0 +1,226 @@
+# backend/app/near_dup.py
+# Index posts that predate PostSimhash, from repo root: python -m backend.app.near_dup
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlmodel import Session, select
+
+from backend.app.models import Alert, Post, PostSimhash
+
+# default OFF: a linked repost skips ML and shares its cluster's alert
+NEAR_DUP_ENABLED = os.getenv("NORTHSTAR_NEAR_DUP", "0") == "1"
+# 4 bands of 16 bits: any two hashes within 3 bits share at least one band
+NEAR_DUP_MAX_DISTANCE = min(3, int(os.getenv("NORTHSTAR_NEAR_DUP_DISTANCE", "3")))
+NEAR_DUP_MIN_TOKENS = int(os.getenv("NORTHSTAR_NEAR_DUP_MIN_TOKENS", "12"))
+
+SHINGLE = 3
+BANDS = 4
+REPOST_BOOST_PER_POST = 3.0
+REPOST_BOOST_MAX = 12.0
+
+_TOKEN_RE = re.compile(r"\w+")
+_BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+def _to_signed(v: int) -> int:
+    return v - (1 << 64) if v >= (1 << 63) else v
+
+
+def _to_unsigned(v: int) -> int:
+    return v + (1 << 64) if v < 0 else v
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash over word 3-shingles of lowercased text. Returns None for
+    texts too short to fingerprint reliably (they would collide with any
+    other short chatter).
+    """
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < NEAR_DUP_MIN_TOKENS:
+        return None
+    shingles = {" ".join(tokens[i:i + SHINGLE]) for i in range(len(tokens) - SHINGLE + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    # per-bit vote: +1 where the shingle hash has the bit set, -1 otherwise
+    ones = ((hashes[:, None] & _BITS) != 0).sum(axis=0)
+    bits = ones * 2 > len(hashes)
+    return int((_BITS[bits]).sum(dtype=np.uint64))
+
+
+def bands(h: int) -> Tuple[int, ...]:
+    return tuple((h >> (16 * i)) & 0xFFFF for i in range(BANDS))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def index_row(post_id: int, h: int, cluster_id: int) -> dict:
+    b = bands(h)
+    return dict(post_id=post_id, simhash=_to_signed(h), band0=b[0], band1=b[1], band2=b[2], band3=b[3], cluster_id=cluster_id)
+
+
+def find_clusters(session: Session, sigs: Dict[Hashable, int], sources: Dict[Hashable, str]) -> Dict[Hashable, int]:
+    """
+    key -> cluster_id of the closest indexed post from the same source
+    (sources[key]) within NEAR_DUP_MAX_DISTANCE. Candidates come from the
+    indexed band columns (one query per chunk), so cost depends on bucket
+    sizes, not on the size of the Post table.
+    """
+    if not sigs:
+        return {}
+    cols = [PostSimhash.band0, PostSimhash.band1, PostSimhash.band2, PostSimhash.band3]
+    keys = list(sigs)
+
+    candidates: List[Tuple[int, int, str]] = []
+    for i in range(0, len(keys), 200):
+        chunk = keys[i:i + 200]
+        per_band = [sorted({bands(sigs[k])[b] for k in chunk}) for b in range(BANDS)]
+        q = (
+            select(PostSimhash.simhash, PostSimhash.cluster_id, Post.source)
+            .join(Post, Post.id == PostSimhash.post_id)
+            .where(or_(*[col.in_(vals) for col, vals in zip(cols, per_band)]))
+            .where(Post.source.in_(sorted({sources[k] for k in chunk})))
+        )
+        for sh, cid, source in session.exec(q):
+            candidates.append((_to_unsigned(sh), cid, source))
+
+    by_band: List[Dict[int, List[Tuple[int, int, str]]]] = [{} for _ in range(BANDS)]
+    for h, cid, source in candidates:
+        for i, b in enumerate(bands(h)):
+            by_band[i].setdefault(b, []).append((h, cid, source))
+
+    out: Dict[Hashable, int] = {}
+    for key, h in sigs.items():
+        best = None
+        for i, b in enumerate(bands(h)):
+            for ch, cid, source in by_band[i].get(b, ()):
+                d = hamming(h, ch)
+                if source == sources[key] and d <= NEAR_DUP_MAX_DISTANCE and (best is None or d < best[0]):
+                    best = (d, cid)
+        if best is not None:
+            out[key] = best[1]
+    return out
+
+
+def assign_clusters(
+    session: Session, sigs: Dict[Hashable, int], sources: Dict[Hashable, str]
+) -> Tuple[Dict[Hashable, int], Dict[Hashable, Hashable], Dict[int, int]]:
+    """
+    Split fingerprinted keys (in order) into reposts of an indexed cluster
+    that has an alert (key -> cluster_id), reposts of an earlier key of the
+    same batch (key -> that key) and new roots (in neither). Only posts from
+    the same source are linked. Also returns cluster_id -> alert id.
+    """
+    found = find_clusters(session, sigs, sources)
+    alerts = cluster_alerts(session, list(set(found.values())))
+    linked: Dict[Hashable, int] = {}
+    linked_batch: Dict[Hashable, Hashable] = {}
+    roots: List[Hashable] = []
+    for key, h in sigs.items():
+        cid = found.get(key)
+        if cid is not None and cid in alerts:
+            linked[key] = cid
+            continue
+        for rk in roots:
+            if sources[rk] == sources[key] and hamming(h, sigs[rk]) <= NEAR_DUP_MAX_DISTANCE:
+                linked_batch[key] = rk
+                break
+        else:
+            roots.append(key)
+    return linked, linked_batch, alerts
+
+
+def cluster_alerts(session: Session, cluster_ids: List[int]) -> Dict[int, int]:
+    """cluster_id -> latest alert id of the cluster's first post."""
+    if not cluster_ids:
+        return {}
+    q = select(Alert.post_id, func.max(Alert.id)).where(Alert.post_id.in_(cluster_ids)).group_by(Alert.post_id)
+    return {pid: aid for pid, aid in session.exec(q)}
+
+
+def cluster_sizes(session: Session, cluster_ids: List[int]) -> Dict[int, int]:
+    if not cluster_ids:
+        return {}
+    q = select(PostSimhash.cluster_id, func.count()).where(PostSimhash.cluster_id.in_(cluster_ids)).group_by(PostSimhash.cluster_id)
+    return {cid: n for cid, n in session.exec(q)}
+
+
+def boost_alert(alert: Alert, reposts: int) -> None:
+    """
+    Raise a cluster alert for reposts instead of creating a new one:
+    +3 per repost up to +12 on top of the original score. Noise stays capped.
+    Only score and score_reasons change: the alert keeps its AlertRollup
+    bucket (day x sector x category), so /trends needs no adjustment.
+    """
+    if alert.category == "noise":
+        return
+    reasons = dict(alert.score_reasons or {})
+    base = float(reasons.setdefault("base_score", float(alert.score)))
+    boost = min(REPOST_BOOST_MAX, REPOST_BOOST_PER_POST * reposts)
+    alert.score = max(0.0, min(100.0, base + boost))
+    lines = [r for r in reasons.get("reasons", []) if not str(r).startswith("Reposted ")]
+    lines.append(f"Reposted {reposts}x as near-duplicate (+{boost:.1f})")
+    reasons["reasons"] = lines
+    reasons["reposts"] = reposts
+    reasons["repost_boost"] = boost
+    alert.score_reasons = reasons
+
+
+def backfill(session: Session, chunk: int = 1000) -> int:
+    """
+    Fingerprint posts missing from PostSimhash (ingested before it existed),
+    oldest first, clustering them like new posts; alerts are left as they
+    are. Commits per chunk. Returns the number of posts indexed.
+    """
+    last_id = 0
+    indexed = 0
+    while True:
+        q = (
+            select(Post.id, Post.source, Post.text)
+            .outerjoin(PostSimhash, PostSimhash.post_id == Post.id)
+            .where(PostSimhash.post_id.is_(None), Post.id > last_id)
+            .order_by(Post.id)
+            .limit(chunk)
+        )
+        rows = session.exec(q).all()
+        if not rows:
+            return indexed
+        last_id = rows[-1][0]
+
+        sigs: Dict[Hashable, int] = {}
+        sources: Dict[Hashable, str] = {}
+        for pid, source, text in rows:
+            sig = simhash(text)
+            if sig is not None:
+                sigs[pid], sources[pid] = sig, source
+        linked, linked_batch, _ = assign_clusters(session, sigs, sources)
+        session.add_all(
+            PostSimhash(**index_row(pid, sig, linked.get(pid) or linked_batch.get(pid, pid)))
+            for pid, sig in sigs.items()
+        )
+        session.commit()
+        indexed += len(sigs)
+
+
+def main():
+    from backend.app.db import engine, init_db
+
+    init_db()
+    with Session(engine) as session:
+        n = backfill(session)
+    print(f"PostSimhash backfilled: {n} posts indexed")
+
+
+if __name__ == "__main__":
+    main()
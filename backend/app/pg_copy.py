@@ -0,0 +1,61 @@
+# backend/app/pg_copy.py
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import JSON, text
+from sqlmodel import Session, SQLModel
+
+PG_COPY_ENABLED = os.getenv("NORTHSTAR_PG_COPY", "1") == "1"
+PG_COPY_MIN_ROWS = int(os.getenv("NORTHSTAR_PG_COPY_MIN_ROWS", "20"))
+
+
+def has_copy(session: Session) -> bool:
+    # cursor.copy() is psycopg 3 (postgresql+psycopg://); plain postgresql:// is psycopg2
+    dialect = session.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg"
+
+
+def use_copy(session: Session, rows: List[Dict[str, Any]]) -> bool:
+    # small batches are cheaper as one multi-row INSERT than a COPY round trip;
+    # other Postgres drivers fall back to that INSERT too
+    return PG_COPY_ENABLED and len(rows) >= PG_COPY_MIN_ROWS and has_copy(session)
+
+
+def _reserve_ids(session: Session, table: str, n: int) -> List[int]:
+    q = text("SELECT nextval(pg_get_serial_sequence(:t, 'id')) FROM generate_series(1, :n)")
+    return [r[0] for r in session.execute(q, {"t": table, "n": n})]
+
+
+def copy_insert(
+    session: Session,
+    model: Type[SQLModel],
+    rows: List[Dict[str, Any]],
+    *,
+    want_ids: bool = False,
+) -> Optional[List[int]]:
+    """
+    COPY rows into model's table inside the session's transaction (psycopg 3).
+    With want_ids, ids are drawn from the table's sequence first and written
+    explicitly, since COPY cannot return them; they come back in row order.
+    """
+    table = model.__table__
+    ids = None
+    if want_ids:
+        ids = _reserve_ids(session, table.name, len(rows))
+        rows = [{**r, "id": i} for r, i in zip(rows, ids)]
+
+    cols = [c for c in table.columns if c.name in rows[0]]
+    json_cols = {c.name for c in cols if isinstance(c.type, JSON)}
+    names = [c.name for c in cols]
+
+    raw = session.connection().connection.dbapi_connection
+    column_list = ", ".join(f'"{n}"' for n in names)
+    with raw.cursor() as cur:
+        stmt = f'COPY "{table.name}" ({column_list}) FROM STDIN'
+        with cur.copy(stmt) as cp:
+            for r in rows:
+                cp.write_row([json.dumps(r[n]) if n in json_cols and r[n] is not None else r[n] for n in names])
+    return ids
@@ -1,10 +1,18 @@
 from __future__ import annotations
+from dataclasses import asdict
 from datetime import datetime
+from sqlalchemy import func, insert
 from sqlmodel import Session, select
-from backend.app.models import Post, Alert, Finding, Entity
+from backend.app.broadcaster import alert_event, broadcaster
+from backend.app.models import Post, Alert, Finding, Entity, PostSimhash
+from backend.app.near_dup import NEAR_DUP_ENABLED, assign_clusters, boost_alert, cluster_sizes, index_row, simhash
+from backend.app.pg_copy import copy_insert, use_copy
+from backend.app.rollups import bump_rollups
+from backend.app.seen_hashes import seen_hashes
 import hashlib
 
-from ml.pipeline import build_alert
+from ml.detectors import extract_entities_and_iocs, leak_detector
+from ml.pipeline import build_alerts
 
 def _hash(source: str, url: str, text: str) -> str:
     h = hashlib.sha256()
@@ -22,65 +30,240 @@ def upsert_post_and_alert(
     text: str,
     vuln_features: dict | None = None
 ) -> tuple[int, int]:
-    h = _hash(source, url, text)
-    existing = session.exec(select(Post).where(Post.hash == h)).first()
-    if existing:
-        # already ingested
-        a = session.exec(select(Alert).where(Alert.post_id == existing.id).order_by(Alert.id.desc())).first()
-        return existing.id, (a.id if a else -1)
-
-    post = Post(
-        source=source,
-        url=url,
-        title=title,
-        author=author,
-        created_at=created_at,
-        text=text,
-        hash=h
-    )
-    session.add(post)
-    session.commit()
-    session.refresh(post)
-
-    # run ML + detectors
-    alert_obj = build_alert(text, post_meta={
+    item = {
         "source": source,
         "url": url,
         "title": title,
         "author": author,
-        "created_at": created_at.isoformat() if created_at else None
-    }, vuln_features=vuln_features)
-
-    # findings/entities
-    for f in alert_obj.get("findings", []):
-        session.add(Finding(
-            post_id=post.id,
-            type=f["type"],
-            confidence=float(f["confidence"]),
-            evidence=f["evidence"],
-            masked_value=f["masked_value"]
-        ))
-
-    for e in alert_obj.get("entities", []):
-        session.add(Entity(post_id=post.id, kind=e["kind"], value=e["value"]))
-
-    # alert row
+        "created_at": created_at,
+        "text": text,
+        "vuln_features": vuln_features,
+    }
+    return bulk_upsert_posts_and_alerts(session, [item])[0]
+
+def _post_meta(post: dict) -> dict:
+    return {
+        "source": post["source"],
+        "url": post["url"],
+        "title": post.get("title"),
+        "author": post.get("author"),
+        "created_at": post["created_at"].isoformat() if post.get("created_at") else None
+    }
+
+def _alert_row(post_id: int, alert_obj: dict) -> dict:
     vuln_risk = alert_obj.get("vuln_risk")
-    a = Alert(
-        post_id=post.id,
+    reasons = {"reasons": alert_obj.get("score_reasons", [])}
+    if alert_obj.get("method"):
+        # "cascade": intent/sector were not predicted by the models
+        reasons["method"] = alert_obj["method"]
+    return dict(
+        post_id=post_id,
         category=alert_obj["category"],
         sector=alert_obj["sector"],
         intent=alert_obj["intent"]["label"],
         intent_confidence=float(alert_obj["intent"]["confidence"]),
         score=float(alert_obj["score"]),
-        score_reasons={"reasons": alert_obj.get("score_reasons", [])},
+        score_reasons=reasons,
         status="open",
         created_at=datetime.utcnow(),
         vuln_risk_score=float(vuln_risk["score"]) if vuln_risk else None,
         vuln_risk_method=vuln_risk.get("method") if vuln_risk else None,
     )
-    session.add(a)
-    session.commit()
-    session.refresh(a)
 
-    return post.id, a.id
+def _detections(text: str) -> tuple[list[dict], list[dict]]:
+    # linked reposts skip the models, not the detectors: their own findings/entities are kept
+    return [asdict(f) for f in leak_detector(text)], extract_entities_and_iocs(text)[0]
+
+def _insert_many(session: Session, model, rows: list[dict], *, want_ids: bool = False) -> list[int]:
+    """
+    Multi-row insert of plain dicts; with want_ids, returns the new ids in row
+    order. On Postgres, large batches go through COPY (see pg_copy).
+    """
+    if not rows:
+        return []
+    if use_copy(session, rows):
+        return copy_insert(session, model, rows, want_ids=want_ids) or []
+    if want_ids:
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        return [r[0] for r in session.execute(stmt, rows)]
+    session.execute(insert(model), rows)
+    return []
+
+def _chunks(seq: list, size: int = 500):
+    # SQLite caps bound parameters per statement
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+def _existing_posts(session: Session, hashes: list[str]) -> dict[str, tuple[int, int]]:
+    """hash -> (post_id, latest alert_id or -1) for already-ingested posts, in two IN queries."""
+    post_ids: dict[str, int] = {}
+    for chunk in _chunks(hashes):
+        for pid, h in session.exec(select(Post.id, Post.hash).where(Post.hash.in_(chunk))):
+            post_ids[h] = pid
+
+    latest: dict[int, int] = {}
+    ids = list(post_ids.values())
+    for chunk in _chunks(ids):
+        q = select(Alert.post_id, func.max(Alert.id)).where(Alert.post_id.in_(chunk)).group_by(Alert.post_id)
+        for pid, aid in session.exec(q):
+            latest[pid] = aid
+    return {h: (pid, latest.get(pid, -1)) for h, pid in post_ids.items()}
+
+def bulk_upsert_posts_and_alerts(
+    session: Session,
+    items: list[dict],
+    *,
+    vuln_features: dict | None = None,
+    redelivered: dict[str, int] | None = None,
+    redelivered_mask: list[bool] | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Insert new posts with their findings, entities and alert in one transaction.
+    items are normalized posts (source/url/title/author/created_at/text), each
+    optionally carrying its own "vuln_features"; the keyword argument is the
+    default for items without one (per-source config).
+    If redelivered is given, per-source counts of already-ingested items are
+    added to it (collector cycle stats); redelivered_mask, if given, is
+    extended with one flag per item (True if it was already ingested). Both,
+    and seen_hashes' totals, are only updated once the call has succeeded, so
+    a retried batch is not counted twice.
+    Already-ingested hashes are answered by the in-memory seen_hashes filter;
+    the rest are resolved with one IN query and ML runs once over the new
+    posts (build_alerts) before anything is written. With NORTHSTAR_NEAR_DUP,
+    a new post whose text is a near-duplicate (SimHash) of an indexed post
+    from the same source is linked to that cluster: it skips ML (its own
+    findings and entities are still written) and returns the cluster's
+    alert, which is boosted. Posts with vuln_features are never linked.
+    Rows are written with multi-row INSERT ... RETURNING, or COPY on Postgres.
+    Returns (post_id, alert_id) per input item, in order (-1 if an existing
+    post has no alert).
+    """
+    if not items:
+        return []
+
+    hashes = [_hash(it["source"], it["url"], it["text"]) for it in items]
+
+    # re-delivered items are answered from memory without touching the DB
+    existing: dict[str, tuple[int, int]] = {}
+    unknown: set[str] = set()
+    for h in hashes:
+        if h in existing or h in unknown:
+            continue
+        hit = seen_hashes.get(h)
+        if hit is not None:
+            existing[h] = hit
+        else:
+            unknown.add(h)
+    if unknown:
+        # ingested by another process / before warm-up
+        from_db = _existing_posts(session, list(unknown))
+        seen_hashes.add_many(from_db.items())
+        existing.update(from_db)
+
+    # known before this call; counted only once the batch has committed
+    was_known = [h in existing for h in hashes]
+
+    # first occurrence of each new hash; in-batch duplicates share its rows
+    new: dict[str, dict] = {}
+    for h, it in zip(hashes, items):
+        if h not in existing and h not in new:
+            new[h] = it
+
+    if new:
+        # reposts of known content join its cluster instead of going through ML
+        sigs: dict[str, int] = {}
+        linked: dict[str, int] = {}        # hash -> cluster_id already in the DB
+        linked_batch: dict[str, str] = {}  # hash -> hash of an earlier new post in this batch
+        cluster_alert: dict[int, int] = {}
+        if NEAR_DUP_ENABLED:
+            for h, it in new.items():
+                # vulnerability risk depends on the features, which the fingerprint ignores
+                if it.get("vuln_features", vuln_features) is not None:
+                    continue
+                sig = simhash(it["text"])
+                if sig is not None:
+                    sigs[h] = sig
+            linked, linked_batch, cluster_alert = assign_clusters(session, sigs, {h: new[h]["source"] for h in sigs})
+
+        fresh = [h for h in new if h not in linked and h not in linked_batch]
+        posts = {
+            h: dict(
+                source=it["source"],
+                url=it["url"],
+                title=it.get("title"),
+                author=it.get("author"),
+                created_at=it.get("created_at"),
+                text=it["text"],
+                hash=h
+            )
+            for h, it in new.items()
+        }
+        alert_objs = build_alerts(
+            [posts[h]["text"] for h in fresh],
+            [_post_meta(posts[h]) for h in fresh],
+            [new[h].get("vuln_features", vuln_features) for h in fresh]
+        )
+
+        try:
+            post_ids = dict(zip(posts, _insert_many(session, Post, list(posts.values()), want_ids=True)))
+
+            detected = [(post_ids[h], a.get("findings", []), a.get("entities", [])) for h, a in zip(fresh, alert_objs)]
+            detected += [(post_ids[h], *_detections(new[h]["text"])) for h in [*linked, *linked_batch]]
+            findings, entities = [], []
+            for post_id, post_findings, post_entities in detected:
+                for f in post_findings:
+                    findings.append(dict(
+                        post_id=post_id,
+                        type=f["type"],
+                        confidence=float(f["confidence"]),
+                        evidence=f["evidence"],
+                        masked_value=f["masked_value"]
+                    ))
+                for e in post_entities:
+                    entities.append(dict(post_id=post_id, kind=e["kind"], value=e["value"]))
+            _insert_many(session, Finding, findings)
+            _insert_many(session, Entity, entities)
+
+            alert_rows = [_alert_row(post_ids[h], alert_obj) for h, alert_obj in zip(fresh, alert_objs)]
+            alert_ids = _insert_many(session, Alert, alert_rows, want_ids=True)
+            bump_rollups(session, alert_rows)
+
+            ids = {h: (post_ids[h], aid) for h, aid in zip(fresh, alert_ids)}
+            for h, cid in linked.items():
+                ids[h] = (post_ids[h], cluster_alert[cid])
+            for h, rh in linked_batch.items():
+                ids[h] = (post_ids[h], ids[rh][1])
+
+            if sigs:
+                clusters = {h: linked.get(h) or post_ids[linked_batch.get(h, h)] for h in sigs}
+                _insert_many(session, PostSimhash, [index_row(post_ids[h], sigs[h], cid) for h, cid in clusters.items()])
+                reposted = {clusters[h]: ids[h][1] for h in list(linked) + list(linked_batch)}
+                if reposted:
+                    sizes = cluster_sizes(session, list(reposted))
+                    for a in session.exec(select(Alert).where(Alert.id.in_(list(reposted.values())))):
+                        boost_alert(a, sizes.get(a.post_id, 1) - 1)
+                    session.flush()
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        # push the new alerts to SSE subscribers only once they are committed
+        broadcaster.publish([
+            alert_event({**row, "id": aid}, {**posts[h], "id": post_ids[h]})
+            for h, row, aid in zip(fresh, alert_rows, alert_ids)
+        ])
+        existing.update(ids)
+        seen_hashes.add_many(ids.items())
+
+    counts: dict[str, int] = {}
+    for known, it in zip(was_known, items):
+        if known:
+            counts[it["source"]] = counts.get(it["source"], 0) + 1
+    seen_hashes.record_redelivered(counts)
+    if redelivered is not None:
+        for source, n in counts.items():
+            redelivered[source] = redelivered.get(source, 0) + n
+    if redelivered_mask is not None:
+        redelivered_mask.extend(was_known)
+    return [existing[h] for h in hashes]
@@ -0,0 +1,91 @@
+# backend/app/rollups.py
+# Backfill from repo root: python -m backend.app.rollups
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from backend.app.models import Alert, AlertRollup
+
+
+def _day(created_at: datetime | None) -> str:
+    return (created_at or datetime.utcnow()).date().isoformat()
+
+
+def bump_rollups(session: Session, alerts: Iterable[dict | Alert]) -> None:
+    """
+    Add newly inserted alerts (rows or instances) to the day x sector x
+    category counters. Call inside the transaction that inserts them, so the
+    rollup commits or rolls back together with the alerts.
+    """
+    counts: Counter = Counter()
+    for a in alerts:
+        if isinstance(a, dict):
+            counts[(_day(a.get("created_at")), a["sector"], a["category"])] += 1
+        else:
+            counts[(_day(a.created_at), a.sector, a.category)] += 1
+    if not counts:
+        return
+
+    rows = [dict(day=d, sector=s, category=c, count=n) for (d, s, c), n in counts.items()]
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        ins = (sqlite_insert if dialect == "sqlite" else pg_insert)(AlertRollup)
+        stmt = ins.on_conflict_do_update(
+            index_elements=["day", "sector", "category"],
+            set_={"count": AlertRollup.count + ins.excluded.count},
+        )
+        session.execute(stmt, rows)
+        return
+
+    # other backends: read-modify-write
+    for r in rows:
+        cur = session.get(AlertRollup, (r["day"], r["sector"], r["category"]))
+        if cur is None:
+            session.add(AlertRollup(**r))
+        else:
+            cur.count += r["count"]
+    session.flush()
+
+
+def trend_counts(session: Session, since_day: date) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+    """(per day, per sector, per category) totals from the rollup, day >= since_day."""
+    since = since_day.isoformat()
+    where = AlertRollup.day >= since
+
+    def grouped(col) -> Dict[str, int]:
+        q = select(col, func.sum(AlertRollup.count)).where(where).group_by(col).order_by(col)
+        return {k: int(n) for k, n in session.exec(q)}
+
+    return grouped(AlertRollup.day), grouped(AlertRollup.sector), grouped(AlertRollup.category)
+
+
+def backfill(session: Session) -> int:
+    """Rebuild the rollup from the Alert table (one GROUP BY). Returns bucket count."""
+    day = func.date(Alert.created_at)
+    q = select(day, Alert.sector, Alert.category, func.count()).group_by(day, Alert.sector, Alert.category)
+    rows = [dict(day=str(d), sector=s, category=c, count=n) for d, s, c, n in session.exec(q)]
+    session.execute(delete(AlertRollup))
+    if rows:
+        session.add_all(AlertRollup(**r) for r in rows)
+    session.commit()
+    return len(rows)
+
+
+def main():
+    from backend.app.db import engine, init_db
+
+    init_db()
+    with Session(engine) as session:
+        n = backfill(session)
+    print(f"AlertRollup rebuilt: {n} day x sector x category buckets")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,8 @@ import json
 from pathlib import Path
 from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
-from sqlmodel import Session
 
-from backend.app.db import engine
-from backend.app.pipeline_store import upsert_post_and_alert
+from backend.app.ingest_queue import ingest_queue
 
 DEMO_FEED_PATH = Path("backend/app/demo_feed.json")
 
@@ -28,30 +26,24 @@ def ingest_demo_feed_once() -> dict:
     inserted_posts = 0
     created_alerts = 0
 
-    with Session(engine) as session:
-        for item in data:
-            source = item.get("source", "demo_forum")
-            url = item.get("url", "local://demo")
-            title = item.get("title")
-            author = item.get("author")
-            created_at = _parse_dt(item.get("created_at"))
-            text = item.get("text", "")
-            vuln_features = item.get("vuln_features")
-
-            post_id, alert_id = upsert_post_and_alert(
-                session,
-                source=source,
-                url=url,
-                title=title,
-                author=author,
-                created_at=created_at,
-                text=text,
-                vuln_features=vuln_features
-            )
-
-            if alert_id is not None:
-                inserted_posts += 1
-                created_alerts += 1
+    items = [
+        {
+            "source": item.get("source", "demo_forum"),
+            "url": item.get("url", "local://demo"),
+            "title": item.get("title"),
+            "author": item.get("author"),
+            "created_at": _parse_dt(item.get("created_at")),
+            "text": item.get("text", ""),
+            "vuln_features": item.get("vuln_features"),
+        }
+        for item in data
+    ]
+
+    # the whole feed goes to the ingest writer as one job
+    for post_id, alert_id in ingest_queue.submit_posts(items).result():
+        if alert_id is not None:
+            inserted_posts += 1
+            created_alerts += 1
 
     return {"ok": True, "inserted_posts": inserted_posts, "created_alerts": created_alerts}
 
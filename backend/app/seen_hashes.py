@@ -0,0 +1,112 @@
+# backend/app/seen_hashes.py
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from backend.app.models import Alert, Post
+
+SEEN_FILTER_ENABLED = os.getenv("NORTHSTAR_SEEN_FILTER", "1") == "1"
+
+
+def _key(h: str) -> bytes:
+    # the whole sha256 digest (32 bytes, half the hex string); a prefix could collide
+    try:
+        return bytes.fromhex(h)
+    except ValueError:
+        return h.encode("utf-8")
+
+
+class SeenHashes:
+    """
+    Process-level set of ingested Post.hash values, so re-delivered items
+    (the same RSS entries / demo feed every cycle) are answered from memory
+    instead of a Post + Alert lookup in SQLite.
+
+    Keys are the raw sha256 digests; each maps to its (post_id, latest
+    alert_id). Also keeps lifetime per-source re-delivery totals.
+    """
+
+    def __init__(self, enabled: bool = SEEN_FILTER_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._ids: Dict[bytes, Tuple[int, int]] = {}
+        self.warmed = False
+        self.hits = 0
+        self.misses = 0
+        self.redelivered_total: Counter = Counter()
+
+    def warm(self, session: Session) -> int:
+        """Load every Post.hash (with its latest alert id) from the DB."""
+        if not self.enabled:
+            return 0
+        q = (
+            select(Post.hash, Post.id, func.max(Alert.id))
+            .join(Alert, Alert.post_id == Post.id, isouter=True)
+            .group_by(Post.id)
+        )
+        loaded: Dict[bytes, Tuple[int, int]] = {}
+        for h, pid, aid in session.exec(q):
+            loaded[_key(h)] = (pid, aid if aid is not None else -1)
+        with self._lock:
+            # inserts that raced with warm-up stay
+            loaded.update(self._ids)
+            self._ids = loaded
+            self.warmed = True
+        return len(loaded)
+
+    def get(self, h: str) -> Optional[Tuple[int, int]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            v = self._ids.get(_key(h))
+            if v is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return v
+
+    def add(self, h: str, post_id: int, alert_id: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._ids[_key(h)] = (post_id, alert_id)
+
+    def add_many(self, pairs: Iterable[Tuple[str, Tuple[int, int]]]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            for h, (pid, aid) in pairs:
+                self._ids[_key(h)] = (pid, aid)
+
+    def record_redelivered(self, counts: Dict[str, int]) -> None:
+        with self._lock:
+            for source, n in counts.items():
+                if n:
+                    self.redelivered_total[source] += n
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self.warmed = False
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "warmed": self.warmed,
+                "size": len(self._ids),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "redelivered_total": dict(self.redelivered_total),
+            }
+
+
+seen_hashes = SeenHashes()
@@ -0,0 +1,147 @@
+# backend/app/source_cursor.py
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from backend.app.collector import _parse_dt
+from backend.app.models import Source
+
+# Per-source collection state, stored as JSON in Source.cursor:
+#   etag, last_modified   validators for the next conditional GET
+#   bytes                 size of the last full body (what a 304 saves)
+#   last_seen_at          newest item timestamp seen (ISO)
+#   last_seen_ids         item ids at exactly last_seen_at
+#   last_seen_id          highest numeric item id seen (exploitdb)
+#   offset, csv_header    exploitdb_csv tail: bytes consumed up to a record end, and the header record
+# Sources are still configured in sources.yaml; the Source row only carries state.
+
+
+def _item_time(raw: Dict[str, Any]) -> Optional[datetime]:
+    v = raw.get("created_at")
+    if isinstance(v, datetime):
+        return v.replace(tzinfo=None)
+    if not v:
+        return None
+    dt = _parse_dt(str(v))
+    if dt is None:
+        try:
+            # RSS dates are RFC 822
+            dt = parsedate_to_datetime(str(v)).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return None
+    return dt
+
+
+def _numeric_id(raw: Dict[str, Any]) -> Optional[int]:
+    v = raw.get("item_id")
+    if isinstance(v, int):
+        return v
+    if isinstance(v, str) and v.isdigit():
+        return int(v)
+    return None
+
+
+def parse_cursor(value: Optional[str]) -> Dict[str, Any]:
+    if not value:
+        return {}
+    try:
+        cur = json.loads(value)
+    except ValueError:
+        return {}
+    return cur if isinstance(cur, dict) else {}
+
+
+def load_cursors(session: Session) -> Dict[str, Dict[str, Any]]:
+    return {s.name: parse_cursor(s.cursor) for s in session.exec(select(Source))}
+
+
+def conditional_headers(cursor: Dict[str, Any]) -> Dict[str, str]:
+    hdrs = {}
+    if cursor.get("etag"):
+        hdrs["If-None-Match"] = cursor["etag"]
+    if cursor.get("last_modified"):
+        hdrs["If-Modified-Since"] = cursor["last_modified"]
+    return hdrs
+
+
+def skip_seen(raw_posts: List[Dict[str, Any]], cursor: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Drop items at or before the cursor (before normalization and ML).
+    Numeric ids win when both sides have one; otherwise compare timestamps,
+    with the ids seen at the boundary timestamp counting as "at". Items with
+    neither are kept and left to the post hash dedup.
+    """
+    last_id = cursor.get("last_seen_id")
+    last_at = cursor.get("last_seen_at")
+    last_at = datetime.fromisoformat(last_at) if last_at else None
+    boundary = set(cursor.get("last_seen_ids") or [])
+
+    fresh = []
+    for raw in raw_posts:
+        nid = _numeric_id(raw)
+        if last_id is not None and nid is not None:
+            if nid <= last_id:
+                continue
+        elif last_at is not None:
+            ts = _item_time(raw)
+            if ts is not None and (ts < last_at or (ts == last_at and str(raw.get("item_id")) in boundary)):
+                continue
+        fresh.append(raw)
+    return fresh, len(raw_posts) - len(fresh)
+
+
+def advance(cursor: Dict[str, Any], raw_posts: List[Dict[str, Any]], headers=None, size: Optional[int] = None) -> Dict[str, Any]:
+    """New cursor after a 200: response validators plus the newest item position."""
+    cur = dict(cursor)
+    if headers is not None:
+        cur["etag"] = headers.get("etag")
+        cur["last_modified"] = headers.get("last-modified")
+    if size is not None:
+        cur["bytes"] = size
+
+    ids = [n for n in (_numeric_id(r) for r in raw_posts) if n is not None]
+    if ids:
+        cur["last_seen_id"] = max([*ids, cur.get("last_seen_id") or 0])
+
+    # timestamps only matter for sources without numeric ids
+    stamped = [] if ids else [(t, r) for t, r in ((_item_time(r), r) for r in raw_posts) if t is not None]
+    if stamped:
+        newest = max(t for t, _ in stamped)
+        prev = datetime.fromisoformat(cur["last_seen_at"]) if cur.get("last_seen_at") else None
+        at_newest = sorted({str(r.get("item_id")) for t, r in stamped if t == newest})
+        if prev is None or newest > prev:
+            cur["last_seen_at"] = newest.isoformat()
+            cur["last_seen_ids"] = at_newest
+        elif newest == prev:
+            cur["last_seen_ids"] = sorted(set(cur.get("last_seen_ids") or []) | set(at_newest))
+    return cur
+
+
+def source_rows(session: Session, cfgs: List[Dict[str, Any]], cursors: Dict[str, Dict[str, Any]]) -> List[Source]:
+    """
+    Source rows carrying the new cursors, ready for ingest_queue.submit_rows
+    (existing rows keep their id, so the writer merges them).
+    """
+    existing = {s.name: s.id for s in session.exec(select(Source).where(Source.name.in_(list(cursors))))}
+    now = datetime.utcnow()
+    by_name = {c.get("name"): c for c in cfgs}
+    rows = []
+    for name, cur in cursors.items():
+        cfg = by_name.get(name) or {}
+        rows.append(Source(
+            id=existing.get(name),
+            name=name,
+            url=cfg.get("url") or "",
+            method=cfg.get("method") or "rss",
+            interval_seconds=int(cfg.get("interval_seconds", 300)),
+            enabled=bool(cfg.get("enabled", True)),
+            json_items_path=cfg.get("json_items_path"),
+            last_run_at=now,
+            cursor=json.dumps(cur),
+        ))
+    return rows
@@ -0,0 +1,125 @@
+# backend/app/source_health.py
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlmodel import Session, select
+
+from backend.app.models import SourceHealth
+
+BREAKER_ENABLED = os.getenv("NORTHSTAR_BREAKER", "1") == "1"
+BREAKER_FAILURES = int(os.getenv("NORTHSTAR_BREAKER_FAILURES", "3"))  # consecutive failures that open it
+BREAKER_COOLDOWN = float(os.getenv("NORTHSTAR_BREAKER_COOLDOWN", "300"))  # seconds before the first probe
+BREAKER_MAX_COOLDOWN = float(os.getenv("NORTHSTAR_BREAKER_MAX_COOLDOWN", "21600"))
+LATENCY_ALPHA = 0.2
+
+
+class SourceBreakers:
+    """
+    Circuit breaker per source. After BREAKER_FAILURES consecutive failed
+    cycles the source opens and is skipped; once its cooldown passes one
+    half-open probe (a single attempt, no retries) is let through. Success
+    closes it; failure re-opens it with the cooldown doubled, up to
+    BREAKER_MAX_COOLDOWN. State lives in SourceHealth rows (warm() on
+    startup, rows() after each cycle), together with success counts and
+    fetch latency.
+    """
+
+    def __init__(self, enabled: bool = BREAKER_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._health: Dict[str, SourceHealth] = {}
+        self.skipped = 0
+
+    def warm(self, session: Session) -> int:
+        loaded = {h.name: SourceHealth(**h.model_dump()) for h in session.exec(select(SourceHealth))}
+        for h in loaded.values():
+            if h.state == "half_open":  # probe interrupted by a restart: probe again
+                h.state = "open"
+        with self._lock:
+            loaded.update(self._health)
+            self._health = loaded
+        return len(loaded)
+
+    def _get(self, name: str) -> SourceHealth:
+        h = self._health.get(name)
+        if h is None:
+            h = self._health[name] = SourceHealth(name=name)
+        return h
+
+    def allow(self, name: str, now: Optional[datetime] = None) -> bool:
+        """Whether to fetch the source this cycle; an open breaker past its cooldown turns half-open."""
+        if not self.enabled:
+            return True
+        now = now or datetime.utcnow()
+        with self._lock:
+            h = self._get(name)
+            if h.state == "closed":
+                return True
+            if h.state == "open" and (h.next_probe_at is None or now >= h.next_probe_at):
+                h.state = "half_open"
+                return True
+            self.skipped += 1
+            return False
+
+    def is_probe(self, name: str) -> bool:
+        with self._lock:
+            h = self._health.get(name)
+            return h is not None and h.state == "half_open"
+
+    def record(self, name: str, ok: bool, seconds: float, error: Optional[str] = None, now: Optional[datetime] = None) -> None:
+        now = now or datetime.utcnow()
+        with self._lock:
+            h = self._get(name)
+            if ok:
+                ms = seconds * 1000.0
+                h.latency_ms_last = round(ms, 1)
+                avg = ms if h.latency_ms_avg is None else (1 - LATENCY_ALPHA) * h.latency_ms_avg + LATENCY_ALPHA * ms
+                h.latency_ms_avg = round(avg, 1)
+                h.successes += 1
+                h.last_success_at = now
+                h.state = "closed"
+                h.consecutive_failures = 0
+                h.open_count = 0
+                h.next_probe_at = None
+                return
+
+            h.failures += 1
+            h.consecutive_failures += 1
+            h.last_failure_at = now
+            h.last_error = (error or "failed")[:500]
+            if self.enabled and (h.state == "half_open" or h.consecutive_failures >= BREAKER_FAILURES):
+                h.open_count += 1
+                cooldown = min(BREAKER_COOLDOWN * 2 ** (h.open_count - 1), BREAKER_MAX_COOLDOWN)
+                h.state = "open"
+                h.next_probe_at = now + timedelta(seconds=cooldown)
+
+    def rows(self, names: Iterable[str]) -> List[SourceHealth]:
+        """Detached copies of the given sources' state, for ingest_queue.submit_rows."""
+        with self._lock:
+            return [SourceHealth(**self._health[n].model_dump()) for n in names if n in self._health]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {}
+            for name, h in sorted(self._health.items()):
+                total = h.successes + h.failures
+                out[name] = {
+                    "state": h.state,
+                    "consecutive_failures": h.consecutive_failures,
+                    "next_probe_at": h.next_probe_at.isoformat(timespec="seconds") if h.next_probe_at else None,
+                    "success_rate": round(h.successes / total, 3) if total else None,
+                    "successes": h.successes,
+                    "failures": h.failures,
+                    "latency_ms_avg": h.latency_ms_avg,
+                    "latency_ms_last": h.latency_ms_last,
+                    "last_error": h.last_error,
+                    "last_success_at": h.last_success_at.isoformat(timespec="seconds") if h.last_success_at else None,
+                }
+            return {"enabled": self.enabled, "failures_to_open": BREAKER_FAILURES, "skipped": self.skipped, "sources": out}
+
+
+source_breakers = SourceBreakers()
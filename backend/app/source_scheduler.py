@@ -0,0 +1,129 @@
+# backend/app/source_scheduler.py
+from __future__ import annotations
+
+import heapq
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+COLLECT_JITTER = float(os.getenv("NORTHSTAR_COLLECT_JITTER", "0.1"))  # +/- fraction of the interval
+SCHEDULER_MAX_SLEEP = float(os.getenv("NORTHSTAR_SCHEDULER_MAX_SLEEP", "30"))  # re-read sources.yaml at least this often
+
+
+@dataclass
+class _Entry:
+    name: str
+    interval: float
+    due: float  # time.monotonic()
+    seq: int = 0  # bumped on every reschedule; stale heap items are skipped
+    running: bool = False
+    runs: int = 0
+    last_run_at: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class SourceScheduler:
+    """
+    Priority queue of sources keyed on their next due time. Each source is
+    rescheduled interval_seconds (from sources.yaml, default_interval if
+    unset) after its last run, +/- jitter so sources sharing an interval
+    drift apart. sync() is called with the current config every tick, so
+    edits to sources.yaml apply without a restart.
+    """
+
+    def __init__(self, default_interval: float, jitter: float = COLLECT_JITTER):
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self._heap: List[tuple] = []
+        self._entries: Dict[str, _Entry] = {}
+        self._seq = 0
+
+    def _interval(self, cfg: Dict[str, Any]) -> float:
+        return float(cfg.get("interval_seconds") or self.default_interval)
+
+    def _jittered(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _push(self, e: _Entry) -> None:
+        self._seq += 1
+        e.seq = self._seq
+        heapq.heappush(self._heap, (e.due, e.seq, e.name))
+
+    def sync(self, cfgs: List[Dict[str, Any]], last_runs: Optional[Dict[str, datetime]] = None) -> None:
+        """
+        Track enabled sources, drop removed/disabled ones. A new source is due
+        interval after its persisted last run (Source.last_run_at), or right
+        away with a small stagger if it never ran.
+        """
+        now = time.monotonic()
+        enabled = {c.get("name"): c for c in cfgs if c.get("enabled", True) and c.get("name")}
+        for name in list(self._entries):
+            if name not in enabled:
+                del self._entries[name]  # its heap items go stale
+        for name, cfg in enabled.items():
+            interval = self._interval(cfg)
+            e = self._entries.get(name)
+            if e is None:
+                last = (last_runs or {}).get(name)
+                if last is not None:
+                    wait = max(0.0, interval - (datetime.utcnow() - last).total_seconds())
+                else:
+                    wait = random.uniform(0, min(5.0, interval * self.jitter))
+                e = self._entries[name] = _Entry(name=name, interval=interval, due=now + wait, last_run_at=last)
+                self._push(e)
+            elif e.interval != interval:
+                e.interval = interval
+                if not e.running:  # a running source is rescheduled by done()
+                    e.due = min(e.due, now + self._jittered(interval))
+                    self._push(e)
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Names of all sources due at now, removed from the queue until rescheduled."""
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, name = heapq.heappop(self._heap)
+            e = self._entries.get(name)
+            if e is not None and e.seq == seq:
+                e.running = True
+                due.append(name)
+        return due
+
+    def done(self, name: str, duration: float, error: Optional[str] = None) -> None:
+        e = self._entries.get(name)
+        if e is None:
+            return
+        e.running = False
+        e.runs += 1
+        e.last_run_at = datetime.utcnow()
+        e.last_duration = duration
+        e.last_error = error
+        e.due = time.monotonic() + self._jittered(e.interval)
+        self._push(e)
+
+    def seconds_until_next(self) -> float:
+        live = [due for due, seq, name in self._heap if name in self._entries and self._entries[name].seq == seq]
+        if not live:
+            return SCHEDULER_MAX_SLEEP
+        return max(0.0, min(min(live) - time.monotonic(), SCHEDULER_MAX_SLEEP))
+
+    def stats(self) -> Dict[str, Any]:
+        now_mono = time.monotonic()
+        now = datetime.utcnow()
+        out = {}
+        for name, e in sorted(self._entries.items(), key=lambda kv: kv[1].due):
+            out[name] = {
+                "interval_seconds": e.interval,
+                "next_run_at": (now + timedelta(seconds=max(0.0, e.due - now_mono))).isoformat(timespec="seconds"),
+                "next_run_in": round(max(0.0, e.due - now_mono), 1),
+                "last_run_at": e.last_run_at.isoformat(timespec="seconds") if e.last_run_at else None,
+                "last_duration": round(e.last_duration, 3) if e.last_duration is not None else None,
+                "last_error": e.last_error,
+                "runs": e.runs,
+                "running": e.running,
+            }
+        return {"jitter": self.jitter, "sources": out}
@@ -0,0 +1,93 @@
+# ml/alert_cache.py
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+ALERT_CACHE_SIZE = int(os.getenv("NORTHSTAR_ALERT_CACHE_SIZE", "2048"))
+
+
+def alert_cache_key(text: str, vuln_features: Optional[Dict[str, Any]]) -> str:
+    # exact text: findings evidence and masked values are cut from it, so
+    # texts that differ only in whitespace must not share an alert
+    h = hashlib.sha256()
+    h.update((text or "").encode("utf-8", errors="ignore"))
+    h.update(b"\x00")
+    h.update(json.dumps(vuln_features, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+class AlertCache:
+    """
+    Bounded LRU of build_alert results keyed on (text, vuln_features).
+    Entries hold the alert without its "post" block (url/title/source differ
+    per delivery) and are tied to a model generation: when the registry
+    reloads models, the whole cache is dropped.
+    """
+
+    def __init__(self, max_size: int = ALERT_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def sync_generation(self, generation: int) -> None:
+        with self._lock:
+            if self._generation != generation:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self._generation = generation
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(entry)
+
+    def put(self, key: str, alert: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        entry = copy.deepcopy({k: v for k, v in alert.items() if k != "post"})
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "generation": self._generation,
+            }
+
+
+alert_cache = AlertCache()
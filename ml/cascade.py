@@ -0,0 +1,89 @@
+# ml/cascade.py
+from __future__ import annotations
+
+import os
+import random
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+CASCADE_ENABLED = os.getenv("NORTHSTAR_CASCADE", "0") == "1"  # default OFF
+CASCADE_SHADOW_RATE = float(os.getenv("NORTHSTAR_CASCADE_SHADOW_RATE", "0.05"))
+
+
+class NoiseCascade:
+    """
+    Cheap first stage in front of the classifiers. A post with no vuln
+    features, no attack keywords, no sector hints, no leak findings and no
+    CVE mention is declared noise without running the intent/sector/vuln
+    models; entities and IOCs are still extracted, so none are lost.
+
+    A sampled share of fired posts (shadow_rate) also goes through the full
+    pipeline; fired / shadowed / disagreement counters say how often the
+    shortcut is taken and how often the full pipeline would have disagreed.
+    The agreement rate is the confidence given to the noise alerts it makes.
+    """
+
+    def __init__(self, enabled: bool = CASCADE_ENABLED, shadow_rate: float = CASCADE_SHADOW_RATE):
+        self.enabled = enabled
+        self.shadow_rate = shadow_rate
+        self._lock = threading.Lock()
+        self.evaluated = 0
+        self.fired = 0
+        self.shadowed = 0
+        self.disagreements = 0
+        self.recent_disagreements: deque = deque(maxlen=20)
+
+    def is_obvious_noise(
+        self,
+        text: str,
+        vuln_features: Optional[Dict[str, Any]],
+        kw_counts: Dict[str, int],
+        findings: List[Any],
+    ) -> bool:
+        if not self.enabled:
+            return False
+        noise = (
+            vuln_features is None
+            and not findings
+            and not any(kw_counts.values())
+            and "CVE-" not in text
+        )
+        with self._lock:
+            self.evaluated += 1
+            if noise:
+                self.fired += 1
+        return noise
+
+    def should_shadow(self) -> bool:
+        return self.shadow_rate > 0 and random.random() < self.shadow_rate
+
+    def confidence(self) -> float:
+        """P(the full pipeline also says noise) from the shadow runs, Laplace-smoothed (0.5 without any)."""
+        with self._lock:
+            return (self.shadowed - self.disagreements + 1) / (self.shadowed + 2)
+
+    def record_shadow(self, text: str, full_category: str) -> None:
+        with self._lock:
+            self.shadowed += 1
+            if full_category != "noise":
+                self.disagreements += 1
+                self.recent_disagreements.append({"category": full_category, "text": text[:160]})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "shadow_rate": self.shadow_rate,
+                "evaluated": self.evaluated,
+                "fired": self.fired,
+                "fire_rate": round(self.fired / self.evaluated, 4) if self.evaluated else 0.0,
+                "shadowed": self.shadowed,
+                "disagreements": self.disagreements,
+                "disagreement_rate": round(self.disagreements / self.shadowed, 4) if self.shadowed else 0.0,
+                "confidence": round((self.shadowed - self.disagreements + 1) / (self.shadowed + 2), 4),
+                "recent_disagreements": list(self.recent_disagreements),
+            }
+
+
+cascade = NoiseCascade()
@@ -1,5 +1,6 @@
 import math
 import re
+from bisect import bisect_left
 from dataclasses import dataclass
 from typing import List, Dict, Tuple
 
@@ -23,16 +24,58 @@ def mask_secret(s: str, keep_prefix: int = 4, keep_suffix: int = 4) -> str:
         return s[0:1] + "…" + s[-1:]
     return s[:keep_prefix] + "…" + s[-keep_suffix:]
 
+CONTEXT_KEYWORDS = [
+    "password", "passwd", "pwd", "token", "api key", "apikey",
+    "secret", "auth", "authorization", "credential", "creds",
+    "bearer", "key="
+]
+
 def context_has_keywords(text: str, start: int, end: int, window: int = 40) -> bool:
     left = max(0, start - window)
     right = min(len(text), end + window)
     chunk = text[left:right].lower()
-    keywords = [
-        "password", "passwd", "pwd", "token", "api key", "apikey",
-        "secret", "auth", "authorization", "credential", "creds",
-        "bearer", "key="
-    ]
-    return any(k in chunk for k in keywords)
+    return any(k in chunk for k in CONTEXT_KEYWORDS)
+
+# Length-preserving lowercase for ASCII keywords: offsets line up with the
+# original text, and it agrees with str.lower() on which keywords appear.
+_LOWER = str.maketrans({**{chr(c): chr(c + 32) for c in range(ord("A"), ord("Z") + 1)}, "\u212a": "k"})
+# extra chars re.IGNORECASE also equates with s/i, so anchors stay a superset
+_IGNORECASE_EXTRA = {"\u017f": "s", "\u0131": "i", "\u0130": "i"}
+
+def _casefold_for_anchors(lowered: str) -> str:
+    if any(ch in lowered for ch in _IGNORECASE_EXTRA):
+        return lowered.translate(str.maketrans(_IGNORECASE_EXTRA))
+    return lowered
+
+def _find_all(hay: str, needle: str) -> List[int]:
+    out = []
+    i = hay.find(needle)
+    while i != -1:
+        out.append(i)
+        i = hay.find(needle, i + 1)
+    return out
+
+class _ContextIndex:
+    """Context keyword positions for one text, located once up front."""
+
+    def __init__(self, lowered: str):
+        self.text_len = len(lowered)
+        spans = sorted(
+            (i, i + len(k)) for k in CONTEXT_KEYWORDS for i in _find_all(lowered, k)
+        )
+        self.starts = [a for a, _ in spans]
+        self.ends = [b for _, b in spans]
+
+    def has_keywords(self, start: int, end: int, window: int = 40) -> bool:
+        # same answer as context_has_keywords(text, start, end, window)
+        left = max(0, start - window)
+        right = min(self.text_len, end + window)
+        i = bisect_left(self.starts, left)
+        while i < len(self.starts) and self.starts[i] < right:
+            if self.ends[i] <= right:
+                return True
+            i += 1
+        return False
 
 LEAK_PATTERNS: List[Tuple[str, re.Pattern]] = [
     ("AWS_ACCESS_KEY_ID", re.compile(r"\bAKIA[0-9A-Z]{16}\b")),
@@ -44,6 +87,28 @@ LEAK_PATTERNS: List[Tuple[str, re.Pattern]] = [
     ("CONNECTION_STRING", re.compile(r"(?i)\b(postgres|postgresql|mysql|mongodb|mssql)://[^\s]+")),
 ]
 
+# Literal prefix every match of each LEAK_PATTERNS entry starts with, and
+# whether to look for it in the case-folded text ((?i) patterns).
+_LEAK_ANCHORS: Dict[str, List[Tuple[str, bool]]] = {
+    "AWS_ACCESS_KEY_ID": [("AKIA", False)],
+    "GITHUB_TOKEN": [("ghp_", False)],
+    "JWT": [("eyJ", False)],
+    "PRIVATE_KEY_BLOCK": [("-----BEGIN ", False)],
+    "PASSWORD_ASSIGNMENT": [("passw", True), ("pwd", True)],
+    "AUTH_HEADER": [("authorization", True)],
+    "CONNECTION_STRING": [("postgres", True), ("mysql", True), ("mongodb", True), ("mssql", True)],
+}
+
+LEAK_BASE_CONFIDENCE: Dict[str, float] = {
+    "PRIVATE_KEY_BLOCK": 0.95,
+    "AWS_ACCESS_KEY_ID": 0.85,
+    "GITHUB_TOKEN": 0.85,
+    "JWT": 0.70,
+    "CONNECTION_STRING": 0.80,
+    "AUTH_HEADER": 0.75,
+    "PASSWORD_ASSIGNMENT": 0.65,
+}
+
 @dataclass
 class Finding:
     type: str
@@ -51,56 +116,73 @@ class Finding:
     evidence: str
     masked_value: str
 
+def _make_finding(text: str, ftype: str, m: re.Match, ctx: _ContextIndex) -> Finding:
+    raw = m.group(0)
+    start, end = m.start(), m.end()
+
+    value = raw
+    if ftype == "PASSWORD_ASSIGNMENT":
+        value = m.group(2)
+    elif ftype == "AUTH_HEADER":
+        value = m.group(1)
+
+    ent = shannon_entropy(value)
+    has_ctx = ctx.has_keywords(start, end)
+
+    conf = LEAK_BASE_CONFIDENCE.get(ftype, 0.60)
+    if has_ctx:
+        conf += 0.10
+    if len(value) >= 12:
+        if ent >= 3.5:
+            conf += 0.10
+        elif ent < 2.8:
+            conf -= 0.10
+
+    conf = max(0.0, min(1.0, conf))
+
+    snippet_left = max(0, start - 40)
+    snippet_right = min(len(text), end + 40)
+    evidence = text[snippet_left:snippet_right].replace("\n", " ")
+
+    return Finding(
+        type=ftype,
+        confidence=conf,
+        evidence=evidence[:240],
+        masked_value=mask_secret(value)
+    )
+
 def leak_detector(text: str) -> List[Finding]:
+    """
+    Each pattern is only tried where its literal anchor occurs. Anchors and
+    context keywords are located with str.find over the text and one
+    case-folded copy, instead of a regex scan per pattern plus a lowercased
+    window per match. Output matches running each pattern's finditer in
+    LEAK_PATTERNS order.
+    """
     findings: List[Finding] = []
     if not text:
         return findings
 
+    lowered = text.translate(_LOWER)
+    folded = _casefold_for_anchors(lowered)
+    ctx = _ContextIndex(lowered)
+
     for ftype, pat in LEAK_PATTERNS:
-        for m in pat.finditer(text):
-            raw = m.group(0)
-            start, end = m.start(), m.end()
-
-            value = raw
-            if ftype == "PASSWORD_ASSIGNMENT":
-                value = m.group(2)
-            elif ftype == "AUTH_HEADER":
-                value = m.group(1)
-
-            ent = shannon_entropy(value)
-            has_ctx = context_has_keywords(text, start, end)
-
-            base = {
-                "PRIVATE_KEY_BLOCK": 0.95,
-                "AWS_ACCESS_KEY_ID": 0.85,
-                "GITHUB_TOKEN": 0.85,
-                "JWT": 0.70,
-                "CONNECTION_STRING": 0.80,
-                "AUTH_HEADER": 0.75,
-                "PASSWORD_ASSIGNMENT": 0.65,
-            }.get(ftype, 0.60)
-
-            conf = base
-            if has_ctx:
-                conf += 0.10
-            if len(value) >= 12:
-                if ent >= 3.5:
-                    conf += 0.10
-                elif ent < 2.8:
-                    conf -= 0.10
-
-            conf = max(0.0, min(1.0, conf))
-
-            snippet_left = max(0, start - 40)
-            snippet_right = min(len(text), end + 40)
-            evidence = text[snippet_left:snippet_right].replace("\n", " ")
-
-            findings.append(Finding(
-                type=ftype,
-                confidence=conf,
-                evidence=evidence[:240],
-                masked_value=mask_secret(value)
-            ))
+        anchors = _LEAK_ANCHORS[ftype]
+        positions = [i for a, ci in anchors for i in _find_all(folded if ci else text, a)]
+        if len(anchors) > 1:
+            positions.sort()
+
+        # finditer never reports overlapping matches of the same pattern
+        next_free = 0
+        for pos in positions:
+            if pos < next_free:
+                continue
+            m = pat.match(text, pos)
+            if m is None:
+                continue
+            next_free = m.end()
+            findings.append(_make_finding(text, ftype, m, ctx))
 
     uniq = []
     seen = set()
@@ -116,24 +198,43 @@ EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 DOMAIN_RE = re.compile(r"\b(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}\b")
 URL_RE = re.compile(r"\bhttps?://[^\s]+", re.IGNORECASE)
 
-def entity_extractor(text: str) -> List[Dict[str, str]]:
-    out: List[Dict[str, str]] = []
+CVE_RE = re.compile(r"CVE-\d{4}-\d{4,7}")
+
+FILE_LIKE_EXT = (".json", ".txt", ".png", ".jpg", ".jpeg", ".pdf", ".zip", ".tar", ".gz", ".mp4")
+
+def _uniq(values: List[str]) -> List[str]:
+    # first-seen order
+    return list(dict.fromkeys(values))
+
+def extract_entities_and_iocs(text: str) -> Tuple[List[Dict[str, str]], Dict[str, List[str]]]:
+    """
+    One extraction pass shared by entity_extractor and extract_iocs: each
+    regex runs once, and is skipped when its required literal can't be in
+    the text. Returns (entities, iocs_raw).
+    """
+    iocs: Dict[str, List[str]] = {"cves": [], "ips": [], "domains": [], "emails": []}
     if not text:
-        return out
+        return [], iocs
+
+    has_dot = "." in text
+    ips = IP_RE.findall(text) if has_dot else []
+    emails = EMAIL_RE.findall(text) if has_dot and "@" in text else []
+    urls = URL_RE.findall(text) if "://" in text else []
+    domains = DOMAIN_RE.findall(text) if has_dot else []
+    cves = CVE_RE.findall(text) if "CVE-" in text else []
 
-    for ip in IP_RE.findall(text):
+    out: List[Dict[str, str]] = []
+    for ip in ips:
         out.append({"kind": "ip", "value": ip})
 
-    for email in EMAIL_RE.findall(text):
+    for email in emails:
         out.append({"kind": "email", "value": email})
 
-    for url in URL_RE.findall(text):
+    for url in urls:
         out.append({"kind": "url", "value": url})
 
-    file_like_ext = {".json", ".txt", ".png", ".jpg", ".jpeg", ".pdf", ".zip", ".tar", ".gz", ".mp4"}
-    for dom in DOMAIN_RE.findall(text):
-        low = dom.lower()
-        if any(low.endswith(ext) for ext in file_like_ext):
+    for dom in domains:
+        if dom.lower().endswith(FILE_LIKE_EXT):
             continue
         out.append({"kind": "domain", "value": dom})
 
@@ -144,4 +245,12 @@ def entity_extractor(text: str) -> List[Dict[str, str]]:
         if key not in seen:
             uniq.append(e)
             seen.add(key)
-    return uniq
+
+    iocs["cves"] = _uniq(cves)
+    iocs["ips"] = _uniq(ips)
+    iocs["domains"] = _uniq(domains)
+    iocs["emails"] = _uniq(emails)
+    return uniq, iocs
+
+def entity_extractor(text: str) -> List[Dict[str, str]]:
+    return extract_entities_and_iocs(text)[0]
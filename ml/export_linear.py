@@ -0,0 +1,89 @@
+# ml/export_linear.py
+# Run from repo root: python -m ml.export_linear
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from joblib import load
+
+from ml.infer import (
+    INTENT_MODEL_PATH,
+    SECTOR_MODEL_PATH,
+    LINEAR_ARTIFACT_NAME,
+    LinearTextScorer,
+    file_sha256,
+)
+
+TARGETS = [
+    (INTENT_MODEL_PATH, Path("ml/data/intent_val.jsonl")),
+    (SECTOR_MODEL_PATH, Path("ml/data/sector_val.jsonl")),
+]
+
+PARITY_TOL = 1e-9
+
+
+def export_arrays(bundle_path: Path) -> Dict[str, Any]:
+    bundle = load(bundle_path)
+    vec = bundle.get("vectorizer") if isinstance(bundle, dict) else None
+    clf = bundle.get("clf") if isinstance(bundle, dict) else None
+    if vec is None or clf is None:
+        raise ValueError(f"{bundle_path}: only legacy {{vectorizer, clf}} bundles can be exported")
+
+    p = vec.get_params()
+    if p["analyzer"] != "word" or p["tokenizer"] or p["preprocessor"] or p["stop_words"] or p["strip_accents"]:
+        raise ValueError(f"{bundle_path}: vectorizer uses a custom analyzer; cannot compile")
+
+    terms = np.empty(len(vec.vocabulary_), dtype=object)
+    for term, j in vec.vocabulary_.items():
+        terms[j] = term
+
+    idf = vec.idf_ if p["use_idf"] else np.ones(len(terms))
+    return {
+        "terms": terms.astype(str),
+        "idf": np.asarray(idf, dtype=np.float64),
+        "coef": np.asarray(clf.coef_, dtype=np.float64),
+        "intercept": np.asarray(clf.intercept_, dtype=np.float64),
+        "classes": np.asarray([str(c) for c in clf.classes_]),
+        "lowercase": np.asarray(bool(p["lowercase"])),
+        "token_pattern": np.asarray(p["token_pattern"]),
+        "ngram_range": np.asarray(p["ngram_range"], dtype=np.int64),
+        "sublinear_tf": np.asarray(bool(p["sublinear_tf"])),
+        "binary": np.asarray(bool(p["binary"])),
+        "norm": np.asarray(str(p["norm"])),
+        "source_sha256": np.asarray(file_sha256(bundle_path)),
+    }
+
+
+def check_parity(bundle_path: Path, scorer: LinearTextScorer, texts: List[str]) -> float:
+    bundle = load(bundle_path)
+    ref = bundle["clf"].predict_proba(bundle["vectorizer"].transform(texts))
+    got = scorer.predict_proba(texts)
+    return float(np.abs(ref - got).max()) if len(texts) else 0.0
+
+
+def load_texts(fp: Path) -> List[str]:
+    if not fp.exists():
+        return []
+    rows = [json.loads(ln) for ln in fp.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    return [r["text"] for r in rows]
+
+
+def main():
+    for bundle_path, val_path in TARGETS:
+        out_path = bundle_path.parent / LINEAR_ARTIFACT_NAME
+        np.savez_compressed(out_path, **export_arrays(bundle_path))
+
+        scorer = LinearTextScorer.load(out_path)
+        texts = load_texts(val_path) + ["", "selling telecom db creds tonight"]
+        diff = check_parity(bundle_path, scorer, texts)
+        if diff > PARITY_TOL:
+            out_path.unlink()
+            raise SystemExit(f"Parity check failed for {bundle_path}: max |dp| = {diff:.3g}")
+        print(f"Saved -> {out_path} (parity max |dp| = {diff:.3g} on {len(texts)} texts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# ml/export_vuln.py
+# Run from repo root: python -m ml.export_vuln
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from joblib import load
+
+from ml.infer import FOREST_ARTIFACT_DIR, VULN_MODEL_PATH, CompiledForest, file_sha256, normalize_vuln_features
+
+DATA_VAL = Path("ml/data/vuln_val.jsonl")
+PARITY_TOL = 1e-9
+
+
+def flatten_forest(model, feature_names: List[str]) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Concatenate every tree's node arrays; leaf children point back at the leaf."""
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in model.estimators_:
+        t = est.tree_
+        if t.n_outputs != 1:
+            raise ValueError("only single-output regressors can be exported")
+        ids = np.arange(t.node_count, dtype=np.int64) + offset
+        is_leaf = t.children_left == -1
+
+        left.append(np.where(is_leaf, ids, t.children_left + offset))
+        right.append(np.where(is_leaf, ids, t.children_right + offset))
+        feature.append(np.where(is_leaf, 0, t.feature).astype(np.int64))
+        threshold.append(np.where(is_leaf, 0.0, t.threshold).astype(np.float64))
+        value.append(t.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+
+        offset += t.node_count
+        max_depth = max(max_depth, int(t.max_depth))
+
+    arrays = {
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate(threshold),
+        "value": np.concatenate(value),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+    meta = {"max_depth": max_depth, "feature_names": list(feature_names), "n_trees": len(roots)}
+    return arrays, meta
+
+
+def main():
+    bundle = load(VULN_MODEL_PATH)
+    vec, model = bundle["vectorizer"], bundle["model"]
+
+    arrays, meta = flatten_forest(model, list(vec.feature_names_))
+    meta["source_sha256"] = file_sha256(VULN_MODEL_PATH)
+
+    out_dir = VULN_MODEL_PATH.parent / FOREST_ARTIFACT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(out_dir / f"{name}.npy", np.ascontiguousarray(arr))
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    forest = CompiledForest.load(out_dir)
+    feats = [json.loads(ln)["features"] for ln in DATA_VAL.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    feats += [{}, {"cvss": 6.8, "internet_exposed": True, "asset_criticality": "Medium", "env": "prod", "attack_surface": "web"}]
+    ref = model.predict(vec.transform([normalize_vuln_features(f) for f in feats]))
+    diff = float(np.abs(ref - forest.predict(feats)).max())
+    if diff > PARITY_TOL:
+        (out_dir / "meta.json").unlink()
+        raise SystemExit(f"Parity check failed: max |dy| = {diff:.3g}")
+
+    print(f"Saved -> {out_dir} ({meta['n_trees']} trees, {len(arrays['value'])} nodes, parity max |dy| = {diff:.3g})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# ml/features.py
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+
+# Params that decide how raw text becomes n-gram tokens. Vectorizers that agree
+# on all of them can share one tokenization pass.
+_ANALYZER_PARAMS = (
+    "input", "encoding", "decode_error", "strip_accents", "lowercase",
+    "preprocessor", "tokenizer", "stop_words", "token_pattern", "ngram_range", "analyzer",
+)
+
+FEATURE_CACHE_SIZE = 512
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class SharedTfidf:
+    """
+    Feature-extraction stage for the legacy {"vectorizer","clf"} bundles.
+
+    Each text is tokenized once per distinct analyzer config (intent and sector
+    are trained with the same one) and the tokens are counted against every
+    vectorizer's vocabulary; the fitted TfidfTransformer then does idf/norm.
+    Rows are cached by content hash, so the decision_function fallback and the
+    second model reuse what predict_proba already computed.
+    """
+
+    def __init__(self, vectorizers: Dict[str, Any], cache_size: int = FEATURE_CACHE_SIZE):
+        self.vectorizers = dict(vectorizers)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, sp.csr_matrix]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # group vectorizers by analyzer config -> one analyzer per group
+        groups: Dict[Tuple, List[str]] = {}
+        for name, vec in self.vectorizers.items():
+            params = vec.get_params()
+            key = tuple(repr(params.get(p)) for p in _ANALYZER_PARAMS)
+            groups.setdefault(key, []).append(name)
+        self._groups = [(self.vectorizers[names[0]].build_analyzer(), names) for names in groups.values()]
+
+    def _count_row(self, vec: Any, tokens: List[str]) -> sp.csr_matrix:
+        # mirrors CountVectorizer._count_vocab for a single document
+        vocab = vec.vocabulary_
+        counts: Dict[int, int] = {}
+        for tok in tokens:
+            j = vocab.get(tok)
+            if j is not None:
+                counts[j] = counts.get(j, 0) + 1
+        idx = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        vals = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        X = sp.csr_matrix(
+            (vals, idx, np.array([0, len(idx)], dtype=np.int32)),
+            shape=(1, len(vocab)),
+            dtype=vec.dtype,
+        )
+        X.sort_indices()
+        if vec.binary:
+            X.data.fill(1)
+        return X
+
+    def _compute(self, texts: List[str]) -> List[Dict[str, sp.csr_matrix]]:
+        counts: Dict[str, List[sp.csr_matrix]] = {name: [] for name in self.vectorizers}
+        for text in texts:
+            for analyzer, names in self._groups:
+                tokens = analyzer(text)
+                for name in names:
+                    counts[name].append(self._count_row(self.vectorizers[name], tokens))
+
+        rows: List[Dict[str, sp.csr_matrix]] = [{} for _ in texts]
+        for name, vec in self.vectorizers.items():
+            # one idf/normalize pass per vectorizer for the whole batch
+            X = vec._tfidf.transform(sp.vstack(counts[name], format="csr"), copy=False)
+            for i in range(len(texts)):
+                rows[i][name] = X[i]
+        return rows
+
+    def transform(self, texts: List[str], name: str) -> sp.csr_matrix:
+        """Same matrix as self.vectorizers[name].transform(texts)."""
+        if not texts:
+            return self.vectorizers[name].transform([])
+
+        keys = [_text_key(t) for t in texts]
+        found: Dict[str, Dict[str, sp.csr_matrix]] = {}
+        with self._lock:
+            for key in keys:
+                rows = self._cache.get(key)
+                if rows is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = rows
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing[key] = text
+        if missing:
+            computed = dict(zip(missing.keys(), self._compute(list(missing.values()))))
+            found.update(computed)
+            with self._lock:
+                self._cache.update(computed)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return sp.vstack([found[key][name] for key in keys], format="csr")
@@ -3,16 +3,28 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
+import hashlib
+import json
 import math
+import re
+
+import numpy as np
 from joblib import load
 
+from ml.features import SharedTfidf
+
 
 INTENT_MODEL_PATH = Path("ml/models/intent_tfidf/model.joblib")
 SECTOR_MODEL_PATH = Path("ml/models/sector_tfidf/model.joblib")
 VULN_MODEL_PATH = Path("ml/models/vuln_risk/model.joblib")
 
+# written by ml/export_linear.py next to each TF-IDF bundle
+LINEAR_ARTIFACT_NAME = "linear.npz"
+# written by ml/export_vuln.py next to the vuln bundle (one .npy per array, mmap-able)
+FOREST_ARTIFACT_DIR = "forest"
+
 
 def _softmax(xs: List[float]) -> List[float]:
     if not xs:
@@ -56,11 +68,12 @@ def _load_bundle(path: Path) -> Dict[str, Any]:
     return obj
 
 
-def _bundle_to_pipeline(bundle: Dict[str, Any]):
+def _bundle_to_pipeline(bundle: Dict[str, Any], features: Optional[SharedTfidf] = None, name: Optional[str] = None):
     """
     Supports:
     - New format: {"pipeline": Pipeline, "labels": [...], "task": "..."}
     - Old format: {"vectorizer": vec, "clf": clf, "labels": [...]}
+    Legacy bundles registered in `features` vectorize through the shared stage.
     """
     if "pipeline" in bundle:
         return bundle["pipeline"], bundle.get("labels")
@@ -77,12 +90,17 @@ def _bundle_to_pipeline(bundle: Dict[str, Any]):
             self.v = v
             self.c = c
 
+        def transform(self, texts):
+            if features is not None and name in features.vectorizers:
+                return features.transform(list(texts), name)
+            return self.v.transform(texts)
+
         def predict(self, texts):
-            X = self.v.transform(texts)
+            X = self.transform(texts)
             return self.c.predict(X)
 
         def predict_proba(self, texts):
-            X = self.v.transform(texts)
+            X = self.transform(texts)
             if hasattr(self.c, "predict_proba"):
                 return self.c.predict_proba(X)
             if hasattr(self.c, "decision_function"):
@@ -92,16 +110,214 @@ def _bundle_to_pipeline(bundle: Dict[str, Any]):
             raise AttributeError("No predict_proba/decision_function on legacy clf")
 
         def decision_function(self, texts):
-            X = self.v.transform(texts)
+            X = self.transform(texts)
             return self.c.decision_function(X)
 
     return _LegacyPipe(vec, clf), labels
 
 
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class LinearTextScorer:
+    """
+    sklearn-free scorer for a TF-IDF + LogisticRegression bundle exported by
+    ml/export_linear.py: vocabulary, idf, coef and intercept as NumPy arrays.
+    predict_proba matches the joblib model (columns in clf.classes_ order);
+    it skips sklearn's per-call validation, which dominates single-text latency.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.classes = [str(c) for c in arrays["classes"]]
+        self.vocab = {str(t): i for i, t in enumerate(arrays["terms"])}
+        self.idf = arrays["idf"]
+        self.coef = arrays["coef"]
+        self.intercept = arrays["intercept"]
+        self.source_sha256 = str(arrays["source_sha256"])
+
+        self.lowercase = bool(arrays["lowercase"])
+        self.token_re = re.compile(str(arrays["token_pattern"]))
+        self.min_n, self.max_n = (int(x) for x in arrays["ngram_range"])
+        self.sublinear_tf = bool(arrays["sublinear_tf"])
+        self.binary = bool(arrays["binary"])
+        self.norm = str(arrays["norm"])
+
+    @classmethod
+    def load(cls, path: Path) -> "LinearTextScorer":
+        with np.load(path, allow_pickle=False) as z:
+            return cls({k: z[k] for k in z.files})
+
+    @classmethod
+    def load_for(cls, bundle_path: Path) -> Optional["LinearTextScorer"]:
+        """Compiled artifact next to bundle_path, or None if missing/stale."""
+        path = bundle_path.parent / LINEAR_ARTIFACT_NAME
+        if not path.exists() or not bundle_path.exists():
+            return None
+        scorer = cls.load(path)
+        # retrained bundle without a re-export -> don't serve stale weights
+        if scorer.source_sha256 != file_sha256(bundle_path):
+            return None
+        return scorer
+
+    def _tokens(self, text: str) -> List[str]:
+        # same as TfidfVectorizer(analyzer="word").build_analyzer()
+        if self.lowercase:
+            text = text.lower()
+        words = self.token_re.findall(text)
+        if self.max_n == 1:
+            return words
+        tokens = list(words) if self.min_n == 1 else []
+        n_words = len(words)
+        for n in range(max(2, self.min_n), min(self.max_n + 1, n_words + 1)):
+            for i in range(n_words - n + 1):
+                tokens.append(" ".join(words[i: i + n]))
+        return tokens
+
+    def _decision_row(self, text: str) -> np.ndarray:
+        counts: Dict[int, int] = {}
+        vocab = self.vocab
+        for tok in self._tokens(text or ""):
+            j = vocab.get(tok)
+            if j is not None:
+                counts[j] = counts.get(j, 0) + 1
+
+        if not counts:
+            return self.intercept.copy()
+
+        idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.binary:
+            tf[:] = 1.0
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1.0
+        x = tf * self.idf[idx]
+        if self.norm == "l2":
+            x /= np.sqrt(np.dot(x, x)) or 1.0
+        elif self.norm == "l1":
+            x /= np.abs(x).sum() or 1.0
+        return self.coef[:, idx] @ x + self.intercept
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        out = []
+        for text in texts:
+            d = self._decision_row(text)
+            if d.shape[0] == 1:
+                # binary LR: coef has one row for the positive class
+                p1 = 1.0 / (1.0 + np.exp(-d[0]))
+                out.append(np.array([1.0 - p1, p1]))
+            else:
+                e = np.exp(d - d.max())
+                out.append(e / e.sum())
+        return np.vstack(out) if out else np.empty((0, len(self.classes)))
+
+
+def normalize_vuln_features(d: Dict[str, Any]) -> Dict[str, Any]:
+    # keep in sync with normalize_features() in ml/train_vuln.py
+    d = d or {}
+    return {
+        "cvss": float(d.get("cvss", 0.0)),
+        "internet_exposed": bool(d.get("internet_exposed", False)),
+        "known_exploit": bool(d.get("known_exploit", False)),
+        "auth_required": bool(d.get("auth_required", False)),
+        "patch_age_days": float(d.get("patch_age_days", 0.0)),
+        "vuln_age_days": float(d.get("vuln_age_days", 0.0)),
+        "asset_criticality": str(d.get("asset_criticality", "unknown")).lower(),
+        "env": str(d.get("env", "unknown")).lower(),
+        "attack_surface": str(d.get("attack_surface", "unknown")).lower(),
+    }
+
+
+class _VulnPipe:
+    """{"vectorizer": DictVectorizer, "model": regressor} bundle as one predict()."""
+
+    def __init__(self, vec, model):
+        self.vec = vec
+        self.model = model
+
+    def predict(self, features_list):
+        X = self.vec.transform([normalize_vuln_features(f) for f in features_list])
+        return self.model.predict(X)
+
+
+class CompiledForest:
+    """
+    RandomForestRegressor flattened into contiguous node arrays by
+    ml/export_vuln.py. All trees live in one set of arrays; leaves point at
+    themselves, so a batch walks max_depth vectorized steps with no branching.
+    Arrays are np.load(mmap_mode="r"), so workers share the same pages.
+    """
+
+    ARRAYS = ("left", "right", "feature", "threshold", "value", "roots")
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(meta["max_depth"])
+        self.feature_names: List[str] = list(meta["feature_names"])
+        self.feature_index = {n: i for i, n in enumerate(self.feature_names)}
+        self.source_sha256 = meta.get("source_sha256")
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "CompiledForest":
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        mode = "r" if mmap else None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mode) for name in cls.ARRAYS}
+        return cls(arrays, meta)
+
+    @classmethod
+    def load_for(cls, bundle_path: Path) -> Optional["CompiledForest"]:
+        """Compiled forest next to bundle_path, or None if missing/stale."""
+        path = bundle_path.parent / FOREST_ARTIFACT_DIR
+        if not (path / "meta.json").exists() or not bundle_path.exists():
+            return None
+        forest = cls.load(path)
+        if forest.source_sha256 != file_sha256(bundle_path):
+            return None
+        return forest
+
+    def vectorize(self, features_list: List[Dict[str, Any]]) -> np.ndarray:
+        # DictVectorizer semantics: strings one-hot as "k=v", everything else float(v)
+        X = np.zeros((len(features_list), len(self.feature_names)), dtype=np.float64)
+        for i, f in enumerate(features_list):
+            for k, v in normalize_vuln_features(f).items():
+                if isinstance(v, str):
+                    j = self.feature_index.get(f"{k}={v}")
+                    if j is not None:
+                        X[i, j] = 1.0
+                else:
+                    j = self.feature_index.get(k)
+                    if j is not None:
+                        X[i, j] = float(v)
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return X.astype(np.float32)
+
+    def predict(self, features_list: List[Dict[str, Any]]) -> np.ndarray:
+        if not features_list:
+            return np.empty(0)
+        X = self.vectorize(features_list)
+        n, n_trees = X.shape[0], self.roots.shape[0]
+        rows = np.repeat(np.arange(n), n_trees).reshape(n, n_trees)
+        nodes = np.broadcast_to(np.asarray(self.roots), (n, n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes].sum(axis=1) / n_trees
+
+
 @dataclass
 class _ModelWrap:
     pipe: Any
     labels: List[str]
+    compiled: Optional[LinearTextScorer] = None
 
 
 class NorthStarModels:
@@ -110,30 +326,43 @@ class NorthStarModels:
     Compatible with both old and new saved formats.
     """
 
-    def __init__(self):
+    def __init__(self, loader: Callable[[Path], Dict[str, Any]] = _load_bundle):
+        # loader is swappable so ml.registry can time/measure each bundle load
+        intent_bundle = loader(INTENT_MODEL_PATH)
+        sector_bundle = loader(SECTOR_MODEL_PATH)
+
+        # shared tokenization for the legacy TF-IDF bundles
+        vectorizers = {
+            name: b["vectorizer"]
+            for name, b in (("intent", intent_bundle), ("sector", sector_bundle))
+            if "pipeline" not in b and b.get("vectorizer") is not None
+        }
+        self.features: Optional[SharedTfidf] = SharedTfidf(vectorizers) if vectorizers else None
+
         # intent
-        intent_bundle = _load_bundle(INTENT_MODEL_PATH)
-        intent_pipe, intent_labels = _bundle_to_pipeline(intent_bundle)
+        intent_pipe, intent_labels = _bundle_to_pipeline(intent_bundle, self.features, "intent")
         if not intent_labels:
             # fallback if not present
             intent_labels = intent_bundle.get("classes") or []
-        self.intent = _ModelWrap(intent_pipe, list(intent_labels))
+        self.intent = _ModelWrap(intent_pipe, list(intent_labels), LinearTextScorer.load_for(INTENT_MODEL_PATH))
 
         # sector
-        sector_bundle = _load_bundle(SECTOR_MODEL_PATH)
-        sector_pipe, sector_labels = _bundle_to_pipeline(sector_bundle)
+        sector_pipe, sector_labels = _bundle_to_pipeline(sector_bundle, self.features, "sector")
         if not sector_labels:
             sector_labels = sector_bundle.get("classes") or []
-        self.sector = _ModelWrap(sector_pipe, list(sector_labels))
+        self.sector = _ModelWrap(sector_pipe, list(sector_labels), LinearTextScorer.load_for(SECTOR_MODEL_PATH))
 
         # vuln risk (optional)
         self.vuln_bundle: Optional[Dict[str, Any]] = None
         self.vuln_pipe: Optional[Any] = None
         if VULN_MODEL_PATH.exists():
-            vb = _load_bundle(VULN_MODEL_PATH)
+            vb = loader(VULN_MODEL_PATH)
             # your vuln trainer likely saved {"pipeline":..., ...} or {"model": ...}
             if "pipeline" in vb:
                 self.vuln_pipe = vb["pipeline"]
+            elif "model" in vb and "vectorizer" in vb:
+                # ml/train_vuln.py format
+                self.vuln_pipe = _VulnPipe(vb["vectorizer"], vb["model"])
             elif "model" in vb:
                 self.vuln_pipe = vb["model"]
             else:
@@ -144,101 +373,147 @@ class NorthStarModels:
                     # last resort: try any key
                     self.vuln_pipe = next(iter(vb.values()))
             self.vuln_bundle = vb
+        self.vuln_forest: Optional[CompiledForest] = CompiledForest.load_for(VULN_MODEL_PATH)
 
     # -------- intent --------
-    def _predict_single_label(self, wrap: _ModelWrap, text: str) -> Tuple[str, float, List[Tuple[str, float]]]:
-        text = text or ""
+    def _predict_labels(self, wrap: _ModelWrap, texts: List[str]) -> List[Tuple[str, float, List[Tuple[str, float]]]]:
+        """
+        Batched label prediction: one vectorizer pass + one matrix product per
+        call, however many texts. Row i matches _predict_single_label(texts[i]).
+        """
+        texts = [t or "" for t in texts]
+        if not texts:
+            return []
         labels = wrap.labels
 
-        # 1) try predict_proba
+        # 1) try predict_proba (single text: compiled scorer, no sklearn call)
         proba = None
-        if hasattr(wrap.pipe, "predict_proba"):
+        if wrap.compiled is not None and len(texts) == 1 and wrap.compiled.classes == labels:
+            proba = wrap.compiled.predict_proba(texts)
+        elif hasattr(wrap.pipe, "predict_proba"):
             try:
-                proba = wrap.pipe.predict_proba([text])
+                proba = wrap.pipe.predict_proba(texts)
             except Exception:
                 proba = None
 
-        if proba is not None:
+        if proba is not None and hasattr(proba, "__len__") and len(proba) == len(texts):
             # sklearn can return ndarray-like
-            row = list(proba[0]) if hasattr(proba, "__len__") else []
-            if labels and len(row) == len(labels):
-                pairs = list(zip(labels, row))
-                pairs.sort(key=lambda x: x[1], reverse=True)
-                top = pairs[0]
-                return top[0], float(top[1]), [(k, float(v)) for k, v in pairs]
+            rows = [list(r) if hasattr(r, "__len__") else [] for r in proba]
+            if labels and all(len(r) == len(labels) for r in rows):
+                out = []
+                for row in rows:
+                    pairs = list(zip(labels, row))
+                    pairs.sort(key=lambda x: x[1], reverse=True)
+                    top = pairs[0]
+                    out.append((top[0], float(top[1]), [(k, float(v)) for k, v in pairs]))
+                return out
 
         # 2) decision_function -> normalize
         if hasattr(wrap.pipe, "decision_function"):
-            df = wrap.pipe.decision_function([text])
-            # df can be (k,) or (1,k)
-            if hasattr(df, "__len__"):
-                if hasattr(df[0], "__len__"):
-                    scores = list(df[0])
+            df = wrap.pipe.decision_function(texts)
+            # df can be (n,) for binary, or (n,k)
+            score_rows = []
+            for r in df:
+                if hasattr(r, "__len__"):
+                    score_rows.append([float(x) for x in r])
                 else:
-                    # binary case shape (1,) maybe
-                    scores = [float(df[0])]
-            else:
-                scores = [float(df)]
-
-            # if labels length matches, use that, else fallback label "unknown"
-            if not labels:
-                labels = [f"class_{i}" for i in range(len(scores))]
-                wrap.labels = labels
-
-            if len(scores) != len(labels):
-                # safest alignment
-                labels = labels[: len(scores)]
-
-            probs = _normalize_probs_fallback([float(s) for s in scores])
-            pairs = list(zip(labels, probs))
-            pairs.sort(key=lambda x: x[1], reverse=True)
-            top = pairs[0]
-            return top[0], float(top[1]), [(k, float(v)) for k, v in pairs]
+                    score_rows.append([float(r)])
+
+            out = []
+            for scores in score_rows:
+                # if labels length matches, use that, else fallback label "unknown"
+                if not labels:
+                    labels = [f"class_{i}" for i in range(len(scores))]
+                    wrap.labels = labels
+
+                row_labels = labels
+                if len(scores) != len(row_labels):
+                    # safest alignment
+                    row_labels = row_labels[: len(scores)]
+
+                probs = _normalize_probs_fallback(scores)
+                pairs = list(zip(row_labels, probs))
+                pairs.sort(key=lambda x: x[1], reverse=True)
+                top = pairs[0]
+                out.append((top[0], float(top[1]), [(k, float(v)) for k, v in pairs]))
+            return out
 
         # 3) plain predict
-        y = wrap.pipe.predict([text])[0]
-        return str(y), 0.55, [(str(y), 0.55)]
+        return [(str(y), 0.55, [(str(y), 0.55)]) for y in wrap.pipe.predict(texts)]
 
-    # -------- sector --------
-    def _predict_top_sectors(self, text: str, top_k: int = 3) -> List[Dict[str, float]]:
-        label, conf, all_pairs = self._predict_single_label(self.sector, text)
+    def _predict_single_label(self, wrap: _ModelWrap, text: str) -> Tuple[str, float, List[Tuple[str, float]]]:
+        return self._predict_labels(wrap, [text])[0]
 
+    # -------- sector --------
+    @staticmethod
+    def _top_sectors(all_pairs: List[Tuple[str, float]], top_k: int = 3) -> List[Dict[str, float]]:
         # for OVR sector model, "all_pairs" are already sorted probs.
         out = []
         for lab, p in all_pairs[:max(1, top_k)]:
             out.append({"label": lab, "confidence": float(p)})
         return out
 
+    def _predict_top_sectors(self, text: str, top_k: int = 3) -> List[Dict[str, float]]:
+        label, conf, all_pairs = self._predict_single_label(self.sector, text)
+        return self._top_sectors(all_pairs, top_k=top_k)
+
     # -------- vuln risk --------
     def vuln_risk_predict(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """
         Expects dict like:
           cvss (float), internet_exposed (bool), asset_criticality (low/medium/high),
           patch_age_days (int), known_exploit (bool), env (dev/stage/prod), auth_required (bool), attack_surface (web/api/etc)
-        Your train_vuln.py defines the feature handling. Here we just pass through.
+        Features are normalized the same way ml/train_vuln.py does before vectorizing.
         """
+        return self.vuln_risk_predict_batch([features])[0]
+
+    def vuln_risk_predict_batch(self, features_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not features_list:
+            return []
         if self.vuln_pipe is None:
-            return {"score": 0.0, "method": "none", "reasons": ["No vuln model loaded"]}
+            return [{"score": 0.0, "method": "none", "reasons": ["No vuln model loaded"]} for _ in features_list]
+
+        if self.vuln_forest is not None:
+            preds = self.vuln_forest.predict(list(features_list))
+            return [{"score": float(p), "method": "ml", "reasons": []} for p in preds]
 
         # Many sklearn pipelines accept a list[dict] (DictVectorizer inside), or DataFrame.
         try:
-            pred = self.vuln_pipe.predict([features])[0]
-            return {"score": float(pred), "method": "ml", "reasons": []}
+            preds = self.vuln_pipe.predict(list(features_list))
+            return [{"score": float(p), "method": "ml", "reasons": []} for p in preds]
         except Exception as e:
             # fallback: if your model expects ordered numeric vector, you'd adapt here
-            return {"score": 0.0, "method": "error", "reasons": [f"vuln predict failed: {e}"]}
+            return [{"score": 0.0, "method": "error", "reasons": [f"vuln predict failed: {e}"]} for _ in features_list]
 
     # -------- combined --------
     def predict_all(self, text: str, vuln_features: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        intent_label, intent_conf, _ = self._predict_single_label(self.intent, text)
-        sectors = self._predict_top_sectors(text, top_k=3)
-
-        out: Dict[str, Any] = {
-            "intent": {"label": intent_label, "confidence": float(intent_conf)},
-            "sectors": sectors
-        }
-
-        if vuln_features is not None:
-            out["vuln_risk"] = self.vuln_risk_predict(vuln_features)
+        return self.predict_all_batch([text], [vuln_features])[0]
 
+    def predict_all_batch(
+        self,
+        texts: List[str],
+        vuln_features: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        predict_all over a whole batch: each model sees the batch once.
+        vuln_features is per-text (None entries skip the vuln model).
+        """
+        vuln_features = vuln_features or [None] * len(texts)
+        intents = self._predict_labels(self.intent, texts)
+        sectors = self._predict_labels(self.sector, texts)
+
+        vuln_idx = [i for i, vf in enumerate(vuln_features) if vf is not None]
+        vuln_out = self.vuln_risk_predict_batch([vuln_features[i] for i in vuln_idx])
+        vuln_by_idx = dict(zip(vuln_idx, vuln_out))
+
+        out: List[Dict[str, Any]] = []
+        for i in range(len(texts)):
+            intent_label, intent_conf, _ = intents[i]
+            pred: Dict[str, Any] = {
+                "intent": {"label": intent_label, "confidence": float(intent_conf)},
+                "sectors": self._top_sectors(sectors[i][2], top_k=3)
+            }
+            if i in vuln_by_idx:
+                pred["vuln_risk"] = vuln_by_idx[i]
+            out.append(pred)
         return out
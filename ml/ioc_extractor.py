@@ -1,14 +1,10 @@
-import re
+from ml.detectors import CVE_RE, DOMAIN_RE, EMAIL_RE, IP_RE, extract_entities_and_iocs
 
-CVE_REGEX = r"CVE-\d{4}-\d{4,7}"
-IP_REGEX = r"\b(?:\d{1,3}\.){3}\d{1,3}\b"
-DOMAIN_REGEX = r"\b(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}\b"
-EMAIL_REGEX = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"
+# kept for callers that imported the raw pattern strings
+CVE_REGEX = CVE_RE.pattern
+IP_REGEX = IP_RE.pattern
+DOMAIN_REGEX = DOMAIN_RE.pattern
+EMAIL_REGEX = EMAIL_RE.pattern
 
 def extract_iocs(text: str):
-    return {
-        "cves": list(set(re.findall(CVE_REGEX, text))),
-        "ips": list(set(re.findall(IP_REGEX, text))),
-        "domains": list(set(re.findall(DOMAIN_REGEX, text))),
-        "emails": list(set(re.findall(EMAIL_REGEX, text))),
-    }
+    return extract_entities_and_iocs(text)[1]
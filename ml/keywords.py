@@ -0,0 +1,96 @@
+# ml/keywords.py
+from __future__ import annotations
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Alternation factored as a trie ("sell", "selling" -> "sell(?:ing)?").
+    Branches at each node start with distinct chars, so the regex engine
+    rejects a position after at most one char per trie level, whatever the
+    number of keywords, and always reports the longest keyword there.
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordAutomaton:
+    """
+    One compiled multi-keyword matcher shared by scoring, sector override and
+    enrichment. Named keyword lists are registered once; scan() lowercases
+    the text, walks it once and returns, for every list, how many of its
+    entries occur as substrings (same as sum(k in text.lower() for k in list)).
+    """
+
+    def __init__(self):
+        self._lists: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._compiled: Optional[Tuple[re.Pattern, Dict[str, List[str]], Dict[str, List[Tuple[str, int]]]]] = None
+
+    def register(self, name: str, keywords: Iterable[str]) -> None:
+        with self._lock:
+            self._lists[name] = [k.lower() for k in keywords if k]
+            self._compiled = None
+
+    def _compile(self):
+        with self._lock:
+            if self._compiled is not None:
+                return self._compiled
+            vocab = sorted({k for words in self._lists.values() for k in words})
+            pattern = re.compile(_trie_regex(vocab)) if vocab else re.compile(r"(?!)")
+            # longest keyword at a position -> every keyword that is its prefix
+            prefixes = {w: [k for k in vocab if w.startswith(k)] for w in vocab}
+            # keyword -> (list name, multiplicity in that list)
+            members: Dict[str, List[Tuple[str, int]]] = {}
+            for name, words in self._lists.items():
+                for k in set(words):
+                    members.setdefault(k, []).append((name, words.count(k)))
+            self._compiled = (pattern, prefixes, members)
+            return self._compiled
+
+    def found(self, text: str) -> Set[str]:
+        pattern, prefixes, _ = self._compile()
+        low = (text or "").lower()
+        out: Set[str] = set()
+        search = pattern.search
+        m = search(low)
+        while m:
+            out.update(prefixes[m.group()])
+            # keywords can overlap, so resume one char after the match start
+            m = search(low, m.start() + 1)
+        return out
+
+    def scan(self, text: str) -> Dict[str, int]:
+        _, _, members = self._compile()
+        counts = {name: 0 for name in self._lists}
+        for k in self.found(text):
+            for name, mult in members.get(k, ()):
+                counts[name] += mult
+        return counts
+
+
+KEYWORDS = KeywordAutomaton()
+
+
+def register_keywords(name: str, keywords: Iterable[str]) -> None:
+    KEYWORDS.register(name, keywords)
+
+
+def keyword_counts(text: str) -> Dict[str, int]:
+    return KEYWORDS.scan(text)
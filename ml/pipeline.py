@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import copy
 from dataclasses import asdict
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Union
 
-from ml.infer import NorthStarModels
-from ml.detectors import leak_detector, entity_extractor
-from ml.ioc_extractor import extract_iocs
+from ml.registry import get_models, registry
+from ml.alert_cache import alert_cache, alert_cache_key
+from ml.cascade import cascade
+from ml.detectors import leak_detector, extract_entities_and_iocs
 from ml.cve_enricher import enrich_cves
+from ml.keywords import keyword_counts, register_keywords
 
 SEVERITY_WEIGHTS = {
     "PRIVATE_KEY_BLOCK": 45,
@@ -56,6 +59,10 @@ SECTOR_HINTS = {
     "oil": ["oil", "refinery", "pipeline", "gas plant", "petroleum"]
 }
 
+register_keywords("attack", ATTACK_KEYWORDS)
+for _sector, _hints in SECTOR_HINTS.items():
+    register_keywords(f"sector:{_sector}", _hints)
+
 def clamp(x: float, lo: float = 0.0, hi: float = 100.0) -> float:
     return max(lo, min(hi, x))
 
@@ -63,12 +70,12 @@ def keyword_hits(text: str, keywords: list[str]) -> int:
     t = (text or "").lower()
     return sum(1 for k in keywords if k in t)
 
-def sector_override(text: str) -> tuple[Optional[str], int]:
-    t = (text or "").lower()
+def sector_override(text: str, counts: Optional[Dict[str, int]] = None) -> tuple[Optional[str], int]:
+    counts = counts if counts is not None else keyword_counts(text)
     best = None
     best_hits = 0
-    for sector, hints in SECTOR_HINTS.items():
-        hits = sum(1 for h in hints if h in t)
+    for sector in SECTOR_HINTS:
+        hits = counts.get(f"sector:{sector}", 0)
         if hits > best_hits:
             best_hits = hits
             best = sector
@@ -125,31 +132,32 @@ def score_threat(
 
     return {"score": clamp(score), "reasons": reasons}
 
-def build_alert(
+def _assemble_alert(
     text: str,
-    post_meta: Optional[Dict[str, Any]] = None,
-    vuln_features: Optional[Dict[str, Any]] = None
+    post_meta: Dict[str, Any],
+    vuln_features: Optional[Dict[str, Any]],
+    pred: Dict[str, Any],
+    findings: Optional[list] = None,
+    kw_counts: Optional[Dict[str, int]] = None
 ) -> Dict[str, Any]:
-    post_meta = post_meta or {}
-    text = text or ""
-
-    models = NorthStarModels()
-
-    pred = models.predict_all(text, vuln_features=vuln_features)
     intent = pred["intent"]
     sector_obj = pred["sectors"][0]
 
     sector_label = sector_obj["label"]
     sector_conf = float(sector_obj["confidence"])
 
-    findings = leak_detector(text)
-    entities = entity_extractor(text)
+    # findings / kw_counts may already have been computed by the cascade
+    findings = findings if findings is not None else leak_detector(text)
+    # entities and raw IOCs come from the same extraction pass
+    entities, iocs_raw = extract_entities_and_iocs(text)
 
-    attack_hits = keyword_hits(text, ATTACK_KEYWORDS)
+    # one keyword-automaton pass feeds both attack density and sector override
+    kw_counts = kw_counts if kw_counts is not None else keyword_counts(text)
+    attack_hits = kw_counts["attack"]
     security_like = attack_hits > 0
 
     # Strong sector override
-    ovr, hits = sector_override(text)
+    ovr, hits = sector_override(text, kw_counts)
     if ovr and hits >= 1 and ovr != sector_label:
         sector_label = ovr
         sector_conf = max(sector_conf, 0.75)
@@ -184,8 +192,7 @@ def build_alert(
         scored["reasons"].insert(0, "Classified as noise (low signal)")
         scored["score"] = min(scored["score"], 3.0)
 
-    # IOC extraction + CVE enrichment
-    iocs_raw = extract_iocs(text)
+    # CVE enrichment
     cve_enriched = enrich_cves(iocs_raw.get("cves", [])) if iocs_raw.get("cves") else []
 
     alert = {
@@ -198,17 +205,164 @@ def build_alert(
         "findings": [asdict(f) for f in findings],
         "entities": entities,
         "iocs": {"raw": iocs_raw, "cve_enriched": cve_enriched},
-        "post": {
-            "title": post_meta.get("title"),
-            "author": post_meta.get("author"),
-            "url": post_meta.get("url"),
-            "source": post_meta.get("source"),
-            "created_at": post_meta.get("created_at"),
-            "text": text,
-        }
+        "post": _post_block(text, post_meta)
     }
 
     if vuln_features is not None:
         alert["vuln_risk"] = vuln_risk
 
     return alert
+
+def _noise_alert(text: str, post_meta: Dict[str, Any]) -> Dict[str, Any]:
+    # cascade fast path: no classifier ran, so the alert is marked method "cascade" and
+    # its intent confidence is the cascade's measured agreement with the full pipeline
+    entities, iocs_raw = extract_entities_and_iocs(text)
+    conf = round(cascade.confidence(), 4)
+    intent = {"label": "irrelevant", "confidence": conf, "method": "cascade"}
+    scored = score_threat(
+        intent_label="irrelevant",
+        intent_conf=conf,
+        sector_label="other",
+        sector_conf=0.0,
+        findings=[],
+    )
+    scored["reasons"].insert(0, "Classified as noise (low signal)")
+    scored["reasons"].insert(1, "Cascade: no attack, sector, leak or CVE signal")
+    return {
+        "category": "noise",
+        "sector": "other",
+        "intent": intent,
+        "sectors": [{"label": "other", "confidence": 0.0}],
+        "score": float(min(scored["score"], 3.0)),
+        "score_reasons": scored["reasons"],
+        "method": "cascade",
+        "findings": [],
+        "entities": entities,
+        "iocs": {"raw": iocs_raw, "cve_enriched": []},
+        "post": _post_block(text, post_meta)
+    }
+
+def _post_block(text: str, post_meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": post_meta.get("title"),
+        "author": post_meta.get("author"),
+        "url": post_meta.get("url"),
+        "source": post_meta.get("source"),
+        "created_at": post_meta.get("created_at"),
+        "text": text,
+    }
+
+def _with_post(cached: Dict[str, Any], text: str, post_meta: Dict[str, Any]) -> Dict[str, Any]:
+    # cache entries drop "post"; put it back in its usual place (after "iocs")
+    alert: Dict[str, Any] = {}
+    for k, v in cached.items():
+        alert[k] = v
+        if k == "iocs":
+            alert["post"] = _post_block(text, post_meta)
+    return alert
+
+def build_alert(
+    text: str,
+    post_meta: Optional[Dict[str, Any]] = None,
+    vuln_features: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    post_meta = post_meta or {}
+    text = text or ""
+
+    models = get_models()
+
+    # repeated content (re-scraped pages, templated lab/synthetic posts) skips ML
+    alert_cache.sync_generation(registry.generation)
+    key = alert_cache_key(text, vuln_features)
+    cached = alert_cache.get(key)
+    if cached is not None:
+        return _with_post(cached, text, post_meta)
+
+    findings = leak_detector(text)
+    kw_counts = keyword_counts(text)
+    shadow = False
+    if cascade.is_obvious_noise(text, vuln_features, kw_counts, findings):
+        shadow = cascade.should_shadow()
+        if not shadow:
+            # not cached: a cache hit would skip the shadow sampling, and the
+            # confidence moves with the shadow stats
+            return _noise_alert(text, post_meta)
+
+    pred = models.predict_all(text, vuln_features=vuln_features)
+    alert = _assemble_alert(text, post_meta, vuln_features, pred, findings, kw_counts)
+    if shadow:
+        cascade.record_shadow(text, alert["category"])
+    alert_cache.put(key, alert)
+    return alert
+
+def build_alerts(
+    texts: Sequence[str],
+    metas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    vuln_features: Union[None, Dict[str, Any], Sequence[Optional[Dict[str, Any]]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Batched build_alert: every model runs once over the whole batch.
+    metas / vuln_features are per-text; a single vuln_features dict applies
+    to every text (per-source config). Output[i] == build_alert(texts[i], ...).
+    """
+    texts = [t or "" for t in texts]
+    n = len(texts)
+    if n == 0:
+        return []
+
+    metas = list(metas) if metas is not None else [None] * n
+    if vuln_features is None or isinstance(vuln_features, dict):
+        vfs = [vuln_features] * n
+    else:
+        vfs = list(vuln_features)
+    if len(metas) != n or len(vfs) != n:
+        raise ValueError("build_alerts: texts, metas and vuln_features must have the same length")
+
+    models = get_models()
+    alert_cache.sync_generation(registry.generation)
+    keys = [alert_cache_key(t, vf) for t, vf in zip(texts, vfs)]
+
+    cached: Dict[str, Dict[str, Any]] = {}
+    todo: Dict[str, int] = {}  # key -> first index needing inference
+    for i, key in enumerate(keys):
+        if key in cached or key in todo:
+            continue
+        hit = alert_cache.get(key)
+        if hit is not None:
+            cached[key] = hit
+        else:
+            todo[key] = i
+
+    idx: List[int] = []
+    pre: Dict[int, tuple] = {}
+    shadowed = set()
+    for i in todo.values():
+        findings = leak_detector(texts[i])
+        kw_counts = keyword_counts(texts[i])
+        if cascade.is_obvious_noise(texts[i], vfs[i], kw_counts, findings):
+            if not cascade.should_shadow():
+                # in-batch reuse only; not put in alert_cache (see build_alert)
+                alert = _noise_alert(texts[i], metas[i] or {})
+                cached[keys[i]] = {k: v for k, v in alert.items() if k != "post"}
+                continue
+            shadowed.add(i)
+        pre[i] = (findings, kw_counts)
+        idx.append(i)
+
+    if idx:
+        preds = models.predict_all_batch([texts[i] for i in idx], [vfs[i] for i in idx])
+        for i, pred in zip(idx, preds):
+            alert = _assemble_alert(texts[i], metas[i] or {}, vfs[i], pred, *pre[i])
+            if i in shadowed:
+                cascade.record_shadow(texts[i], alert["category"])
+            alert_cache.put(keys[i], alert)
+            cached[keys[i]] = {k: v for k, v in alert.items() if k != "post"}
+
+    out = []
+    used = set()
+    for i, key in enumerate(keys):
+        # in-batch duplicates get their own copy
+        base = copy.deepcopy(cached[key]) if key in used else cached[key]
+        used.add(key)
+        out.append(_with_post(base, texts[i], metas[i] or {}))
+    return out
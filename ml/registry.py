@@ -0,0 +1,89 @@
+# ml/registry.py
+from __future__ import annotations
+
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ml.infer import NorthStarModels, _load_bundle
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for NorthStarModels.
+    Bundles are joblib-loaded once and shared by the collector loop, scan loop
+    and request handlers. reload() swaps in a fresh set (e.g. after retraining).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Optional[NorthStarModels] = None
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self.generation = 0
+
+    def _timed_load(self, path: Path) -> Dict[str, Any]:
+        # tracemalloc sees numpy buffers too, so the delta is a fair per-model size
+        # (the first bundle also carries the one-off sklearn import)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        t0 = time.perf_counter()
+        try:
+            bundle = _load_bundle(path)
+        finally:
+            elapsed = time.perf_counter() - t0
+            after, _ = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+        self._stats[path.parent.name] = {
+            "path": str(path),
+            "load_seconds": round(elapsed, 4),
+            "memory_bytes": max(0, after - before),
+            "file_bytes": path.stat().st_size if path.exists() else None,
+            "loaded_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        }
+        return bundle
+
+    def get(self) -> NorthStarModels:
+        models = self._models
+        if models is not None:
+            return models
+        with self._lock:
+            if self._models is None:
+                self._models = NorthStarModels(loader=self._timed_load)
+                self.generation += 1
+            return self._models
+
+    def reload(self) -> NorthStarModels:
+        with self._lock:
+            self._stats = {}
+            self._models = NorthStarModels(loader=self._timed_load)
+            self.generation += 1
+            return self._models
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._models is not None,
+            "generation": self.generation,
+            "models": dict(self._stats),
+        }
+
+
+registry = ModelRegistry()
+
+
+def get_models() -> NorthStarModels:
+    return registry.get()
+
+
+def reload_models() -> NorthStarModels:
+    return registry.reload()
+
+
+def model_stats() -> Dict[str, Any]:
+    return registry.stats()
@@ -0,0 +1,108 @@
+# tests/test_alert_queries.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+from backend.app.main import _stream_seed_rows, list_alerts, top_threats
+from backend.app.models import Alert, Post
+from backend.app.reporter import build_report_context
+from tests.conftest import count_queries
+
+
+def _seed(s: Session, n: int) -> None:
+    now = datetime.utcnow()
+    for i in range(n):
+        post_id = None
+        if i % 3:  # every third alert is a scan alert (no post)
+            post = Post(source=f"src{i % 4}", url=f"http://x/{i}", title=None if i % 5 == 0 else f"title {i}", text=f"text {i}", hash=f"h{i}")
+            s.add(post)
+            s.flush()
+            post_id = post.id
+        s.add(Alert(
+            post_id=post_id,
+            asset_id=None if post_id else i,
+            category="leak" if i % 2 else "discussion",
+            sector="telecom",
+            intent="planning",
+            intent_confidence=0.8,
+            score=float(i * 3 % 97),
+            score_reasons={"r": [i]},
+            created_at=now - timedelta(minutes=i),
+        ))
+    s.commit()
+
+
+@pytest.fixture()
+def session(engine):
+    with Session(engine) as s:
+        _seed(s, 30)
+        yield s
+
+
+def _report_n_plus_one(session: Session, days: int = 7, limit: int = 50) -> list:
+    # the reporter's rows as built before the LEFT JOIN (one session.get per alert)
+    since = datetime.utcnow() - timedelta(days=days)
+    alerts = session.exec(
+        select(Alert).where(Alert.created_at >= since).order_by(Alert.score.desc()).limit(limit)
+    ).all()
+    rows = []
+    for a in alerts:
+        p = session.get(Post, a.post_id) if a.post_id else None
+        rows.append({
+            "id": a.id,
+            "score": round(a.score, 2),
+            "category": a.category,
+            "sector": a.sector,
+            "intent": a.intent,
+            "created_at": a.created_at.isoformat(timespec="seconds"),
+            "title": (p.title if p else None) or "(no title)",
+            "url": (p.url if p else None),
+            "source": (p.source if p else None),
+            "reasons": a.score_reasons or {},
+        })
+    return rows
+
+
+@pytest.mark.parametrize("limit", [5, 50])
+def test_report_join_matches_n_plus_one(session, limit):
+    expected = _report_n_plus_one(session, limit=limit)
+    ctx = build_report_context(session, days=7, limit=limit)
+    assert ctx["alerts"] == expected
+    assert ctx["count"] == len(expected)
+    assert any(r["source"] is None for r in expected) and any(r["source"] for r in expected)
+
+
+def _read_paths(s: Session) -> dict:
+    # every alert read path that renders post columns, with its page size
+    return {
+        "alerts": lambda: list_alerts(limit=200, cursor=None, sector=None, category=None, intent=None, status=None,
+                                      since=None, until=None, fields=None, session=s),
+        "top": lambda: top_threats(limit=200, session=s),
+        "stream_seed": lambda: _stream_seed_rows(s),
+        "report": lambda: build_report_context(s, days=7, limit=200),
+    }
+
+
+def _query_counts(engine, n: int) -> dict:
+    with Session(engine) as s:
+        _seed(s, n)
+        s.expunge_all()
+        counts = {}
+        for name, run in _read_paths(s).items():
+            with count_queries(engine) as seen:
+                run()
+            counts[name] = len(seen)
+            s.expunge_all()  # no identity-map hits carried into the next path
+        with count_queries(engine) as seen:
+            _report_n_plus_one(s, limit=200)
+        counts["n_plus_one"] = len(seen)
+        return counts
+
+
+def test_read_paths_run_constant_queries(new_engine):
+    small = _query_counts(new_engine("small"), 10)
+    big = _query_counts(new_engine("big"), 500)
+    # the old per-row lookups grow with the page; the LEFT JOIN paths stay at one SELECT
+    assert big.pop("n_plus_one") > small.pop("n_plus_one") > 1
+    assert small == big == {"alerts": 1, "top": 1, "stream_seed": 1, "report": 1}
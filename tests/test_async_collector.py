@@ -0,0 +1,102 @@
+# tests/test_async_collector.py
+import asyncio
+import json
+from collections import Counter
+
+import httpx
+import pytest
+
+from backend.app.async_collector import AsyncCollector
+
+
+def _json_body(*ids) -> bytes:
+    return json.dumps({"items": [{"id": i, "url": f"http://item/{i}", "text": f"item {i}"} for i in ids]}).encode()
+
+
+def _cfg(name: str, url: str, **extra) -> dict:
+    return {"name": name, "url": url, "method": "json", "retries": 0, "backoff_base": 0.0, **extra}
+
+
+def _collect(handler, cfgs, per_host: int = 2, cursors=None):
+    async def run():
+        c = AsyncCollector(per_host=per_host, transport=httpx.MockTransport(handler))
+        try:
+            return c, await c.collect_all(cfgs, cursors)
+        finally:
+            await c.aclose()
+
+    return asyncio.run(run())
+
+
+def test_per_host_cap_and_cross_host_concurrency():
+    in_flight, peak = Counter(), Counter()
+    total = {"now": 0, "peak": 0}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] += 1
+        total["now"] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        total["peak"] = max(total["peak"], total["now"])
+        await asyncio.sleep(0.05)
+        in_flight[host] -= 1
+        total["now"] -= 1
+        return httpx.Response(200, content=_json_body(1))
+
+    cfgs = [_cfg(f"a{i}", f"http://a.test/{i}") for i in range(5)] + [_cfg(f"b{i}", f"http://b.test/{i}") for i in range(2)]
+    c, results = _collect(handler, cfgs, per_host=2)
+
+    assert [r.name for r in results] == [cfg["name"] for cfg in cfgs]
+    assert all(r.error is None and len(r.posts) == 1 for r in results)
+    assert peak["a.test"] == 2 and peak["b.test"] == 2
+    assert total["peak"] == 4  # both hosts at their cap at once
+    assert c.stats()["hosts"] == ["a.test", "b.test"] and c.requests == 7
+
+
+def test_deadline_only_fails_the_slow_source():
+    async def handler(request):
+        if request.url.host == "slow.test":
+            await asyncio.sleep(5)
+        return httpx.Response(200, content=_json_body(1))
+
+    cfgs = [_cfg("slow", "http://slow.test/", deadline_seconds=0.1), _cfg("fast", "http://fast.test/")]
+    c, (slow, fast) = _collect(handler, cfgs)
+    assert slow.error == "timed out after 0.1s" and slow.seconds < 1
+    assert fast.error is None and len(fast.posts) == 1
+    assert c.timeouts == 1
+
+
+def test_retries_then_gives_up():
+    calls = Counter()
+
+    def handler(request):
+        calls[request.url.host] += 1
+        if request.url.host == "flaky.test" and calls["flaky.test"] == 1:
+            return httpx.Response(503)
+        if request.url.host == "down.test":
+            return httpx.Response(500)
+        return httpx.Response(200, content=_json_body(1, 2))
+
+    cfgs = [_cfg("flaky", "http://flaky.test/", retries=2), _cfg("down", "http://down.test/", retries=1)]
+    c, (flaky, down) = _collect(handler, cfgs)
+    assert flaky.error is None and len(flaky.posts) == 2 and calls["flaky.test"] == 2
+    assert down.error == "HTTP 500" and calls["down.test"] == 2
+    assert c.failures == 1
+
+
+def test_disabled_and_urlless_sources():
+    def handler(request):
+        raise AssertionError("no request expected")
+
+    cfgs = [_cfg("off", "http://x.test/", enabled=False), {"name": "nourl", "method": "json"}]
+    _, results = _collect(handler, cfgs)
+    assert [(r.name, r.posts, r.error) for r in results] == [("nourl", [], None)]
+
+
+@pytest.mark.parametrize("cfg, expected", [
+    ({"deadline_seconds": 7}, 7.0),
+    ({"timeout_seconds": 10, "retries": 2, "backoff_base": 1.0}, 10 * 3 + 3 + 5),
+    ({}, 20 * 3 + 0.8 * 3 + 5),
+])
+def test_deadline_defaults(cfg, expected):
+    assert AsyncCollector.deadline(cfg) == pytest.approx(expected)
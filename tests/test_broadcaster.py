@@ -0,0 +1,76 @@
+# tests/test_broadcaster.py
+import asyncio
+
+import backend.app.broadcaster as broadcaster_mod
+from backend.app.broadcaster import AlertBroadcaster
+
+
+def _alert(i: int) -> dict:
+    return {"id": i, "score": 1.0, "sector": "other", "category": "noise", "intent": "irrelevant"}
+
+
+def _ids(events) -> list:
+    return [e.id for e in events]
+
+
+def test_replay_resumes_after_last_event_id_by_position():
+    b = AlertBroadcaster(replay_size=5)
+    b.seed(_alert(i) for i in (1, 2))
+    b.publish([_alert(4)])
+    b.publish([_alert(3)])  # a concurrent writer committed a lower id later
+    b.publish([_alert(5)])
+
+    assert _ids(b.subscribe()[1]) == [1, 2, 4, 3, 5]
+    assert _ids(b.subscribe(4)[1]) == [3, 5]
+    assert _ids(b.subscribe(5)[1]) == []
+    b.publish([_alert(6), _alert(7)])  # 1 and 2 fall out of the ring
+    assert _ids(b.subscribe(1)[1]) == [4, 3, 5, 6, 7]
+
+
+def test_live_events_out_of_order_are_all_delivered():
+    async def run():
+        b = AlertBroadcaster()
+        b.bind_loop(asyncio.get_running_loop())
+        b.publish([_alert(10)])
+        sub, backlog = b.subscribe(None)
+        # published before subscribe, delivered after: already sent with the backlog
+        b._deliver(backlog)
+        b.publish([_alert(12)])
+        b.publish([_alert(11)])
+        await asyncio.sleep(0)
+        got = []
+        while not sub.queue.empty():
+            ev = sub.queue.get_nowait()
+            if sub.unseen(ev):
+                got.append(ev.id)
+        return _ids(backlog), got
+
+    backlog, live = asyncio.run(run())
+    assert backlog == [10]
+    assert live == [12, 11]
+
+
+def test_slow_consumer_is_dropped(monkeypatch):
+    monkeypatch.setattr(broadcaster_mod, "SSE_CLIENT_QUEUE", 3)
+
+    async def run():
+        b = AlertBroadcaster()
+        b.bind_loop(asyncio.get_running_loop())
+        slow, _ = b.subscribe()
+        fast, _ = b.subscribe()
+        b.publish([_alert(1), _alert(2)])
+        await asyncio.sleep(0)
+        while not fast.queue.empty():
+            fast.queue.get_nowait()
+        b.publish([_alert(3), _alert(4)])
+        await asyncio.sleep(0)
+        return b, slow, fast
+
+    b, slow, fast = asyncio.run(run())
+    assert slow.dropped and not fast.dropped
+    assert slow.queue.get_nowait() is None and slow.queue.empty()
+    assert _ids([fast.queue.get_nowait(), fast.queue.get_nowait()]) == [3, 4]
+    stats = b.stats()
+    assert stats["subscribers"] == 1 and stats["dropped_consumers"] == 1
+    # the dropped client resumes from the ring with its Last-Event-ID
+    assert _ids(b.subscribe(2)[1]) == [3, 4]
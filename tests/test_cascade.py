@@ -0,0 +1,55 @@
+# tests/test_cascade.py
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, select
+
+from backend.app.main import top_threats
+from backend.app.models import Alert
+from backend.app.pipeline_store import bulk_upsert_posts_and_alerts
+from ml.alert_cache import alert_cache, alert_cache_key
+from ml.cascade import NoiseCascade, cascade
+from ml.pipeline import build_alert, build_alerts
+
+NOISE = "had a lovely lunch with friends at 198.51.100.4 yesterday, the soup was great"
+
+
+@pytest.fixture()
+def cascade_on(monkeypatch):
+    monkeypatch.setattr(cascade, "enabled", True)
+    monkeypatch.setattr(cascade, "shadow_rate", 0.0)
+    monkeypatch.setattr(cascade, "shadowed", 8)
+    monkeypatch.setattr(cascade, "disagreements", 1)
+    alert_cache.clear()
+    yield cascade
+    alert_cache.clear()
+
+
+def test_confidence_is_smoothed_shadow_agreement():
+    c = NoiseCascade(enabled=True, shadow_rate=1.0)
+    assert c.confidence() == 0.5
+    for category in ["noise", "noise", "noise", "discussion"]:
+        c.record_shadow("t", category)
+    assert c.confidence() == pytest.approx(4 / 6)
+    assert c.stats()["confidence"] == round(4 / 6, 4)
+
+
+def test_cascade_alerts_are_marked_and_not_cached(cascade_on):
+    [batched] = build_alerts([NOISE])
+    single = build_alert(NOISE)
+    for alert in (batched, single):
+        assert alert["category"] == "noise" and alert["method"] == "cascade"
+        assert alert["intent"] == {"label": "irrelevant", "confidence": 0.8, "method": "cascade"}
+        assert {"kind": "ip", "value": "198.51.100.4"} in alert["entities"]
+    assert alert_cache.get(alert_cache_key(NOISE, None)) is None
+
+
+def test_stored_cascade_alerts_say_so(engine, fresh_seen_hashes, cascade_on):
+    item = dict(source="s", url="http://x/1", title="lunch", author=None, created_at=datetime(2025, 3, 1), text=NOISE)
+    with Session(engine) as s:
+        [(_, alert_id)] = bulk_upsert_posts_and_alerts(s, [item])
+        a = s.get(Alert, alert_id)
+        assert a.score_reasons["method"] == "cascade"
+        assert a.intent_confidence == pytest.approx(0.8)  # (8 - 1 + 1) / (8 + 2)
+        [top] = top_threats(limit=5, session=s)["top"]
+        assert top["classified_by"] == "cascade"
@@ -0,0 +1,61 @@
+# tests/test_compiled_models.py
+# Compiled scorers (ml/export_linear.py, ml/export_vuln.py) must keep matching the sklearn bundles.
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from joblib import load
+
+from ml.export_linear import check_parity, load_texts
+from ml.infer import (
+    INTENT_MODEL_PATH,
+    SECTOR_MODEL_PATH,
+    VULN_MODEL_PATH,
+    CompiledForest,
+    LinearTextScorer,
+    normalize_vuln_features,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TOL = 1e-9
+SAMPLE = 200
+
+EXTRA_TEXTS = [
+    "",
+    "selling telecom db creds tonight",
+    "DDoS on UPI gateway planned, join the channel",
+    "CVE-2024-3400 exploited against PAN-OS; patch now",
+    "football match tonight was great",
+]
+
+
+@pytest.fixture(autouse=True)
+def _repo_root(monkeypatch):
+    # model paths in ml.infer are relative to the repo root
+    monkeypatch.chdir(REPO_ROOT)
+
+
+@pytest.mark.parametrize(
+    "bundle_path, val_path",
+    [
+        (INTENT_MODEL_PATH, Path("ml/data/intent_val.jsonl")),
+        (SECTOR_MODEL_PATH, Path("ml/data/sector_val.jsonl")),
+    ],
+)
+def test_linear_scorer_matches_sklearn(bundle_path, val_path):
+    scorer = LinearTextScorer.load_for(bundle_path)
+    assert scorer is not None, f"{bundle_path.parent}/linear.npz missing or stale; run python -m ml.export_linear"
+    texts = load_texts(val_path)[:SAMPLE] + EXTRA_TEXTS
+    assert check_parity(bundle_path, scorer, texts) <= TOL
+
+
+def test_compiled_forest_matches_sklearn():
+    forest = CompiledForest.load_for(VULN_MODEL_PATH)
+    assert forest is not None, "vuln_risk/forest missing or stale; run python -m ml.export_vuln"
+    bundle = load(VULN_MODEL_PATH)
+    lines = Path("ml/data/vuln_val.jsonl").read_text(encoding="utf-8").splitlines()
+    feats = [json.loads(ln)["features"] for ln in lines if ln.strip()][:SAMPLE]
+    feats += [{}, {"cvss": 6.8, "internet_exposed": True, "asset_criticality": "Medium", "env": "prod", "attack_surface": "web"}]
+    ref = bundle["model"].predict(bundle["vectorizer"].transform([normalize_vuln_features(f) for f in feats]))
+    assert float(np.abs(ref - forest.predict(feats)).max()) <= TOL
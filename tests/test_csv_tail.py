@@ -0,0 +1,172 @@
+# tests/test_csv_tail.py
+import asyncio
+import re
+
+import httpx
+import pytest
+
+from backend.app.async_collector import AsyncCollector
+from backend.app.collector import CsvRecordSplitter, parse_exploitdb_rows, parse_source
+
+HEADER = b"id,file,description,date_published,author,type,platform,port\n"
+
+
+def _row(eid: int, description: str = None) -> bytes:
+    desc = description or f"Exploit {eid}"
+    return f'{eid},exploits/{eid}.py,"{desc}",2025-01-{eid % 28 + 1:02d},someone,remote,linux,\n'.encode()
+
+
+QUOTED = [
+    HEADER,
+    _row(1, "multi\nline, with comma"),
+    _row(2, 'has ""escaped"" quotes\nand\r\nCRLF'),
+    _row(3),
+]
+
+
+def _split(data: bytes, cuts) -> list:
+    s = CsvRecordSplitter()
+    out, prev = [], 0
+    for c in list(cuts) + [len(data)]:
+        out += s.feed(data[prev:c])
+        prev = c
+    return out + ([s.rest] if s.rest else [])
+
+
+def test_splitter_keeps_quoted_newlines_at_every_chunk_boundary():
+    data = b"".join(QUOTED)
+    assert _split(data, []) == QUOTED
+    assert _split(data, range(1, len(data))) == QUOTED  # byte by byte
+    for i in range(1, len(data)):
+        assert _split(data, [i]) == QUOTED, i
+
+
+def test_splitter_holds_unterminated_record():
+    s = CsvRecordSplitter()
+    assert s.feed(HEADER + b'4,x,"open\nquote') == [HEADER]
+    assert s.rest == b'4,x,"open\nquote'
+    assert s.feed(b' closed",d,a,t,p,\n5,') == [b'4,x,"open\nquote closed",d,a,t,p,\n']
+    assert s.rest == b"5,"
+
+
+def test_parse_exploitdb_rows_and_parse_source():
+    cfg = {"name": "edb", "url": "http://edb.test/files.csv", "method": "exploitdb_csv", "max_items": 2}
+    rows = parse_exploitdb_rows(cfg, HEADER.decode(), [r.decode() for r in QUOTED[1:]] + [HEADER.decode(), "short,row\n"])
+    assert [r["item_id"] for r in rows] == ["1", "2", "3"]
+    assert rows[0]["title"] == "multi\nline, with comma" and rows[1]["title"] == 'has "escaped" quotes\nand\r\nCRLF'
+    assert rows[0]["url"] == "https://www.exploit-db.com/exploits/1" and rows[0]["source"] == "edb"
+
+    # newest max_items records, unterminated last one included
+    body = b"".join(QUOTED) + _row(4)[:-1]
+    assert [r["item_id"] for r in parse_source(cfg, body)] == ["3", "4"]
+    assert parse_source(cfg, b"") == []
+
+
+class _CsvServer:
+    """An append-only CSV behind a Range-aware handler, streamed in small chunks."""
+
+    def __init__(self, data: bytes, ranges: bool = True, chunk: int = 7):
+        self.data = data
+        self.ranges = ranges
+        self.chunk = chunk
+        self.requests = []
+
+    def _body(self, data: bytes):
+        async def gen():
+            for i in range(0, len(data), self.chunk):
+                yield data[i:i + self.chunk]
+        return gen()
+
+    def __call__(self, request):
+        rng = request.headers.get("range")
+        self.requests.append(rng)
+        m = re.fullmatch(r"bytes=(\d+)-", rng or "")
+        if m and self.ranges:
+            start = int(m.group(1))
+            if start >= len(self.data):
+                return httpx.Response(416)
+            headers = {"Content-Range": f"bytes {start}-{len(self.data) - 1}/{len(self.data)}"}
+            return httpx.Response(206, content=self._body(self.data[start:]), headers=headers)
+        return httpx.Response(200, content=self._body(self.data))
+
+
+def _tail(server: _CsvServer, cursor: dict):
+    cfg = {"name": "edb", "url": "http://edb.test/files.csv", "method": "exploitdb_csv", "retries": 0, "max_items": 50}
+
+    async def run():
+        c = AsyncCollector(transport=httpx.MockTransport(server))
+        try:
+            [res] = await c.collect_all([cfg], {"edb": cursor})
+            return res
+        finally:
+            await c.aclose()
+
+    res = asyncio.run(run())
+    assert res.error is None, res.error
+    return res
+
+
+def _ids(res) -> list:
+    return [p["item_id"] for p in res.posts]
+
+
+def test_first_read_then_range_resume():
+    first = b"".join(QUOTED)
+    server = _CsvServer(first)
+    res = _tail(server, {})
+    assert server.requests == [None] and _ids(res) == ["1", "2", "3"]
+    assert res.cursor["offset"] == len(first) and res.cursor["csv_header"] == HEADER.decode().rstrip("\n")
+    assert res.cursor["last_seen_id"] == 3
+
+    appended = _row(4, "new\nrow") + _row(5)
+    server.data = first + appended
+    res2 = _tail(server, res.cursor)
+    assert server.requests[-1] == f"bytes={len(first) - 1}-"
+    assert _ids(res2) == ["4", "5"] and res2.skipped == 0
+    assert res2.bytes == len(appended) + 1 and res2.bytes_saved == len(first) - 1
+    assert res2.cursor["offset"] == len(server.data)
+
+    # nothing appended: only the boundary newline crosses the wire
+    res3 = _tail(server, res2.cursor)
+    assert res3.posts == [] and res3.bytes == 1 and res3.cursor["offset"] == len(server.data)
+
+
+def test_server_without_range_support_reads_everything():
+    first = b"".join(QUOTED)
+    server = _CsvServer(first, ranges=False)
+    res = _tail(server, {})
+    server.data = first + _row(4)
+    res2 = _tail(server, res.cursor)
+    assert server.requests[-1] is not None  # asked for a range, got a 200
+    assert _ids(res2) == ["4"] and res2.skipped == 3 and res2.bytes == len(server.data)
+    assert res2.cursor["offset"] == len(server.data)
+
+
+@pytest.mark.parametrize("rewrite", [
+    lambda old: b"".join([HEADER, _row(10, "x" * 80), _row(11, "y" * 80)]),  # same path, different bytes at offset - 1
+    lambda old: HEADER + _row(12),                                            # shorter than the offset: 416
+])
+def test_rewritten_file_falls_back_to_full_read(rewrite):
+    first = b"".join(QUOTED)
+    server = _CsvServer(first)
+    res = _tail(server, {})
+    server.data = rewrite(first)
+    assert len(server.data) != len(first)
+    res2 = _tail(server, res.cursor)
+    assert server.requests[-2:] == [f"bytes={len(first) - 1}-", None]
+    assert _ids(res2) == [str(i) for i in (10, 11, 12) if f"\n{i},".encode() in server.data]
+    assert res2.cursor["offset"] == len(server.data)
+
+
+def test_unterminated_last_record_is_parsed_but_not_consumed():
+    complete = b"".join(QUOTED)
+    server = _CsvServer(complete + _row(4, "no newline\nyet")[:-1])
+    res = _tail(server, {})
+    assert _ids(res) == ["1", "2", "3", "4"]
+    assert res.cursor["offset"] == len(complete)  # re-read from the record start next time
+
+    server.data = complete + _row(4, "no newline\nyet") + _row(5)
+    res2 = _tail(server, res.cursor)
+    assert server.requests[-1] == f"bytes={len(complete) - 1}-"
+    assert _ids(res2) == ["5"] and res2.skipped == 1
+    assert res2.cursor["offset"] == len(server.data)
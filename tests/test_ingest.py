@@ -0,0 +1,50 @@
+# tests/test_ingest.py
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from backend.app.models import Alert, AlertRollup, Entity, Post
+from backend.app.pg_copy import PG_COPY_MIN_ROWS
+from backend.app.pipeline_store import bulk_upsert_posts_and_alerts
+
+TOPICS = ["bank ATM skimmer dump", "telecom SIM swap creds", "railway IRCTC outage", "power grid SCADA exploit", "weather chat"]
+
+
+def _items(n: int, tag: str = "") -> list:
+    # enough rows for the COPY path on Postgres
+    return [
+        dict(source=f"src{i % 3}", url=f"http://x/{tag}{i}", title=f"post {i}", author=None,
+             created_at=datetime(2025, 3, 1 + i % 5), text=f"{TOPICS[i % len(TOPICS)]} #{tag}{i} contact admin{i}@example.com")
+        for i in range(n)
+    ]
+
+
+def test_ingest_writes_posts_alerts_and_answers_redeliveries(engine, fresh_seen_hashes):
+    items = _items(PG_COPY_MIN_ROWS + 5)
+    with Session(engine) as s:
+        ids = bulk_upsert_posts_and_alerts(s, items)
+
+        posts = {p.id: p for p in s.exec(select(Post))}
+        alerts = {a.id: a for a in s.exec(select(Alert))}
+        assert len(posts) == len(alerts) == len(items)
+        for it, (pid, aid) in zip(items, ids):
+            assert posts[pid].url == it["url"] and posts[pid].text == it["text"]
+            assert alerts[aid].post_id == pid
+        assert s.exec(select(func.count()).select_from(Entity)).one() >= len(items)  # the e-mail in every post
+
+        # the rollup agrees with the Alert table
+        rollup = {(r.day, r.sector, r.category): r.count for r in s.exec(select(AlertRollup))}
+        grouped = {}
+        for a in alerts.values():
+            key = (a.created_at.date().isoformat(), a.sector, a.category)
+            grouped[key] = grouped.get(key, 0) + 1
+        assert rollup == grouped
+
+        # a second delivery writes nothing and returns the same ids
+        redelivered, mask = {}, []
+        again = bulk_upsert_posts_and_alerts(s, items + _items(1, "new"), redelivered=redelivered, redelivered_mask=mask)
+        assert again[:-1] == ids
+        assert mask == [True] * len(items) + [False]
+        assert redelivered == {"src0": 9, "src1": 8, "src2": 8}
+        assert s.exec(select(func.count()).select_from(Post)).one() == len(items) + 1
@@ -0,0 +1,135 @@
+# tests/test_near_dup.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+import backend.app.pipeline_store as pipeline_store
+from backend.app.models import Alert, AlertRollup, Entity, Finding, Post, PostSimhash
+from backend.app.near_dup import backfill, boost_alert, simhash
+from backend.app.pipeline_store import bulk_upsert_posts_and_alerts
+
+LEAK = ("selling fresh telecom admin panel access, login admin@telco-example.com password = Tr0ub4dor&3xyzQ "
+        "connect from 203.0.113.7 before the weekend sale ends today, dm for more")
+
+
+def _item(url: str, source: str = "forum", text: str = LEAK, **extra) -> dict:
+    return dict(source=source, url=url, title=None, author=None, created_at=datetime(2025, 3, 1), text=text, **extra)
+
+
+@pytest.fixture()
+def near_dup_on(monkeypatch, fresh_seen_hashes):
+    monkeypatch.setattr(pipeline_store, "NEAR_DUP_ENABLED", True)
+
+
+def _counts(s: Session, model, post_id: int) -> int:
+    return len(s.exec(select(model).where(model.post_id == post_id)).all())
+
+
+def test_no_linking_when_disabled(engine, fresh_seen_hashes, monkeypatch):
+    monkeypatch.setattr(pipeline_store, "NEAR_DUP_ENABLED", False)
+    with Session(engine) as s:
+        (p1, a1), (p2, a2) = bulk_upsert_posts_and_alerts(s, [_item("http://a/1"), _item("http://a/2")])
+        assert a1 != a2
+        assert s.exec(select(PostSimhash)).all() == []
+
+
+def test_repost_links_to_cluster_with_its_own_findings(engine, near_dup_on):
+    with Session(engine) as s:
+        [(root_post, root_alert)] = bulk_upsert_posts_and_alerts(s, [_item("http://a/1")])
+        out = bulk_upsert_posts_and_alerts(s, [
+            _item("http://a/2"),                                   # repost, same source
+            _item("http://b/1", source="other-forum"),             # same text, other source
+            _item("http://a/3", vuln_features={"cvss": 9.8}),      # vuln risk depends on the features
+        ])
+        (repost, repost_alert), (other, other_alert), (vuln, vuln_alert) = out
+
+        assert repost_alert == root_alert
+        assert len({root_alert, other_alert, vuln_alert}) == 3
+        assert s.get(PostSimhash, repost).cluster_id == root_post
+        assert s.get(PostSimhash, other).cluster_id == other
+        assert s.get(PostSimhash, vuln) is None
+
+        # the linked post skipped ML but not the detectors
+        assert _counts(s, Finding, repost) == _counts(s, Finding, root_post) == 1
+        assert _counts(s, Entity, repost) == _counts(s, Entity, root_post) == 3
+
+        boosted = s.get(Alert, root_alert)
+        assert boosted.score_reasons["reposts"] == 1
+        assert boosted.score == pytest.approx(boosted.score_reasons["base_score"] + 3.0)
+
+
+def test_in_batch_roots(engine, near_dup_on):
+    with Session(engine) as s:
+        out = bulk_upsert_posts_and_alerts(s, [
+            _item("http://a/1"),
+            _item("http://b/1", source="other-forum"),
+            _item("http://a/2"),
+            _item("http://b/2", source="other-forum"),
+        ])
+        (a1, alert_a1), (b1, alert_b1), (a2, alert_a2), (b2, alert_b2) = out
+        assert alert_a2 == alert_a1 and alert_b2 == alert_b1 and alert_a1 != alert_b1
+        clusters = {r.post_id: r.cluster_id for r in s.exec(select(PostSimhash))}
+        assert clusters == {a1: a1, b1: b1, a2: a1, b2: b1}
+        assert len(s.exec(select(Alert)).all()) == 2
+
+
+def test_rollup_matches_alerts_after_boosts(engine, near_dup_on):
+    chatter = "weather chat about the monsoon arriving early this year in the northern plains, nothing else to report here"
+    with Session(engine) as s:
+        [(_, forum_alert), _] = bulk_upsert_posts_and_alerts(s, [_item("http://a/1"), _item("http://c/1", source="chat", text=chatter)])
+        out = bulk_upsert_posts_and_alerts(s, [
+            _item("http://a/2"), _item("http://a/3"),                      # boost the indexed cluster twice
+            _item("http://b/1", source="other-forum"), _item("http://b/2", source="other-forum"),  # in-batch root + repost
+            _item("http://c/2", source="chat", text=chatter),
+        ])
+        other_alert = out[2][1]
+        assert out[0][1] == out[1][1] == forum_alert and out[3][1] == other_alert
+        assert s.get(Alert, forum_alert).score_reasons["reposts"] == 2
+        assert s.get(Alert, other_alert).score_reasons["reposts"] == 1
+
+        # boosts re-score alerts but never move them between rollup buckets
+        day = func.date(Alert.created_at)
+        grouped = {(str(d), sec, cat): n for d, sec, cat, n in
+                   s.exec(select(day, Alert.sector, Alert.category, func.count()).group_by(day, Alert.sector, Alert.category))}
+        rollup = {(r.day, r.sector, r.category): r.count for r in s.exec(select(AlertRollup))}
+        assert rollup == grouped
+        assert sum(rollup.values()) == 3  # one alert per cluster, none for the reposts
+
+
+def test_boost_alert():
+    a = Alert(category="leak", sector="telecom", intent="claim", intent_confidence=0.9, score=50.0,
+              score_reasons={"reasons": ["Leak signal"]})
+    boost_alert(a, 2)
+    assert a.score == 56.0
+    boost_alert(a, 9)  # capped at +12 over the original score, not the boosted one
+    assert a.score == 62.0
+    assert a.score_reasons["base_score"] == 50.0
+    assert [r for r in a.score_reasons["reasons"] if r.startswith("Reposted ")] == ["Reposted 9x as near-duplicate (+12.0)"]
+
+    high = Alert(category="leak", sector="x", intent="claim", intent_confidence=1.0, score=95.0, score_reasons={})
+    boost_alert(high, 3)
+    assert high.score == 100.0
+
+    noise = Alert(category="noise", sector="other", intent="irrelevant", intent_confidence=0.6, score=3.0, score_reasons={})
+    boost_alert(noise, 4)
+    assert noise.score == 3.0 and noise.score_reasons == {}
+
+
+def test_backfill_indexes_old_posts(engine):
+    with Session(engine) as s:
+        texts = [LEAK, LEAK, LEAK, "too short to fingerprint", LEAK + " and some extra words appended for a new shingle set entirely different"]
+        sources = ["forum", "forum", "other-forum", "forum", "forum"]
+        posts = [Post(source=src, url=f"http://x/{i}", text=t, hash=f"h{i}") for i, (t, src) in enumerate(zip(texts, sources))]
+        s.add_all(posts)
+        s.commit()
+        ids = [p.id for p in posts]
+
+        assert backfill(s, chunk=2) == 4
+        clusters = {r.post_id: r.cluster_id for r in s.exec(select(PostSimhash))}
+        assert clusters[ids[0]] == clusters[ids[1]] == ids[0]
+        assert clusters[ids[2]] == ids[2]
+        assert ids[3] not in clusters
+        assert backfill(s) == 0
+        assert simhash(texts[3]) is None
@@ -0,0 +1,84 @@
+# tests/test_pg_copy.py
+# COPY vs INSERT parity runs on the throwaway Postgres from conftest.py (skipped without one)
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_mock_engine, insert, select
+from sqlmodel import Session
+
+from backend.app.models import Alert, Post
+from backend.app.pg_copy import PG_COPY_MIN_ROWS, copy_insert, use_copy
+
+ROWS = [{}] * PG_COPY_MIN_ROWS
+
+
+class _FakeSession:
+    def __init__(self, url):
+        self._bind = create_mock_engine(url, lambda *a, **k: None)
+
+    def get_bind(self):
+        return self._bind
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("postgresql+psycopg://", True),
+        ("postgresql://", False),  # psycopg2: no cursor.copy(), multi-row INSERT instead
+        ("postgresql+psycopg2://", False),
+        ("sqlite://", False),
+    ],
+)
+def test_copy_only_on_psycopg3(url, expected):
+    assert use_copy(_FakeSession(url), ROWS) is expected
+
+
+def test_copy_skipped_for_small_batches():
+    assert use_copy(_FakeSession("postgresql+psycopg://"), ROWS[:-1]) is False
+
+
+def _posts(tag):
+    return [
+        dict(source="s", url=f"http://x/{i}", title=None if i % 4 == 0 else f"t\t{i}", author=None,
+             created_at=datetime(2025, 1, 1, 0, i % 60), text=f"line1\nline2 \\ {i}", hash=f"{tag}{i}")
+        for i in range(PG_COPY_MIN_ROWS + 5)
+    ]
+
+
+def _alerts(post_ids):
+    return [
+        dict(post_id=pid, asset_id=None, category="leak", sector="telecom", intent="claim", intent_confidence=0.5,
+             score=float(i), score_reasons={"reasons": [f"r{i}", None], "n": i}, status="open",
+             created_at=datetime(2025, 1, 1), vuln_risk_score=None, vuln_risk_method=None)
+        for i, pid in enumerate(post_ids)
+    ]
+
+
+def _strip(rows, drop):
+    return [{k: v for k, v in r.items() if k not in drop} for r in rows]
+
+
+def test_copy_matches_insert_on_postgres(pg_engine):
+    with Session(pg_engine) as s:
+        assert use_copy(s, _posts("c"))
+        copy_ids = copy_insert(s, Post, _posts("c"), want_ids=True)
+        ins_ids = [r[0] for r in s.execute(insert(Post).returning(Post.id, sort_by_parameter_order=True), _posts("i"))]
+        copy_alert_ids = copy_insert(s, Alert, _alerts(copy_ids), want_ids=True)
+        s.execute(insert(Alert), _alerts(ins_ids))
+        s.commit()
+
+        def fetch(model, ids):
+            rows = s.execute(select(model.__table__).where(model.__table__.c.id.in_(ids)).order_by(model.__table__.c.id))
+            return [dict(r._mapping) for r in rows]
+
+        copied, inserted = fetch(Post, copy_ids), fetch(Post, ins_ids)
+        # ids come back in row order and address the rows that were written
+        assert [r["id"] for r in copied] == sorted(copy_ids) and copy_ids == sorted(copy_ids)
+        assert [r["hash"] for r in copied] == [p["hash"] for p in _posts("c")]
+        assert _strip(copied, {"id", "hash"}) == _strip(inserted, {"id", "hash"})
+
+        alerts_copied = fetch(Alert, copy_alert_ids)
+        alerts_inserted = s.execute(select(Alert.__table__).where(Alert.post_id.in_(ins_ids)).order_by(Alert.id))
+        alerts_inserted = [dict(r._mapping) for r in alerts_inserted]
+        assert [a["post_id"] for a in alerts_copied] == copy_ids
+        assert _strip(alerts_copied, {"id", "post_id"}) == _strip(alerts_inserted, {"id", "post_id"})
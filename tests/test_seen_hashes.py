@@ -0,0 +1,67 @@
+# tests/test_seen_hashes.py
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from backend.app.models import Alert, Post
+from backend.app.pipeline_store import bulk_upsert_posts_and_alerts
+from backend.app.seen_hashes import SeenHashes
+from tests.conftest import count_queries
+
+
+def _sha(s: str) -> str:
+    return hashlib.sha256(s.encode()).hexdigest()
+
+
+def _alert(post_id: int) -> Alert:
+    return Alert(post_id=post_id, category="discussion", sector="other", intent="discussion", intent_confidence=0.5, score=1.0)
+
+
+def test_warm_loads_latest_alert_per_post(engine):
+    with Session(engine) as s:
+        posts = [Post(source="s", url=f"http://x/{i}", text=f"t{i}", hash=_sha(f"t{i}")) for i in range(3)]
+        s.add_all(posts)
+        s.flush()
+        s.add_all([_alert(posts[0].id), _alert(posts[0].id), _alert(posts[1].id)])
+        s.commit()
+        latest = s.exec(select(func.max(Alert.id)).where(Alert.post_id == posts[0].id)).one()
+
+        seen = SeenHashes(enabled=True)
+        seen.add(_sha("raced"), 99, 100)  # inserted while warming: kept
+        assert seen.warm(s) == 4
+        assert seen.get(_sha("t0")) == (posts[0].id, latest)
+        assert seen.get(_sha("t2")) == (posts[2].id, -1)
+        assert seen.get(_sha("raced")) == (99, 100)
+        assert seen.get(_sha("unknown")) is None
+        assert seen.stats()["hits"] == 3 and seen.stats()["misses"] == 1 and seen.warmed
+
+
+def test_full_hash_keys_and_large_ids():
+    seen = SeenHashes(enabled=True)
+    a = "0123456789abcdef" + "0" * 48
+    b = "0123456789abcdef" + "f" * 48  # same 64-bit prefix
+    seen.add(a, 1, 2)
+    assert seen.get(b) is None
+    seen.add_many([(b, (2**40, 2**32 + 7))])
+    assert seen.get(a) == (1, 2)
+    assert seen.get(b) == (2**40, 2**32 + 7)
+
+
+def test_disabled_filter_answers_nothing():
+    seen = SeenHashes(enabled=False)
+    seen.add(_sha("x"), 1, 1)
+    assert seen.get(_sha("x")) is None and seen.stats()["size"] == 0
+
+
+def test_redeliveries_are_answered_from_memory(engine, fresh_seen_hashes):
+    items = [dict(source=f"src{i % 2}", url=f"http://x/{i}", title=None, author=None,
+                  created_at=datetime(2025, 3, 1), text=f"weather chat number {i}") for i in range(5)]
+    with Session(engine) as s:
+        ids = bulk_upsert_posts_and_alerts(s, items)
+        with count_queries(engine) as queries:
+            again = bulk_upsert_posts_and_alerts(s, items)
+    assert again == ids
+    assert queries == []
+    assert fresh_seen_hashes.redelivered_total == {"src0": 3, "src1": 2}
@@ -0,0 +1,104 @@
+# tests/test_source_cursor.py
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+from sqlmodel import Session
+
+from backend.app.async_collector import AsyncCollector
+from backend.app.models import Source
+from backend.app.source_cursor import advance, conditional_headers, load_cursors, parse_cursor, skip_seen, source_rows
+
+
+def _raw(item_id, created_at=None) -> dict:
+    return {"item_id": item_id, "created_at": created_at, "text": "t"}
+
+
+def test_parse_cursor_tolerates_garbage():
+    assert parse_cursor(None) == {} and parse_cursor("not json") == {} and parse_cursor("[1]") == {}
+    assert parse_cursor('{"etag": "x"}') == {"etag": "x"}
+
+
+def test_conditional_headers():
+    assert conditional_headers({}) == {}
+    assert conditional_headers({"etag": '"v1"', "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"}) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+
+
+def test_skip_seen_by_numeric_id():
+    fresh, skipped = skip_seen([_raw("9"), _raw(10), _raw("11"), _raw("abc")], {"last_seen_id": 10})
+    assert [r["item_id"] for r in fresh] == ["11", "abc"] and skipped == 2
+
+
+def test_skip_seen_by_timestamp_with_boundary_ids():
+    cursor = {"last_seen_at": "2025-03-01T12:00:00", "last_seen_ids": ["a"]}
+    raws = [
+        _raw("old", "2025-03-01T11:00:00Z"),
+        _raw("a", "2025-03-01T12:00:00Z"),            # seen at the boundary
+        _raw("b", "Sat, 01 Mar 2025 12:00:00 GMT"),  # same instant (RFC 822), not seen yet
+        _raw("new", "2025-03-01T13:00:00"),
+        _raw("undated"),                              # left to the hash dedup
+    ]
+    fresh, skipped = skip_seen(raws, cursor)
+    assert [r["item_id"] for r in fresh] == ["b", "new", "undated"] and skipped == 2
+
+
+def test_advance_tracks_validators_and_newest_position():
+    headers = httpx.Headers({"etag": '"v2"', "last-modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+    cur = advance({"last_seen_id": 12}, [_raw("10"), _raw("11")], headers, 1234)
+    assert cur == {"last_seen_id": 12, "etag": '"v2"', "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT", "bytes": 1234}
+
+    cur = advance({}, [_raw("a", "2025-03-01T12:00:00"), _raw("b", "2025-03-01T12:00:00"), _raw("c", "2025-02-01T00:00:00")])
+    assert cur == {"last_seen_at": "2025-03-01T12:00:00", "last_seen_ids": ["a", "b"]}
+    # another item at the same instant joins the boundary set; older ones change nothing
+    cur = advance(cur, [_raw("d", "2025-03-01T12:00:00"), _raw("e", "2025-01-01T00:00:00")])
+    assert cur["last_seen_ids"] == ["a", "b", "d"]
+    cur = advance(cur, [_raw("f", "2025-03-02T00:00:00")])
+    assert cur["last_seen_at"] == "2025-03-02T00:00:00" and cur["last_seen_ids"] == ["f"]
+
+
+def test_source_rows_keep_ids_of_existing_sources(engine):
+    with Session(engine) as s:
+        s.add(Source(name="known", url="http://old", method="rss"))
+        s.commit()
+        known_id = s.get(Source, 1).id
+        cfgs = [{"name": "known", "url": "http://k", "method": "json", "interval_seconds": 60}, {"name": "new", "url": "http://n"}]
+        rows = source_rows(s, cfgs, {"known": {"etag": "x"}, "new": {}})
+        assert [(r.id, r.name, r.url, r.method) for r in rows] == [(known_id, "known", "http://k", "json"), (None, "new", "http://n", "rss")]
+        for r in rows:
+            s.merge(r) if r.id else s.add(r)
+        s.commit()
+        assert load_cursors(s) == {"known": {"etag": "x"}, "new": {}}
+
+
+def test_conditional_get_304_and_200():
+    body = json.dumps({"items": [{"id": 1, "text": "a"}, {"id": 2, "text": "b"}, {"id": 3, "text": "c"}]}).encode()
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=body, headers={"ETag": '"v1"'})
+
+    cfg = {"name": "feed", "url": "http://feed.test/", "method": "json", "retries": 0}
+
+    async def run(cursor):
+        c = AsyncCollector(transport=httpx.MockTransport(handler))
+        try:
+            [res] = await c.collect_all([cfg], {"feed": cursor})
+            return c, res
+        finally:
+            await c.aclose()
+
+    _, first = asyncio.run(run({"last_seen_id": 1}))
+    assert [p["item_id"] for p in first.posts] == [2, 3] and first.skipped == 1
+    assert first.cursor == {"last_seen_id": 3, "etag": '"v1"', "last_modified": None, "bytes": len(body)}
+
+    c, second = asyncio.run(run(first.cursor))
+    assert seen_headers[-1]["if-none-match"] == '"v1"'
+    assert second.not_modified and second.posts == [] and second.cursor == first.cursor
+    assert second.bytes_saved == len(body) and c.stats()["not_modified"] == 1
@@ -0,0 +1,97 @@
+# tests/test_source_health.py
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+
+from backend.app.models import SourceHealth
+from backend.app.source_health import BREAKER_COOLDOWN, BREAKER_FAILURES, BREAKER_MAX_COOLDOWN, SourceBreakers
+
+T0 = datetime(2025, 3, 1, 12, 0, 0)
+
+
+def _fail(b: SourceBreakers, name: str, n: int, now: datetime = T0) -> None:
+    for _ in range(n):
+        b.record(name, False, 1.0, error="HTTP 503", now=now)
+
+
+def _state(b: SourceBreakers, name: str) -> dict:
+    return b.stats()["sources"][name]
+
+
+def test_opens_after_consecutive_failures_and_skips():
+    b = SourceBreakers(enabled=True)
+    _fail(b, "s", BREAKER_FAILURES - 1)
+    assert b.allow("s", T0) and _state(b, "s")["state"] == "closed"
+    b.record("s", True, 0.1, now=T0)  # a success resets the run of failures
+    _fail(b, "s", BREAKER_FAILURES - 1)
+    assert _state(b, "s")["state"] == "closed"
+    _fail(b, "s", 1)
+    st = _state(b, "s")
+    assert st["state"] == "open" and st["last_error"] == "HTTP 503"
+    assert st["next_probe_at"] == (T0 + timedelta(seconds=BREAKER_COOLDOWN)).isoformat(timespec="seconds")
+    assert not b.allow("s", T0 + timedelta(seconds=BREAKER_COOLDOWN - 1))
+    assert not b.allow("s", T0 + timedelta(seconds=1))
+    assert b.stats()["skipped"] == 2 and not b.is_probe("s")
+
+
+def test_half_open_probe_backs_off_then_closes():
+    b = SourceBreakers(enabled=True)
+    _fail(b, "s", BREAKER_FAILURES)
+    t = T0 + timedelta(seconds=BREAKER_COOLDOWN)
+    assert b.allow("s", t) and b.is_probe("s") and _state(b, "s")["state"] == "half_open"
+    assert not b.allow("s", t)  # one probe at a time
+
+    # failed probes re-open with the cooldown doubled each time, up to the cap
+    cooldown = BREAKER_COOLDOWN
+    for _ in range(12):
+        b.record("s", False, 1.0, now=t)
+        cooldown = min(cooldown * 2, BREAKER_MAX_COOLDOWN)
+        assert _state(b, "s")["next_probe_at"] == (t + timedelta(seconds=cooldown)).isoformat(timespec="seconds")
+        assert not b.allow("s", t + timedelta(seconds=cooldown - 1))
+        t += timedelta(seconds=cooldown)
+        assert b.allow("s", t) and b.is_probe("s")
+    assert cooldown == BREAKER_MAX_COOLDOWN
+
+    b.record("s", True, 0.2, now=t)
+    st = _state(b, "s")
+    assert st["state"] == "closed" and st["consecutive_failures"] == 0 and st["next_probe_at"] is None
+    # the next trip starts again from the base cooldown
+    _fail(b, "s", BREAKER_FAILURES, now=t)
+    assert _state(b, "s")["next_probe_at"] == (t + timedelta(seconds=BREAKER_COOLDOWN)).isoformat(timespec="seconds")
+
+
+def test_latency_ewma_and_success_rate():
+    b = SourceBreakers(enabled=True)
+    b.record("s", True, 0.1, now=T0)
+    b.record("s", True, 0.6, now=T0)
+    b.record("s", False, 5.0, now=T0)  # failures do not count towards latency
+    st = _state(b, "s")
+    assert st["latency_ms_last"] == 600.0 and st["latency_ms_avg"] == 200.0  # 0.8 * 100 + 0.2 * 600
+    assert st["success_rate"] == round(2 / 3, 3)
+
+
+def test_disabled_breaker_always_allows():
+    b = SourceBreakers(enabled=False)
+    _fail(b, "s", BREAKER_FAILURES * 3)
+    assert b.allow("s", T0) and _state(b, "s")["state"] == "closed" and _state(b, "s")["failures"] == BREAKER_FAILURES * 3
+
+
+def test_state_round_trips_through_the_db(engine):
+    b = SourceBreakers(enabled=True)
+    _fail(b, "down", BREAKER_FAILURES)
+    b.record("up", True, 0.05, now=T0)
+    _fail(b, "probing", BREAKER_FAILURES)
+    assert b.allow("probing", T0 + timedelta(seconds=BREAKER_COOLDOWN))
+    with Session(engine) as s:
+        for row in b.rows(["down", "up", "probing", "unknown"]):
+            s.merge(row)
+        s.commit()
+        assert sorted(s.exec(select(SourceHealth.name)).all()) == ["down", "probing", "up"]
+
+    warmed = SourceBreakers(enabled=True)
+    with Session(engine) as s:
+        assert warmed.warm(s) == 3
+    assert _state(warmed, "down") == _state(b, "down") and _state(warmed, "up") == _state(b, "up")
+    # a probe interrupted by the restart is retried, not left half-open forever
+    assert _state(warmed, "probing")["state"] == "open" and not warmed.is_probe("probing")
+    assert warmed.allow("probing", T0 + timedelta(seconds=BREAKER_COOLDOWN)) and warmed.is_probe("probing")
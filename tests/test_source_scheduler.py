@@ -0,0 +1,112 @@
+# tests/test_source_scheduler.py
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app import source_scheduler
+from backend.app.source_scheduler import SCHEDULER_MAX_SLEEP, SourceScheduler
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(source_scheduler.time, "monotonic", c)
+    return c
+
+
+def _cfg(name, interval=None, **extra):
+    return {"name": name, "interval_seconds": interval, **extra}
+
+
+def test_new_sources_due_now_and_persisted_runs_honored(clock):
+    sch = SourceScheduler(default_interval=600, jitter=0)
+    last_runs = {"recent": datetime.utcnow() - timedelta(seconds=100), "stale": datetime.utcnow() - timedelta(days=1)}
+    sch.sync([_cfg("fresh"), _cfg("recent"), _cfg("stale"), _cfg("off", enabled=False)], last_runs)
+
+    assert sorted(sch.pop_due(clock.now)) == ["fresh", "stale"]
+    assert sch.pop_due(clock.now + 400) == []
+    assert sch.pop_due(clock.now + 501) == ["recent"]  # 600s interval, ran 100s ago
+    assert "off" not in sch.stats()["sources"]
+
+
+def test_pop_marks_running_and_done_reschedules(clock):
+    sch = SourceScheduler(default_interval=600, jitter=0)
+    sch.sync([_cfg("a", 60), _cfg("b")])
+    assert sorted(sch.pop_due()) == ["a", "b"]
+    assert sch.stats()["sources"]["a"]["running"] and sch.pop_due() == []
+
+    clock.now += 5
+    sch.done("a", 5.0)
+    sch.done("b", 5.0, error="boom")
+    st = sch.stats()["sources"]
+    assert st["a"]["runs"] == 1 and not st["a"]["running"] and st["b"]["last_error"] == "boom"
+    assert sch.seconds_until_next() == 30.0  # a is due in 60s, capped
+
+    clock.now += 60
+    assert sch.pop_due() == ["a"]
+    clock.now += 540
+    assert sch.pop_due() == ["b"]
+
+
+def test_interval_change_reschedules_sooner(clock):
+    sch = SourceScheduler(default_interval=600, jitter=0)
+    sch.sync([_cfg("a", 3600)])
+    sch.pop_due()
+    sch.done("a", 1.0)
+    sch.sync([_cfg("a", 60)])
+    clock.now += 60
+    assert sch.pop_due() == ["a"]
+    # a longer interval does not push an already scheduled run back
+    sch.done("a", 1.0)
+    sch.sync([_cfg("a", 3600)])
+    clock.now += 60
+    assert sch.pop_due() == ["a"]
+
+
+def test_interval_change_while_running_waits_for_done(clock):
+    sch = SourceScheduler(default_interval=600, jitter=0)
+    sch.sync([_cfg("a", 600)])
+    sch.pop_due()
+    sch.sync([_cfg("a", 60)])
+    assert sch.pop_due(clock.now + 3600) == []
+    sch.done("a", 1.0)
+    assert sch.pop_due(clock.now + 60) == ["a"]
+
+
+def test_removed_sources_leave_only_stale_items(clock):
+    sch = SourceScheduler(default_interval=600, jitter=0)
+    sch.sync([_cfg("a", 60), _cfg("b", 60)])
+    sch.sync([_cfg("b", 60)])
+    assert sch.pop_due() == ["b"]
+    sch.done("b", 1.0)
+    sch.sync([_cfg("b", 60), _cfg("a", 60)])  # re-added: one fresh entry, the old heap item stays stale
+    assert sch.pop_due() == ["a"]
+    sch.done("gone", 1.0)  # unknown names are ignored
+    assert sch.pop_due(clock.now + 60) == ["b"]
+    sch.sync([])
+    assert sch.seconds_until_next() == SCHEDULER_MAX_SLEEP and sch.pop_due(clock.now + 10_000) == []
+
+
+def test_jitter_bounds_and_spread(clock):
+    random.seed(7)
+    sch = SourceScheduler(default_interval=100, jitter=0.1)
+    names = [f"s{i}" for i in range(50)]
+    sch.sync([_cfg(n) for n in names])
+    # new sources are staggered within min(5s, interval * jitter)
+    first = sch.pop_due(clock.now + 10)
+    assert sorted(first) == sorted(names)
+    for n in names:
+        sch.done(n, 0.0)
+    dues = [e.due - clock.now for e in sch._entries.values()]
+    assert all(90 <= d <= 110 for d in dues)
+    assert max(dues) - min(dues) > 5  # same interval, spread apart
+    assert sch.pop_due(clock.now + 89.9) == [] and len(sch.pop_due(clock.now + 110)) == 50